@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Load generator for the Booktrack HTTP API (python -m booktrack serve).
+
+Opens keep-alive connections from concurrent asyncio clients and reports
+requests/sec and latency percentiles. With --etag, clients poll using
+If-None-Match as a well-behaved poller would.
+
+Usage:
+    python benchmarks/server_load.py --books 2000 --sessions 20000
+    python benchmarks/server_load.py --url http://127.0.0.1:8765/books --etag
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.server import BooktrackServer
+
+
+def populate(db_path, books, sessions):
+    """Fill a database with synthetic books and sessions."""
+    db = DatabaseManager(db_path)
+    book_ids = [db.add_book(f"Book {i}", f"Author {i % 100}", 300) for i in range(books)]
+    for i in range(sessions):
+        db.add_reading_session(book_ids[i % len(book_ids)], 600 + i % 1800, i % 40)
+
+
+async def client(host, port, path, deadline, use_etag, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etag = None
+    try:
+        while time.perf_counter() < deadline:
+            headers = f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+            if use_etag and etag:
+                headers += f'If-None-Match: {etag}\r\n'
+            started = time.perf_counter()
+            writer.write((headers + '\r\n').encode('latin-1'))
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+                elif name.lower() == 'etag':
+                    etag = value.strip()
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, path, concurrency, duration, use_etag):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, path, deadline, use_etag, latencies, statuses)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000 if latencies else 0.0
+
+    print(f"{path}: {len(latencies)} requests in {elapsed:.1f}s, {len(latencies) / elapsed:.0f} req/s, "
+          f"p50 {pct(50):.2f} ms, p99 {pct(99):.2f} ms, statuses {statuses}")
+
+
+async def run_local(args):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'bench.db')
+        populate(db_path, args.books, args.sessions)
+        server = BooktrackServer(db_path, port=0, read_pool_size=args.readers)
+        await server.start()
+        try:
+            for path in args.paths:
+                await run_load('127.0.0.1', server.port, path, args.concurrency, args.duration, args.etag)
+        finally:
+            await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Booktrack HTTP API.')
+    parser.add_argument('--url', help='benchmark an already running server instead of a local one')
+    parser.add_argument('--paths', nargs='+', default=['/books', '/statistics', '/sessions'])
+    parser.add_argument('--books', type=int, default=1000)
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--etag', action='store_true', help='send If-None-Match like a polling client')
+    args = parser.parse_args()
+
+    if args.url:
+        url = urlsplit(args.url)
+        asyncio.run(run_load(url.hostname, url.port or 80, url.path or '/', args.concurrency,
+                             args.duration, args.etag))
+    else:
+        asyncio.run(run_local(args))
+
+
+if __name__ == '__main__':
+    main()
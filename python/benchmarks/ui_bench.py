@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Headless view-building benchmark for the Booktrack app.
+
+Drives the real Booktrack app on Toga's dummy backend (no display needed)
+against synthetic libraries of increasing size, and records for each view
+the build time, number of widgets created and peak Python memory
+(tracemalloc). A saved run can be used as a baseline to catch scaling
+regressions.
+
+Requires the dummy backend: pip install toga-core toga-dummy
+
+Usage:
+    python benchmarks/ui_bench.py --sizes 10 100 1000
+    python benchmarks/ui_bench.py --json results.json
+    python benchmarks/ui_bench.py --baseline results.json --tolerance 1.5
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# The dummy backend must be selected before toga is imported
+os.environ['TOGA_BACKEND'] = 'toga_dummy'
+
+# Keep the app's default database, covers and libraries out of the real home directory
+_HOME = tempfile.TemporaryDirectory()
+os.environ['HOME'] = os.environ['USERPROFILE'] = _HOME.name
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from booktrack.app import main as app_main
+from booktrack.database import DatabaseManager
+
+STATUSES = ('Active', 'Read', 'Abandoned')
+
+
+def populate(db_path, books, sessions_per_book):
+    """Create a synthetic library and return its DatabaseManager."""
+    db = DatabaseManager(db_path, reuse_connection=True)
+    start = int(time.time()) - books * sessions_per_book * 3600
+    for i in range(books):
+        book_id = db.add_book(f'Book {i}', f'Author {i % 50}', 200 + i % 400, None, f'Notes for book {i}')
+        if i % len(STATUSES):
+            db.update_book(book_id, status=STATUSES[i % len(STATUSES)])
+        db.set_book_tags(book_id, [f'Shelf {i % 20}'])
+        for j in range(sessions_per_book):
+            session_start = start + (i * sessions_per_book + j) * 3600
+            db.add_reading_session(book_id, 900 + j * 60, 10 + j, None, session_start, session_start + 900)
+    return db
+
+
+def count_widgets(widget):
+    """Count a widget and all of its descendants."""
+    if widget is None:
+        return 0
+    children = getattr(widget, 'children', None) or []
+    content = getattr(widget, 'content', None)
+    nested = [content] if content is not None and not isinstance(content, str) else []
+    return 1 + sum(count_widgets(child) for child in list(children) + nested)
+
+
+def views(app, db):
+    """The view builders to measure, as name -> callable."""
+    active_book = next(iter(db.get_books(status='Active')), None)
+
+    def timer_view():
+        app.current_book = active_book
+        app.show_timer_interface()
+
+    return {
+        'active_books': lambda: app.refresh_book_list('Active'),
+        'all_books': lambda: app.refresh_book_list(),
+        'shelves': app.display_shelves,
+        'authors': app.display_authors,
+        'statistics': app.display_statistics,
+        'settings': app.display_settings,
+        'timer': timer_view,
+    }
+
+
+def measure(build, content, repeat):
+    """Return (median ms, widget count, peak KiB) for one view builder."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        build()
+        timings.append((time.perf_counter() - started) * 1000)
+    widgets = count_widgets(content())
+
+    # Memory is measured in a separate run, since tracing slows everything down
+    gc.collect()
+    tracemalloc.start()
+    build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), widgets, peak / 1024
+
+
+def run(sizes, sessions_per_book, repeat):
+    app = app_main()
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            db = populate(os.path.join(temp_dir, f'library_{size}.db'), size, sessions_per_book)
+            app.db_manager = db
+            for name, build in views(app, db).items():
+                ms, widgets, peak_kib = measure(build, lambda: app.main_content.content, repeat)
+                results.append({'books': size, 'view': name, 'ms': round(ms, 3),
+                                'widgets': widgets, 'peak_kib': round(peak_kib, 1)})
+                print(f"{size:>6} books  {name:<14} {ms:9.2f} ms  {widgets:>7} widgets  {peak_kib:10.1f} KiB")
+            db.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return descriptions of views slower or larger than the baseline allows."""
+    expected = {(entry['books'], entry['view']): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        base = expected.get((entry['books'], entry['view']))
+        if base is None:
+            continue
+        for metric in ('ms', 'widgets', 'peak_kib'):
+            if base[metric] and entry[metric] > base[metric] * tolerance:
+                regressions.append(f"{entry['view']} @ {entry['books']} books: "
+                                   f"{metric} {entry[metric]} > {base[metric]} x {tolerance}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Booktrack view building headlessly.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='library sizes in books')
+    parser.add_argument('--sessions-per-book', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5, help='timed builds per view')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='compare against results saved with --json')
+    parser.add_argument('--tolerance', type=float, default=1.5, help='allowed growth over the baseline')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.sessions_per_book, args.repeat)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Stress test for concurrent writers on one Booktrack database.
+
+Each process adds reading sessions and updates a book as fast as it can,
+the way the GUI, scripts and a second app instance would. Reports aggregate
+write transactions/sec and checks that no write was lost.
+
+Usage:
+    python benchmarks/write_contention.py --processes 1 2 4 8 --writes 200
+    python benchmarks/write_contention.py --busy-timeout 0.05 --retries 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from booktrack.database import DatabaseManager
+
+
+def writer(db_path, worker, writes, busy_timeout, retries):
+    """Write from one process; returns (book id, seconds spent)."""
+    db = DatabaseManager(db_path, busy_timeout=busy_timeout, write_retries=retries)
+    started = time.perf_counter()
+    book_id = db.add_book(f'Worker {worker}', 'Stress Test')
+    for i in range(writes):
+        db.add_reading_session(book_id, 60 + i, 1)
+        db.update_book(book_id, notes=f'{worker}:{i}')
+    return book_id, time.perf_counter() - started
+
+
+def run(processes, writes, busy_timeout, retries):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'booktrack.db')
+        db = DatabaseManager(db_path)
+        version = db.get_change_version()
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(writer, db_path, w, writes, busy_timeout, retries)
+                       for w in range(processes)]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+        transactions = processes * (1 + 2 * writes)
+        lost = transactions - (db.get_change_version() - version)
+        sessions = len(db.get_reading_sessions())
+        print(f"{processes:>3} processes: {transactions / elapsed:8.0f} writes/s  "
+              f"slowest writer {max(seconds for _, seconds in results):.2f}s  "
+              f"sessions {sessions}/{processes * writes}  lost writes {lost}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent writer stress test.')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--writes', type=int, default=200, help='session + update pairs per process')
+    parser.add_argument('--busy-timeout', type=float, default=5.0)
+    parser.add_argument('--retries', type=int, default=5)
+    args = parser.parse_args()
+
+    for processes in args.processes:
+        run(processes, args.writes, args.busy_timeout, args.retries)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,47 @@
 """
 Booktrack - A reading time tracking application
 Main module for launching the app.
+
+Without arguments the GUI is started. Command-line tools:
+
+    python -m booktrack archive [--older-than DAYS] [--restore ID] [--db BOOKTRACK_DB]
+    python -m booktrack dedup [--threshold 0.7] [--apply] [--db BOOKTRACK_DB]
+    python -m booktrack export-feed PATH [--full] [--db BOOKTRACK_DB]
+    python -m booktrack fleet-stats PATH [PATH ...]
+    python -m booktrack import-room ROOM_DB [--db BOOKTRACK_DB]
+    python -m booktrack sync OTHER_DB [--db BOOKTRACK_DB]
+    python -m booktrack session-snapshot DIR [--rebuild] [--db BOOKTRACK_DB]
+    python -m booktrack serve [--host HOST] [--port PORT] [--db BOOKTRACK_DB]
+    python -m booktrack timezone [ZONE] [--rebucket] [--db BOOKTRACK_DB]
 """
 
-from .app import main
+import sys
 
-if __name__ == '__main__':
-    app = main()
+COMMANDS = {
+    'archive': 'booktrack.archive',
+    'dedup': 'booktrack.dedup',
+    'export-feed': 'booktrack.feed',
+    'fleet-stats': 'booktrack.fleet',
+    'import-room': 'booktrack.room_import',
+    'sync': 'booktrack.sync',
+    'serve': 'booktrack.server',
+    'session-snapshot': 'booktrack.columnar',
+    'timezone': 'booktrack.timezones',
+}
+
+
+def main(argv=None):
+    """Run a command-line tool, or the app when no command is given."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        import importlib
+        return importlib.import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+    from .app import main as app_main
+    app = app_main()
     app.main_loop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,28 +4,79 @@ Booktrack - Main application module
 
 import toga
 from toga.style import Pack
+from toga.sources import AccessorColumn
 from toga.style.pack import COLUMN, ROW
 import asyncio
-import json
+import logging
 import os
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, List, Optional
 
+from .backup import BackupManager
+from .covers import CoverCache, CoverLoader
 from .database import DatabaseManager
+from .exporter import ExportCancelled, ExportJob, export_filename
+from .library import LibraryRegistry
 from .timer import Timer
+from .uimonitor import monitor_from_environment, timed_handler
 from .widgets import BookForm, BookListItem, SessionLogForm
 
+# Book list orderings offered in the list view, label -> get_books() sort
+BOOK_SORT_LABELS = {
+    'Date Added': 'created',
+    'Recently Read': 'recently_read',
+    'Most Read': 'most_read',
+    'Least Progress': 'least_progress'
+}
+
+# Author list orderings, label -> get_authors() sort
+AUTHOR_SORT_LABELS = {
+    'Name': 'name',
+    'Most Read': 'most_read',
+    'Most Books': 'most_books'
+}
+
+# Sessions re-bucketed after a time zone change, label -> whether to start at a date
+REBUCKET_LABELS = {
+    'Sessions from a date on': True,
+    'All history': False
+}
+
+# Rows loaded into the author table at once; searching narrows the list
+AUTHOR_PAGE_SIZE = 500
+
 
 class Booktrack(toga.App):
     """Main Booktrack application class."""
     
     def startup(self):
         """Initialize the app."""
-        self.db_manager = DatabaseManager()
+        # BOOKTRACK_LIBRARY selects a per-reader library instead of the default database
+        library = os.environ.get('BOOKTRACK_LIBRARY')
+        db_path = LibraryRegistry().library_path(library) if library else None
+        self.db_manager = DatabaseManager(
+            db_path,
+            profile=bool(os.environ.get('BOOKTRACK_PROFILE')),
+            reuse_connection=True,
+            archive=True
+        )
         self.current_timer = None
         self.current_book = None
+        self.current_shelf = None
+        self.current_author = None
+        self.export_job = None
+        self.author_search = ''
+        self.author_sort = 'name'
+        self.book_sort = 'created'
         self.timer_task = None
         self.session_start_time = None
+        self.cover_loader = CoverLoader(CoverCache())
+        
+        # Optional event-loop lag monitoring (BOOKTRACK_UI_MONITOR)
+        self.ui_monitor = monitor_from_environment()
+        if self.ui_monitor:
+            logging.basicConfig(level=logging.INFO)
+            self.ui_monitor.start(self.loop)
         
         # Create main interface
         self.create_main_interface()
@@ -71,6 +122,18 @@ class Booktrack(toga.App):
             style=Pack(flex=1, margin=5)
         )
         
+        shelves_btn = toga.Button(
+            'Shelves',
+            on_press=self.show_shelves,
+            style=Pack(flex=1, margin=5)
+        )
+        
+        authors_btn = toga.Button(
+            'Authors',
+            on_press=self.show_authors,
+            style=Pack(flex=1, margin=5)
+        )
+        
         stats_btn = toga.Button(
             'Statistics',
             on_press=self.show_statistics,
@@ -97,34 +160,172 @@ class Booktrack(toga.App):
         
         self.nav_box.add(active_btn)
         self.nav_box.add(all_books_btn)
+        self.nav_box.add(shelves_btn)
+        self.nav_box.add(authors_btn)
         self.nav_box.add(stats_btn)
         self.nav_box.add(settings_btn)
         self.nav_box.add(add_book_btn)
         self.nav_box.add(export_btn)
     
+    @timed_handler
     def show_active_books(self, widget=None):
         """Show active books view."""
         self.current_view = 'active_books'
         self.refresh_book_list(status='Active')
     
+    @timed_handler
     def show_all_books(self, widget=None):
         """Show all books view."""
         self.current_view = 'all_books'
         self.refresh_book_list()
     
+    @timed_handler
+    def show_shelves(self, widget=None):
+        """Show the list of shelves (tags)."""
+        self.current_view = 'shelves'
+        self.display_shelves()
+    
+    @timed_handler
+    def show_shelf(self, tag: str):
+        """Show the books on one shelf."""
+        self.current_view = 'shelf'
+        self.current_shelf = tag
+        self.refresh_book_list(tag=tag)
+    
+    @timed_handler
+    def display_shelves(self):
+        """Display every shelf with its number of books."""
+        # Counts are kept current by triggers, so this reads one small table
+        tags = self.db_manager.get_tags()
+        
+        content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
+        content_box.add(toga.Label(
+            'Shelves',
+            style=Pack(font_size=18, font_weight='bold', margin=(0, 0, 10, 0))
+        ))
+        
+        if not tags:
+            content_box.add(toga.Label(
+                'No shelves yet. Add tags to a book to put it on a shelf.',
+                style=Pack(text_align='center', margin=20)
+            ))
+        
+        for tag, count in tags:
+            content_box.add(toga.Button(
+                f'{tag} ({count})',
+                on_press=lambda widget, tag=tag: self.show_shelf(tag),
+                style=Pack(margin=5)
+            ))
+        
+        self.main_content.content = content_box
+    
+    @timed_handler
+    def show_authors(self, widget=None):
+        """Show the list of authors."""
+        self.current_view = 'authors'
+        self.display_authors()
+    
+    @timed_handler
+    def show_author(self, author: Dict):
+        """Show the books of one author."""
+        self.current_view = 'author'
+        self.current_author = author
+        self.refresh_book_list(author=author)
+    
+    @timed_handler
+    def display_authors(self):
+        """Display authors with their reading totals."""
+        # One grouped query over the per-book totals; the table only holds one page
+        authors = self.db_manager.get_authors(prefix=self.author_search or None, sort=self.author_sort,
+                                              limit=AUTHOR_PAGE_SIZE)
+        total = self.db_manager.get_author_count()
+        
+        content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
+        content_box.add(toga.Label(
+            f'Authors ({total})',
+            style=Pack(font_size=18, font_weight='bold', margin=(0, 0, 10, 0))
+        ))
+        
+        def search(widget):
+            self.author_search = widget.value.strip()
+            self.display_authors()
+        
+        def change_sort(widget):
+            self.author_sort = AUTHOR_SORT_LABELS[widget.value]
+            self.display_authors()
+        
+        controls_box = toga.Box(style=Pack(direction=ROW, margin=(0, 0, 10, 0)))
+        search_input = toga.TextInput(
+            value=self.author_search,
+            placeholder='Search authors',
+            on_confirm=search,
+            style=Pack(flex=1, margin=(0, 5, 0, 0))
+        )
+        sort_selection = toga.Selection(
+            items=list(AUTHOR_SORT_LABELS),
+            value=next(label for label, sort in AUTHOR_SORT_LABELS.items() if sort == self.author_sort)
+        )
+        sort_selection.on_change = change_sort
+        controls_box.add(search_input)
+        controls_box.add(sort_selection)
+        content_box.add(controls_box)
+        
+        if not authors:
+            content_box.add(toga.Label(
+                'No authors found.' if self.author_search else 'No authors yet. Add a book to get started!',
+                style=Pack(text_align='center', margin=20)
+            ))
+        else:
+            if len(authors) == AUTHOR_PAGE_SIZE:
+                content_box.add(toga.Label(
+                    f'Showing the first {AUTHOR_PAGE_SIZE}; search to find others.',
+                    style=Pack(font_size=10, margin=(0, 0, 5, 0))
+                ))
+            
+            def open_author(widget, row, **kwargs):
+                self.show_author({'id': row.author_id, 'name': row.author})
+            
+            # A table, unlike one box per author, stays responsive with many rows
+            rows = []
+            for author in authors:
+                minutes = (author['total_seconds'] or 0) // 60
+                rows.append({
+                    'author': author['name'],
+                    'books': author['book_count'],
+                    'read': author['books_read'],
+                    'time': f'{minutes // 60}h {minutes % 60}m',
+                    'pages': author['total_pages_read'],
+                    'author_id': author['id']
+                })
+            content_box.add(toga.Table(
+                columns=[AccessorColumn(heading, accessor) for heading, accessor in (
+                    ('Author', 'author'), ('Books', 'books'), ('Read', 'read'), ('Time', 'time'), ('Pages', 'pages')
+                )],
+                data=rows,
+                on_activate=open_author,
+                style=Pack(flex=1, height=480)
+            ))
+        
+        self.main_content.content = content_box
+    
+    @timed_handler
     def show_statistics(self, widget=None):
         """Show statistics view."""
         self.current_view = 'statistics'
         self.display_statistics()
     
+    @timed_handler
     def show_settings(self, widget=None):
         """Show settings view."""
         self.current_view = 'settings'
         self.display_settings()
     
-    def refresh_book_list(self, status: Optional[str] = None):
-        """Refresh the book list display."""
-        books = self.db_manager.get_books(status=status)
+    @timed_handler
+    def refresh_book_list(self, status: Optional[str] = None, tag: Optional[str] = None,
+                          author: Optional[Dict] = None):
+        """Refresh the book list display, optionally for one shelf or author."""
+        books = self.db_manager.get_books(status=status, sort=self.book_sort, all_tags=[tag] if tag else (),
+                                          author_id=author['id'] if author else None)
         
         # Create content box
         content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
@@ -136,27 +337,48 @@ class Booktrack(toga.App):
             )
             content_box.add(empty_label)
         else:
-            title = f"{'Active' if status == 'Active' else 'All'} Books ({len(books)})"
+            if tag:
+                title = f"Shelf: {tag} ({len(books)})"
+            elif author:
+                title = f"Author: {author['name']} ({len(books)})"
+            else:
+                title = f"{'Active' if status == 'Active' else 'All'} Books ({len(books)})"
             title_label = toga.Label(
                 title,
                 style=Pack(font_size=18, font_weight='bold', margin=(0, 0, 10, 0))
             )
             content_box.add(title_label)
             
+            # Every ordering is read straight from an index
+            def change_sort(widget):
+                self.book_sort = BOOK_SORT_LABELS[widget.value]
+                self.refresh_book_list(status, tag, author)
+            
+            sort_selection = toga.Selection(
+                items=list(BOOK_SORT_LABELS),
+                value=next(label for label, sort in BOOK_SORT_LABELS.items() if sort == self.book_sort),
+                style=Pack(margin=(0, 0, 10, 0))
+            )
+            sort_selection.on_change = change_sort
+            content_box.add(sort_selection)
+            
             for book in books:
                 book_item = BookListItem(
                     book,
                     self.start_reading_session,
                     self.edit_book,
-                    self.delete_book
+                    self.delete_book,
+                    cover_loader=self.cover_loader
                 )
                 content_box.add(book_item.create_item_box())
         
         self.main_content.content = content_box
     
+    @timed_handler
     def display_statistics(self):
         """Display reading statistics."""
         stats = self.db_manager.get_statistics()
+        streaks = self.db_manager.get_reading_streaks()
         
         content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
         
@@ -189,6 +411,13 @@ class Booktrack(toga.App):
         )
         content_box.add(books_label)
         
+        # Reading streaks, counted in local days
+        streak_label = toga.Label(
+            f"Reading Streak: {streaks['current']} days (longest: {streaks['longest']})",
+            style=Pack(font_size=14, margin=5)
+        )
+        content_box.add(streak_label)
+        
         # Books by status
         if stats['books_by_status']:
             status_label = toga.Label(
@@ -222,6 +451,7 @@ class Booktrack(toga.App):
         
         self.main_content.content = content_box
     
+    @timed_handler
     def display_settings(self):
         """Display settings view."""
         content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
@@ -233,6 +463,131 @@ class Booktrack(toga.App):
         )
         content_box.add(title_label)
         
+        # Diagnostics section
+        diagnostics_label = toga.Label(
+            'Diagnostics',
+            style=Pack(font_size=16, font_weight='bold', margin=(10, 0, 10, 0))
+        )
+        content_box.add(diagnostics_label)
+        
+        profiler_button = toga.Button(
+            'Query Profiler',
+            on_press=self.show_query_profiler,
+            style=Pack(margin=10)
+        )
+        content_box.add(profiler_button)
+        
+        # Backup section
+        backup_label = toga.Label(
+            'Backups',
+            style=Pack(font_size=16, font_weight='bold', margin=(10, 0, 10, 0))
+        )
+        content_box.add(backup_label)
+        
+        backup_info_label = toga.Label(
+            'Saves a compressed snapshot of the changes since the last backup.',
+            style=Pack(margin=(0, 0, 10, 0))
+        )
+        content_box.add(backup_info_label)
+        
+        backup_button = toga.Button(
+            'Back Up Now',
+            on_press=self.backup_now,
+            style=Pack(margin=10)
+        )
+        content_box.add(backup_button)
+        
+        # Database file section
+        database_file_label = toga.Label(
+            'Database File',
+            style=Pack(font_size=16, font_weight='bold', margin=(10, 0, 10, 0))
+        )
+        content_box.add(database_file_label)
+        
+        database_file_info_label = toga.Label(
+            'A compact copy of the whole library, much faster to save and load than a JSON export. '
+            'Restoring replaces the current library.',
+            style=Pack(margin=(0, 0, 10, 0))
+        )
+        content_box.add(database_file_info_label)
+        
+        database_file_box = toga.Box(style=Pack(direction=ROW))
+        database_file_box.add(toga.Button(
+            'Export Database File',
+            on_press=self.export_database_file,
+            style=Pack(margin=10)
+        ))
+        database_file_box.add(toga.Button(
+            'Restore Database File',
+            on_press=self.restore_database_file,
+            style=Pack(margin=10)
+        ))
+        content_box.add(database_file_box)
+        
+        # Archive section
+        archive_label = toga.Label(
+            'Archive',
+            style=Pack(font_size=16, font_weight='bold', margin=(10, 0, 10, 0))
+        )
+        content_box.add(archive_label)
+        
+        archive_info_label = toga.Label(
+            'Moves read and abandoned books to a separate archive file. They still count in statistics and exports.',
+            style=Pack(margin=(0, 0, 10, 0))
+        )
+        content_box.add(archive_info_label)
+        
+        archive_box = toga.Box(style=Pack(direction=ROW))
+        archive_box.add(toga.Button(
+            'Archive Finished Books',
+            on_press=self.archive_finished_books,
+            style=Pack(margin=10)
+        ))
+        archive_box.add(toga.Button(
+            'Archived Books',
+            on_press=self.show_archive,
+            style=Pack(margin=10)
+        ))
+        content_box.add(archive_box)
+        
+        # Time zone section
+        time_zone_label = toga.Label(
+            'Time Zone',
+            style=Pack(font_size=16, font_weight='bold', margin=(10, 0, 10, 0))
+        )
+        content_box.add(time_zone_label)
+        
+        time_zone_info_label = toga.Label(
+            'Sessions are counted on the day they started in this time zone. Leave empty for the system time zone.',
+            style=Pack(margin=(0, 0, 10, 0))
+        )
+        content_box.add(time_zone_info_label)
+        
+        self.time_zone_input = toga.TextInput(
+            value=self.db_manager.get_time_zone() or '',
+            placeholder='e.g. Europe/Berlin',
+            style=Pack(margin=5)
+        )
+        content_box.add(self.time_zone_input)
+        
+        # Earlier sessions keep their days, e.g. those read while travelling
+        rebucket_box = toga.Box(style=Pack(direction=ROW, margin=5))
+        self.rebucket_selection = toga.Selection(
+            items=list(REBUCKET_LABELS),
+            style=Pack(margin=(0, 5, 0, 0))
+        )
+        self.rebucket_date_input = toga.DateInput(value=date.today())
+        rebucket_box.add(self.rebucket_selection)
+        rebucket_box.add(self.rebucket_date_input)
+        content_box.add(rebucket_box)
+        
+        time_zone_button = toga.Button(
+            'Apply Time Zone',
+            on_press=self.apply_time_zone,
+            style=Pack(margin=10)
+        )
+        content_box.add(time_zone_button)
+        
         # Delete all data section
         warning_label = toga.Label(
             'Danger Zone',
@@ -255,6 +610,290 @@ class Booktrack(toga.App):
         
         self.main_content.content = content_box
     
+    def show_archive(self, widget=None):
+        """Show the archived books."""
+        self.current_view = 'archive'
+        self.display_archive()
+    
+    @timed_handler
+    def display_archive(self):
+        """Display archived books, which can be restored to the library."""
+        books = self.db_manager.get_archived_books()
+        content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
+        content_box.add(toga.Label(
+            f'Archived Books ({len(books)})',
+            style=Pack(font_size=18, font_weight='bold', margin=(0, 0, 10, 0))
+        ))
+        
+        if not books:
+            content_box.add(toga.Label(
+                'No archived books.',
+                style=Pack(text_align='center', margin=20)
+            ))
+        else:
+            rows = []
+            for book in books:
+                minutes = (book['total_seconds'] or 0) // 60
+                rows.append({
+                    'title': book['title'],
+                    'author': book['author'],
+                    'status': book['status'],
+                    'time': f'{minutes // 60}h {minutes % 60}m',
+                    'book_id': book['id']
+                })
+            table = toga.Table(
+                columns=[AccessorColumn(heading, accessor) for heading, accessor in (
+                    ('Title', 'title'), ('Author', 'author'), ('Status', 'status'), ('Time', 'time')
+                )],
+                data=rows,
+                style=Pack(flex=1, height=480)
+            )
+            content_box.add(table)
+            
+            async def restore(widget):
+                if table.selection is not None:
+                    await self.restore_archived_book(table.selection.book_id)
+            
+            content_box.add(toga.Button(
+                'Restore Selected Book',
+                on_press=restore,
+                style=Pack(margin=10)
+            ))
+        
+        self.main_content.content = content_box
+    
+    def show_query_profiler(self, widget=None):
+        """Show query profiler debug view."""
+        self.current_view = 'query_profiler'
+        self.display_query_profiler()
+    
+    @timed_handler
+    def display_query_profiler(self):
+        """Display the slowest recorded queries and their query plans."""
+        profiler = self.db_manager.profiler
+        content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
+        
+        title_label = toga.Label(
+            'Query Profiler',
+            style=Pack(font_size=18, font_weight='bold', margin=(0, 0, 10, 0))
+        )
+        content_box.add(title_label)
+        
+        # Controls
+        button_box = toga.Box(style=Pack(direction=ROW, margin=(0, 0, 10, 0)))
+        toggle_button = toga.Button(
+            'Stop Profiling' if profiler else 'Start Profiling',
+            on_press=self.toggle_profiling,
+            style=Pack(flex=1, margin=5)
+        )
+        button_box.add(toggle_button)
+        if profiler:
+            export_button = toga.Button(
+                'Export JSON',
+                on_press=self.export_profile,
+                style=Pack(flex=1, margin=5)
+            )
+            reset_button = toga.Button(
+                'Reset',
+                on_press=self.reset_profile,
+                style=Pack(flex=1, margin=5)
+            )
+            button_box.add(export_button)
+            button_box.add(reset_button)
+        content_box.add(button_box)
+        
+        if not profiler:
+            content_box.add(toga.Label(
+                'Profiling is disabled. Start profiling, then use the app to collect query timings.',
+                style=Pack(margin=5)
+            ))
+            self.main_content.content = content_box
+            return
+        
+        content_box.add(toga.Label(
+            f"Connections opened: {profiler.connections_opened}",
+            style=Pack(font_size=12, margin=5)
+        ))
+        
+        # Slowest methods
+        if profiler.methods:
+            content_box.add(toga.Label(
+                'Methods:',
+                style=Pack(font_size=14, font_weight='bold', margin=(10, 0, 5, 0))
+            ))
+            methods = sorted(profiler.methods.items(), key=lambda item: item[1].max_ms, reverse=True)
+            for name, histogram in methods:
+                content_box.add(toga.Label(
+                    f"  {name}: {histogram.count} calls, mean {histogram.mean_ms:.2f} ms, "
+                    f"p95 {histogram.percentile(95):.2f} ms, max {histogram.max_ms:.2f} ms",
+                    style=Pack(font_size=12, margin=(0, 0, 2, 20))
+                ))
+        
+        # Slowest statements with their query plans
+        slowest = profiler.slowest_statements(10)
+        if slowest:
+            content_box.add(toga.Label(
+                'Slowest Queries:',
+                style=Pack(font_size=14, font_weight='bold', margin=(10, 0, 5, 0))
+            ))
+            for stats in slowest:
+                content_box.add(toga.Label(
+                    f"{stats.latency.max_ms:.2f} ms max, {stats.latency.count} runs, {stats.rows} rows",
+                    style=Pack(font_size=12, font_weight='bold', margin=(5, 0, 2, 10))
+                ))
+                content_box.add(toga.Label(
+                    stats.sql,
+                    style=Pack(font_size=10, margin=(0, 0, 2, 20))
+                ))
+                try:
+                    plan = self.db_manager.explain_query_plan(stats.sql, stats.sample_params)
+                except Exception as e:
+                    plan = [f'Plan unavailable: {e}']
+                for line in plan:
+                    content_box.add(toga.Label(
+                        f"  {line}",
+                        style=Pack(font_size=10, margin=(0, 0, 2, 30))
+                    ))
+        
+        self.main_content.content = content_box
+    
+    def toggle_profiling(self, widget):
+        """Enable or disable database profiling."""
+        if self.db_manager.profiler:
+            self.db_manager.disable_profiling()
+        else:
+            self.db_manager.enable_profiling()
+        self.display_query_profiler()
+    
+    def reset_profile(self, widget):
+        """Discard the collected profiling data."""
+        if self.db_manager.profiler:
+            self.db_manager.profiler.reset()
+        self.display_query_profiler()
+    
+    async def export_profile(self, widget):
+        """Export the collected profiling data to a JSON file."""
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_path = os.path.join(os.path.expanduser("~"), f"booktrack_profile_{timestamp}.json")
+            self.db_manager.profiler.export_json(export_path)
+            await self.main_window.info_dialog(
+                'Export Successful',
+                f'Profile exported successfully to:\n{export_path}'
+            )
+        except Exception as e:
+            await self.main_window.error_dialog(
+                'Export Failed',
+                f'Failed to export profile: {str(e)}'
+            )
+    
+    @timed_handler
+    async def backup_now(self, widget):
+        """Create an incremental backup without blocking the interface."""
+        try:
+            backups = BackupManager(self.db_manager)
+            path = await asyncio.get_event_loop().run_in_executor(None, backups.snapshot)
+            if path:
+                message = f'Backup saved to:\n{path}'
+            else:
+                message = 'No changes since the last backup.'
+            await self.main_window.info_dialog('Backup Complete', message)
+        except Exception as e:
+            await self.main_window.error_dialog(
+                'Backup Failed',
+                f'Failed to back up data: {str(e)}'
+            )
+    
+    @timed_handler
+    async def export_database_file(self, widget):
+        """Save a compact copy of the database to the home directory off the UI thread."""
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_path = os.path.join(os.path.expanduser("~"), f"booktrack_export_{timestamp}.db")
+            await asyncio.get_event_loop().run_in_executor(None, self.db_manager.export_database, export_path)
+            await self.main_window.info_dialog(
+                'Export Successful',
+                f'Database exported successfully to:\n{export_path}'
+            )
+        except Exception as e:
+            await self.main_window.error_dialog(
+                'Export Failed',
+                f'Failed to export the database: {str(e)}'
+            )
+    
+    @timed_handler
+    async def restore_database_file(self, widget):
+        """Confirm and replace the library with an exported database file."""
+        path = await self.main_window.open_file_dialog('Restore Database File', file_types=['db'])
+        if not path:
+            return
+        result = await self.main_window.confirm_dialog(
+            'Restore Database File',
+            'This replaces ALL your books, reading sessions, and notes with the contents of the file. Continue?'
+        )
+        if result:
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, self.db_manager.restore_database, str(path))
+                await self.main_window.info_dialog('Restore Complete', f'Library restored from:\n{path}')
+                self.refresh_current_view()
+            except Exception as e:
+                await self.main_window.error_dialog(
+                    'Restore Failed',
+                    f'Failed to restore the database: {str(e)}'
+                )
+    
+    @timed_handler
+    async def archive_finished_books(self, widget):
+        """Move finished books to the archive without blocking the interface."""
+        try:
+            moved = await asyncio.get_event_loop().run_in_executor(None, self.db_manager.archive_books)
+            await self.main_window.info_dialog(
+                'Books Archived',
+                f"Archived {moved['books']} books and {moved['sessions']} reading sessions."
+            )
+        except Exception as e:
+            await self.main_window.error_dialog(
+                'Archive Failed',
+                f'Failed to archive books: {str(e)}'
+            )
+    
+    async def restore_archived_book(self, book_id: int):
+        """Move an archived book back to the library."""
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, self.db_manager.restore_archived_book, book_id)
+            self.refresh_current_view()
+        except Exception as e:
+            await self.main_window.error_dialog(
+                'Restore Failed',
+                f'Failed to restore the book: {str(e)}'
+            )
+    
+    @timed_handler
+    async def apply_time_zone(self, widget):
+        """Change the time zone and re-bucket the chosen sessions off the UI thread."""
+        name = self.time_zone_input.value.strip() or None
+        start = None
+        if REBUCKET_LABELS[self.rebucket_selection.value]:
+            start = self.rebucket_date_input.value.isoformat()
+        
+        def change_time_zone():
+            self.db_manager.set_time_zone(name)
+            return self.db_manager.rebucket_local_days(start=start)
+        
+        try:
+            count = await asyncio.get_event_loop().run_in_executor(None, change_time_zone)
+            await self.main_window.info_dialog(
+                'Time Zone Updated',
+                f"Daily statistics now use {name or 'the system time zone'} ({count} sessions updated)."
+            )
+            self.refresh_current_view()
+        except Exception as e:
+            await self.main_window.error_dialog(
+                'Time Zone Not Changed',
+                f'Failed to change the time zone: {str(e)}'
+            )
+    
+    @timed_handler
     async def confirm_delete_all_data(self, widget):
         """Confirm and delete all application data."""
         result = await self.main_window.confirm_dialog(
@@ -282,6 +921,7 @@ class Booktrack(toga.App):
                     f'Error deleting data: {str(e)}'
                 )
     
+    @timed_handler
     def show_add_book_form(self, widget=None):
         """Show add book form."""
         def on_save(book_data):
@@ -292,7 +932,8 @@ class Booktrack(toga.App):
                         author=book_data['author'],
                         total_pages=book_data['total_pages'],
                         cover_image_url=book_data['cover_image_url'],
-                        notes=book_data['notes']
+                        notes=book_data['notes'],
+                        tags=book_data['tags']
                     )
                     self.show_success_message('Book added successfully!')
                     self.refresh_current_view()
@@ -304,6 +945,7 @@ class Booktrack(toga.App):
         book_form = BookForm(on_save)
         self.main_content.content = book_form.create_form_box()
     
+    @timed_handler
     def edit_book(self, book_data: Dict):
         """Show edit book form."""
         def on_save(updated_data):
@@ -316,7 +958,8 @@ class Booktrack(toga.App):
                         total_pages=updated_data['total_pages'],
                         cover_image_url=updated_data['cover_image_url'],
                         status=updated_data['status'],
-                        notes=updated_data['notes']
+                        notes=updated_data['notes'],
+                        tags=updated_data['tags']
                     )
                     self.show_success_message('Book updated successfully!')
                     self.refresh_current_view()
@@ -325,9 +968,14 @@ class Booktrack(toga.App):
             else:
                 self.refresh_current_view()
         
+        # Book lists leave notes and tags out; load them for the form
+        book_data = dict(book_data,
+                         notes=self.db_manager.get_book_notes(book_data['id']) or '',
+                         tags=self.db_manager.get_book_tags(book_data['id']))
         book_form = BookForm(on_save, book_data)
         self.main_content.content = book_form.create_form_box()
     
+    @timed_handler
     async def delete_book(self, book_data: Dict):
         """Delete a book after confirmation."""
         try:
@@ -343,6 +991,7 @@ class Booktrack(toga.App):
         except Exception as e:
             self.show_error_message(f'Error deleting book: {str(e)}')
     
+    @timed_handler
     def start_reading_session(self, book_data: Dict):
         """Start a reading session for a book."""
         # BR-1: Check book status
@@ -367,6 +1016,7 @@ class Booktrack(toga.App):
         # Start timer update task
         self.timer_task = asyncio.create_task(self.update_timer_display())
     
+    @timed_handler
     def show_timer_interface(self):
         """Show the timer interface."""
         content_box = toga.Box(style=Pack(direction=COLUMN, margin=20, text_align='center'))
@@ -455,6 +1105,7 @@ class Booktrack(toga.App):
         if self.current_timer:
             self.current_timer.resume()
     
+    @timed_handler
     def stop_and_save_session(self, widget):
         """Stop timer and show session log form."""
         if self.current_timer:
@@ -467,6 +1118,7 @@ class Booktrack(toga.App):
             
             self.show_session_log_form(elapsed_seconds)
     
+    @timed_handler
     def cancel_session(self, widget):
         """Cancel the current reading session."""
         if self.current_timer:
@@ -481,6 +1133,7 @@ class Booktrack(toga.App):
         
         self.refresh_current_view()
     
+    @timed_handler
     def edit_book_notes(self, widget):
         """Edit notes for the current book during timer session."""
         if not self.current_book:
@@ -488,7 +1141,7 @@ class Booktrack(toga.App):
         
         # Create a simple note editing dialog
         notes_input = toga.MultilineTextInput(
-            value=self.current_book.get('notes', '') or '',
+            value=self.db_manager.get_book_notes(self.current_book['id']) or '',
             style=Pack(height=200, margin=10)
         )
         
@@ -509,8 +1162,6 @@ class Booktrack(toga.App):
                     book_id=self.current_book['id'],
                     notes=notes_input.value
                 )
-                # Update current book data
-                self.current_book['notes'] = notes_input.value
                 self.show_success_message('Notes updated successfully!')
                 self.show_timer_interface()  # Return to timer interface
             except Exception as e:
@@ -528,6 +1179,7 @@ class Booktrack(toga.App):
         
         self.main_content.content = content_box
     
+    @timed_handler
     def show_session_log_form(self, duration_seconds: int):
         """Show the session logging form."""
         # Calculate session end time
@@ -569,38 +1221,79 @@ class Booktrack(toga.App):
                 self.show_active_books()
             elif self.current_view == 'all_books':
                 self.show_all_books()
+            elif self.current_view == 'shelves':
+                self.show_shelves()
+            elif self.current_view == 'shelf':
+                self.show_shelf(self.current_shelf)
+            elif self.current_view == 'authors':
+                self.show_authors()
+            elif self.current_view == 'author':
+                self.show_author(self.current_author)
             elif self.current_view == 'statistics':
                 self.show_statistics()
             elif self.current_view == 'settings':
                 self.show_settings()
+            elif self.current_view == 'archive':
+                self.show_archive()
+            elif self.current_view == 'query_profiler':
+                self.show_query_profiler()
         else:
             self.show_active_books()
     
+    @timed_handler
     async def export_data(self, widget=None):
-        """Export all data to JSON file."""
+        """Export all data to a compressed JSON file in a background worker."""
+        if self.export_job is not None:
+            return
+        export_path = os.path.join(os.path.expanduser("~"), export_filename('gzip'))
+        loop = asyncio.get_event_loop()
+        previous_content = self.main_content.content
+        
+        content_box = toga.Box(style=Pack(direction=COLUMN, margin=10))
+        content_box.add(toga.Label(
+            'Exporting Data',
+            style=Pack(font_size=18, font_weight='bold', margin=(0, 0, 10, 0))
+        ))
+        progress_bar = toga.ProgressBar(max=1, value=0, style=Pack(margin=(0, 0, 10, 0)))
+        content_box.add(progress_bar)
+        progress_label = toga.Label('Starting...', style=Pack(margin=(0, 0, 10, 0)))
+        content_box.add(progress_label)
+        
+        def show_progress(stats):
+            progress_bar.max = max(stats['total_books'], 1)
+            progress_bar.value = stats['books']
+            progress_label.text = (f"{stats['books']} of {stats['total_books']} books, "
+                                   f"{stats['sessions']} sessions, {stats['bytes'] // 1024} KiB written")
+        
+        # Progress arrives on the worker thread and is handed to the event loop
+        job = ExportJob(self.db_manager, export_path,
+                        progress=lambda stats: loop.call_soon_threadsafe(show_progress, stats))
+        content_box.add(toga.Button(
+            'Cancel',
+            on_press=lambda widget: job.cancel(),
+            style=Pack(margin=10)
+        ))
+        self.main_content.content = content_box
+        
+        self.export_job = job
         try:
-            data = self.db_manager.export_data()
-            
-            # Create export filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"booktrack_export_{timestamp}.json"
-            
-            # Get user's home directory for export
-            export_path = os.path.join(os.path.expanduser("~"), filename)
-            
-            with open(export_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
+            await loop.run_in_executor(None, job.run)
             await self.main_window.info_dialog(
                 'Export Successful',
                 f'Data exported successfully to:\n{export_path}'
             )
-            
+        except ExportCancelled:
+            pass
         except Exception as e:
             await self.main_window.error_dialog(
                 'Export Failed',
                 f'Failed to export data: {str(e)}'
             )
+        finally:
+            self.export_job = None
+            # Leave any view the user moved to during the export in place
+            if self.main_content.content is content_box:
+                self.main_content.content = previous_content
     
     def show_success_message(self, message: str):
         """Show success message to user."""
@@ -0,0 +1,47 @@
+"""
+Archive tier for finished books.
+
+Read and abandoned books, with their sessions, notes and tags, can be moved
+to an archive database kept next to the library (booktrack-archive.db) and
+attached to every connection. The hot tables the app queries all day stay
+small, while exports and all-time statistics read union views over both
+files. An archived book can be moved back at any time.
+
+Usage: python -m booktrack archive [--statuses Read Abandoned] [--older-than DAYS] [--list] [--restore ID] [--db BOOKTRACK_DB]
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from .database import ARCHIVE_STATUSES, DatabaseManager
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for archive."""
+    parser = argparse.ArgumentParser(prog='booktrack archive',
+                                     description='Move finished books to the archive database, or back.')
+    parser.add_argument('--statuses', nargs='+', default=list(ARCHIVE_STATUSES),
+                        help='statuses of the books to archive (default: Read Abandoned)')
+    parser.add_argument('--older-than', type=float, default=None, metavar='DAYS',
+                        help='only archive books not read in this many days')
+    parser.add_argument('--list', action='store_true', help='list the archived books instead')
+    parser.add_argument('--restore', type=int, default=None, metavar='ID',
+                        help='move an archived book back to the library')
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db, archive=True)
+    if args.list:
+        for book in db.get_archived_books():
+            print(f"#{book['id']} {book['title']!r} by {book['author']} ({book['status']}, "
+                  f"{book['session_count']} sessions)")
+    elif args.restore is not None:
+        if not db.restore_archived_book(args.restore):
+            parser.error(f'No archived book with id {args.restore}')
+        print(f"Restored book #{args.restore}")
+    else:
+        before = time.time() - args.older_than * 86400 if args.older_than is not None else None
+        moved = db.archive_books(args.statuses, before=before)
+        print(f"Archived {moved['books']} books and {moved['sessions']} reading sessions to {db.archive_path}")
+    return 0
@@ -0,0 +1,227 @@
+"""
+Online backups and incremental snapshots for the Booktrack database.
+
+A full backup is a page-stepped copy made with SQLite's backup API and
+gzip-compressed. Snapshots store only the rows changed (and the ids deleted)
+since the previous backup or snapshot, using the database change sequence.
+Restoring replays the newest full backup followed by its snapshots. A
+library's archive database is copied with each full backup; moving books
+into or out of the archive forces the next backup to be a full one.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from .database import (ARCHIVE_VERSION_SETTING, DatabaseManager, default_archive_path, refresh_book_totals,
+                       store_author, store_notes, store_tags)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class BackupManager:
+    """Creates, rotates and restores backups of a DatabaseManager's database."""
+
+    def __init__(self, db_manager: DatabaseManager, backup_dir: Optional[str] = None,
+                 keep_full: int = 3):
+        self.db_manager = db_manager
+        if backup_dir is None:
+            backup_dir = os.path.join(os.path.dirname(os.path.abspath(db_manager.db_path)), 'backups')
+        os.makedirs(backup_dir, exist_ok=True)
+        self.backup_dir = backup_dir
+        self.keep_full = keep_full
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.backup_dir, MANIFEST_NAME)
+
+    def list_backups(self) -> List[Dict]:
+        """Return manifest entries, oldest first."""
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)['entries']
+        except FileNotFoundError:
+            return []
+
+    def _save_manifest(self, entries: List[Dict]):
+        tmp_path = self._manifest_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': entries}, f, indent=2)
+        os.replace(tmp_path, self._manifest_path())
+
+    def full_backup(self, pages: int = 256, step_delay: float = 0.0,
+                    progress: Optional[Callable[[int, int, int], None]] = None) -> str:
+        """Copy the database with the backup API and store it gzip-compressed.
+
+        The copy proceeds `pages` pages at a time, sleeping `step_delay`
+        seconds between steps, so other connections are never blocked for
+        the whole copy. Returns the path of the compressed backup.
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        filename = f'full_{timestamp}.db.gz'
+        entry = {'kind': 'full', 'file': filename}
+        source = self.db_manager._open_connection()
+        try:
+            with self._copy_to(filename) as target:
+                source.backup(target, pages=pages, progress=progress, sleep=step_delay)
+                # The copy is self-consistent, so its counter marks what it contains
+                entry['version'] = target.execute('SELECT value FROM change_sequence WHERE id = 1').fetchone()[0]
+                archive_version = target.execute('SELECT value FROM settings WHERE key = ?',
+                                                 (ARCHIVE_VERSION_SETTING,)).fetchone()
+            if self.db_manager.archive_path:
+                entry['archive'] = f'archive_{timestamp}.db.gz'
+                entry['archive_version'] = archive_version[0] if archive_version else None
+                with self._copy_to(entry['archive']) as target:
+                    source.backup(target, pages=pages, name='archive', sleep=step_delay)
+        finally:
+            source.close()
+
+        entries = self.list_backups()
+        entry['created'] = datetime.now().isoformat()
+        entries.append(entry)
+        self._save_manifest(entries)
+        self.rotate()
+        return os.path.join(self.backup_dir, filename)
+
+    @contextmanager
+    def _copy_to(self, filename: str):
+        """Yield a connection to a scratch database, stored gzip-compressed as `filename` on exit."""
+        fd, tmp_path = tempfile.mkstemp(suffix='.db', dir=self.backup_dir)
+        os.close(fd)
+        try:
+            target = sqlite3.connect(tmp_path)
+            try:
+                yield target
+            finally:
+                target.close()
+            with open(tmp_path, 'rb') as src, gzip.open(os.path.join(self.backup_dir, filename), 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        finally:
+            os.unlink(tmp_path)
+
+    def snapshot(self) -> Optional[str]:
+        """Store the rows changed since the last backup as a compressed snapshot.
+
+        Takes a full backup instead when none exists yet, or when books were
+        archived or restored since the last one. Returns the path of the new
+        file, or None when nothing changed.
+        """
+        entries = self.list_backups()
+        full = [entry for entry in entries if entry['kind'] == 'full']
+        if not full:
+            return self.full_backup()
+        if (self.db_manager.archive_path and
+                full[-1].get('archive_version') != self.db_manager.get_setting(ARCHIVE_VERSION_SETTING)):
+            return self.full_backup()
+
+        base_version = entries[-1]['version']
+        changes = self.db_manager.get_changes_since(base_version)
+        if changes['version'] == base_version:
+            return None
+
+        filename = f"snapshot_{base_version}_{changes['version']}.json.gz"
+        with gzip.open(os.path.join(self.backup_dir, filename), 'wt', encoding='utf-8') as f:
+            json.dump(changes, f, separators=(',', ':'))
+
+        entries.append({
+            'kind': 'snapshot',
+            'file': filename,
+            'base_version': base_version,
+            'version': changes['version'],
+            'created': datetime.now().isoformat()
+        })
+        self._save_manifest(entries)
+        return os.path.join(self.backup_dir, filename)
+
+    def rotate(self):
+        """Keep the newest `keep_full` full backups and the snapshots after them."""
+        entries = self.list_backups()
+        full_indexes = [i for i, entry in enumerate(entries) if entry['kind'] == 'full']
+        if len(full_indexes) <= self.keep_full:
+            return
+        first_kept = full_indexes[-self.keep_full]
+        for entry in entries[:first_kept]:
+            for filename in (entry['file'], entry.get('archive')):
+                try:
+                    if filename:
+                        os.unlink(os.path.join(self.backup_dir, filename))
+                except FileNotFoundError:
+                    pass
+        self._save_manifest(entries[first_kept:])
+
+    def restore(self, target_path: str) -> str:
+        """Rebuild the newest backup chain into a new database file.
+
+        A backed-up archive is restored next to it, where a DatabaseManager
+        opened with archive=True finds it.
+        """
+        entries = self.list_backups()
+        full_indexes = [i for i, entry in enumerate(entries) if entry['kind'] == 'full']
+        if not full_indexes:
+            raise FileNotFoundError(f'No full backup found in {self.backup_dir}')
+        chain = entries[full_indexes[-1]:]
+
+        # A leftover WAL from an older file at the target would be replayed into the restore
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(target_path + suffix):
+                os.unlink(target_path + suffix)
+        with gzip.open(os.path.join(self.backup_dir, chain[0]['file']), 'rb') as src, \
+                open(target_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        if chain[0].get('archive'):
+            archive_path = default_archive_path(target_path)
+            for suffix in ('-wal', '-shm'):
+                if os.path.exists(archive_path + suffix):
+                    os.unlink(archive_path + suffix)
+            with gzip.open(os.path.join(self.backup_dir, chain[0]['archive']), 'rb') as src, \
+                    open(archive_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+
+        conn = sqlite3.connect(target_path)
+        try:
+            with conn:
+                for entry in chain[1:]:
+                    with gzip.open(os.path.join(self.backup_dir, entry['file']), 'rt', encoding='utf-8') as f:
+                        apply_changes(conn, json.load(f))
+        finally:
+            conn.close()
+        return target_path
+
+
+def apply_changes(conn: sqlite3.Connection, changes: Dict):
+    """Replay a get_changes_since() result onto a connection."""
+    cursor = conn.cursor()
+    for table in ('books', 'reading_sessions'):
+        for row in changes[table]:
+            row = dict(row)
+            # Book notes and tags are kept in their own tables rather than the books row,
+            # and author ids are local to each database
+            if table == 'books':
+                notes = row.pop('notes', None)
+                tags = row.pop('tags', [])
+                row.pop('author_id', None)
+            columns = ', '.join(row)
+            placeholders = ', '.join('?' for _ in row)
+            cursor.execute(
+                f'INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})',
+                list(row.values())
+            )
+            if table == 'books':
+                store_author(cursor, row['id'], row['author'])
+                store_notes(cursor, row['id'], notes)
+                store_tags(cursor, row['id'], tags)
+    for deleted in changes['deleted']:
+        if deleted['table'] in ('books', 'reading_sessions'):
+            cursor.execute(f"DELETE FROM {deleted['table']} WHERE id = ?", (deleted['row_id'],))
+        if deleted['table'] == 'books':
+            cursor.execute('DELETE FROM book_notes WHERE book_id = ?', (deleted['row_id'],))
+            cursor.execute('DELETE FROM book_tags WHERE book_id = ?', (deleted['row_id'],))
+    # Replayed rows carry totals from when they were saved; derive them afresh
+    refresh_book_totals(cursor)
+    # INSERT OR REPLACE skips delete triggers, so authors left without books are removed here
+    cursor.execute('DELETE FROM authors WHERE id NOT IN (SELECT author_id FROM books WHERE author_id IS NOT NULL)')
@@ -0,0 +1,270 @@
+"""
+Columnar snapshot of reading sessions for analytics.
+
+Sessions are stored as packed fixed-width columns, one native-endian file
+per column (id, book id, start epoch, duration, pages), that SessionColumns
+memory-maps and exposes as memoryviews, or NumPy arrays when NumPy is
+installed, without copying or decoding rows. Scans over millions of
+sessions then run at memory speed instead of SQLite row decoding speed.
+
+A snapshot records the change sequence it reflects. refresh_snapshot()
+reads only the sessions changed and deleted since then: new sessions are
+appended, changed ones patched in place (rows are ordered by id, so a
+binary search finds them), and only deletions rewrite the columns, into a
+new generation of files that meta.json switches to atomically. A snapshot
+built with an archive attached includes the archived sessions, and keeps
+them when they are later archived, since archiving is not a deletion.
+
+Usage: python -m booktrack session-snapshot DIR [--rebuild] [--db BOOKTRACK_DB]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; columns are memoryviews without it
+    numpy = None
+
+from .database import DatabaseManager
+
+SNAPSHOT_FORMAT = 1
+META_NAME = 'meta.json'
+# Column name -> array typecode; sessions without pages store 0 pages
+COLUMNS = (('id', 'q'), ('book_id', 'q'), ('start', 'q'), ('duration', 'i'), ('pages', 'i'))
+_SESSION_SQL = 'id, book_id, COALESCE(start_time, session_date), duration_seconds, COALESCE(pages_read, 0)'
+_CHUNK_ROWS = 50000
+
+
+def _column_path(directory: str, name: str, generation: int) -> str:
+    return os.path.join(directory, f'{name}.{generation}.bin')
+
+
+def _read_meta(directory: str) -> Optional[Dict]:
+    """The snapshot's metadata, or None when there is no usable snapshot."""
+    try:
+        with open(os.path.join(directory, META_NAME), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if (meta.get('format') != SNAPSHOT_FORMAT or meta.get('byteorder') != sys.byteorder or
+            meta.get('columns') != [list(column) for column in COLUMNS]):
+        return None
+    for name, typecode in COLUMNS:
+        path = _column_path(directory, name, meta['generation'])
+        if not os.path.exists(path) or os.path.getsize(path) < meta['rows'] * array(typecode).itemsize:
+            return None
+    return meta
+
+
+def _write_meta(directory: str, generation: int, rows: int, version: int):
+    tmp_path = os.path.join(directory, META_NAME + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': SNAPSHOT_FORMAT, 'byteorder': sys.byteorder,
+                   'columns': [list(column) for column in COLUMNS],
+                   'generation': generation, 'rows': rows, 'version': version}, f)
+    os.replace(tmp_path, os.path.join(directory, META_NAME))
+
+
+def _write_generation(directory: str, generation: int, chunks: Iterable[List[Tuple]]) -> int:
+    """Write rows, given in chunks, as a new generation of column files; returns the row count."""
+    files = [open(_column_path(directory, name, generation), 'wb') for name, _ in COLUMNS]
+    rows = 0
+    try:
+        for chunk in chunks:
+            for (_, typecode), f, values in zip(COLUMNS, files, zip(*chunk)):
+                array(typecode, values).tofile(f)
+            rows += len(chunk)
+    finally:
+        for f in files:
+            f.close()
+    return rows
+
+
+def _remove_other_generations(directory: str, generation: int):
+    keep = {os.path.basename(_column_path(directory, name, generation)) for name, _ in COLUMNS}
+    for filename in os.listdir(directory):
+        if filename.endswith('.bin') and filename not in keep:
+            os.unlink(os.path.join(directory, filename))
+
+
+def _load_columns(directory: str, meta: Dict) -> List[array]:
+    columns = []
+    for name, typecode in COLUMNS:
+        values = array(typecode)
+        with open(_column_path(directory, name, meta['generation']), 'rb') as f:
+            values.fromfile(f, meta['rows'])
+        columns.append(values)
+    return columns
+
+
+def refresh_snapshot(db_manager: DatabaseManager, directory: str, rebuild: bool = False) -> Dict:
+    """Bring the snapshot in `directory` up to date with the database.
+
+    Builds it from scratch when there is none (or with rebuild). Returns the
+    version and row count reached, how many rows were appended, updated and
+    deleted, and whether the snapshot was rebuilt.
+    """
+    os.makedirs(directory, exist_ok=True)
+    meta = None if rebuild else _read_meta(directory)
+    result = {'appended': 0, 'updated': 0, 'deleted': 0, 'rebuilt': meta is None}
+    with db_manager._connect() as conn:
+        cursor = conn.cursor()
+        # Rows and the version they reflect come from one snapshot of the database
+        cursor.execute('BEGIN')
+        cursor.execute('SELECT value FROM change_sequence WHERE id = 1')
+        version = cursor.fetchone()[0]
+
+        if meta is None:
+            generation = 1 + max([int(name.split('.')[1]) for name in os.listdir(directory)
+                                  if name.endswith('.bin')] or [0])
+            cursor.execute(f"SELECT {_SESSION_SQL} FROM {db_manager._source('reading_sessions')} ORDER BY id")
+            rows = _write_generation(directory, generation, iter(lambda: cursor.fetchmany(_CHUNK_ROWS), []))
+            conn.commit()
+            _write_meta(directory, generation, rows, version)
+            _remove_other_generations(directory, generation)
+            result.update(version=version, rows=rows, appended=rows)
+            return result
+
+        since = meta['version']
+        cursor.execute(f'''
+            SELECT {_SESSION_SQL} FROM reading_sessions
+            WHERE change_seq > ? AND change_seq <= ?
+            ORDER BY id
+        ''', (since, version))
+        changed = cursor.fetchall()
+        cursor.execute('''
+            SELECT row_id FROM tombstones
+            WHERE change_seq > ? AND change_seq <= ? AND table_name = 'reading_sessions'
+        ''', (since, version))
+        deleted = {row[0] for row in cursor.fetchall()}
+        conn.commit()
+
+    generation, rows = meta['generation'], meta['rows']
+    with SessionColumns(directory, meta) as current:
+        ids = current.id
+        positions = {}
+        inserts = []
+        for row in changed:
+            position = bisect_left(ids, row[0])
+            if position < rows and ids[position] == row[0]:
+                positions[position] = row
+            else:
+                inserts.append(row)
+        appends_only = not inserts or inserts[0][0] > (ids[rows - 1] if rows else 0)
+        deleted_positions = {position for position in (bisect_left(ids, row_id) for row_id in deleted)
+                             if position < rows and ids[position] in deleted}
+
+    if deleted_positions or not appends_only:
+        # Rewrite the columns into a new generation, leaving the current one intact
+        columns = _load_columns(directory, meta)
+        for position, row in positions.items():
+            for values, value in zip(columns, row):
+                values[position] = value
+        merged = sorted([row for position, row in enumerate(zip(*columns)) if position not in deleted_positions]
+                        + inserts)
+        generation += 1
+        rows = _write_generation(directory, generation, [merged] if merged else [])
+        _write_meta(directory, generation, rows, version)
+        _remove_other_generations(directory, generation)
+    else:
+        # Patch changed rows in place and append new ones; until meta.json
+        # records the new version, a repeated refresh applies them again
+        for index, (name, typecode) in enumerate(COLUMNS):
+            itemsize = array(typecode).itemsize
+            with open(_column_path(directory, name, generation), 'r+b') as f:
+                f.truncate(rows * itemsize)
+                for position, row in positions.items():
+                    f.seek(position * itemsize)
+                    f.write(array(typecode, [row[index]]).tobytes())
+                f.seek(rows * itemsize)
+                array(typecode, [row[index] for row in inserts]).tofile(f)
+        rows += len(inserts)
+        _write_meta(directory, generation, rows, version)
+    result.update(version=version, rows=rows, appended=len(inserts), updated=len(positions),
+                  deleted=len(deleted_positions))
+    return result
+
+
+class SessionColumns:
+    """Read-only, memory-mapped view of a session snapshot.
+
+    Each column is an attribute (id, book_id, start, duration, pages) holding
+    a memoryview over the mapped file; use as a context manager, or call
+    close(), to release the mappings.
+    """
+
+    def __init__(self, directory: str, meta: Optional[Dict] = None):
+        meta = meta or _read_meta(directory)
+        if meta is None:
+            raise FileNotFoundError(f'No session snapshot in {directory}; run refresh_snapshot() first')
+        self.version = meta['version']
+        self.rows = meta['rows']
+        self._maps = []
+        for name, typecode in COLUMNS:
+            if self.rows:
+                with open(_column_path(directory, name, meta['generation']), 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps.append(mapped)
+                view = memoryview(mapped).cast(typecode)[:self.rows]
+            else:
+                view = memoryview(array(typecode))
+            setattr(self, name, view)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def numpy(self) -> Dict[str, 'numpy.ndarray']:
+        """The columns as zero-copy NumPy arrays; requires NumPy."""
+        if numpy is None:
+            raise RuntimeError('NumPy is not installed')
+        return {name: numpy.frombuffer(getattr(self, name), dtype=typecode) for name, typecode in COLUMNS}
+
+    def seconds_by_book(self) -> Dict[int, int]:
+        """Total reading seconds per book id, computed from the columns."""
+        if numpy is not None:
+            arrays = self.numpy()
+            books, inverse = numpy.unique(arrays['book_id'], return_inverse=True)
+            totals = numpy.bincount(inverse, weights=arrays['duration'])
+            return {int(book): int(total) for book, total in zip(books, totals)}
+        totals = {}
+        for book_id, duration in zip(self.book_id, self.duration):
+            totals[book_id] = totals.get(book_id, 0) + duration
+        return totals
+
+    def close(self):
+        """Release the memoryviews and unmap the files."""
+        for name, _ in COLUMNS:
+            getattr(self, name).release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for session-snapshot."""
+    parser = argparse.ArgumentParser(prog='booktrack session-snapshot',
+                                     description='Create or refresh the columnar session snapshot.')
+    parser.add_argument('directory', help='snapshot directory')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the snapshot from scratch')
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    args = parser.parse_args(argv)
+
+    result = refresh_snapshot(DatabaseManager(args.db, read_only=True, archive=True), args.directory,
+                              rebuild=args.rebuild)
+    action = 'Rebuilt' if result['rebuilt'] else 'Refreshed'
+    print(f"{action} {args.directory}: {result['rows']} sessions at change {result['version']} "
+          f"({result['appended']} appended, {result['updated']} updated, {result['deleted']} deleted)")
+    return 0
@@ -0,0 +1,234 @@
+"""
+Cover image loading with a content-addressed disk cache.
+
+Covers are fetched in the background with bounded concurrency, stored once
+per distinct image (keyed by the SHA-256 of its bytes), and shrunk to
+list-row thumbnails when Pillow is installed. The cache evicts the least
+recently used files once it grows past its size limit. Failed downloads
+are retried after a delay that doubles with each failure.
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from typing import Callable, Coroutine, Dict, Optional, Set, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; originals are used as thumbnails
+    Image = None
+
+# Width and height of the cover shown in BookListItem
+THUMBNAIL_SIZE = (48, 72)
+MAX_COVER_BYTES = 10 * 1024 * 1024
+# Longest wait before a failed cover is downloaded again
+MAX_RETRY_DELAY = 6 * 3600
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_url(url: str, timeout: float = 10.0) -> bytes:
+    """Download a cover image over http or https."""
+    # Cover URLs come from imported and synced data, so other schemes
+    # (file:, ftp:, data:) are refused rather than read
+    if urllib.parse.urlsplit(url).scheme.lower() not in ('http', 'https'):
+        raise ValueError(f'Unsupported cover URL: {url}')
+    request = urllib.request.Request(url, headers={'User-Agent': 'Booktrack'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        data = response.read(MAX_COVER_BYTES + 1)
+    if len(data) > MAX_COVER_BYTES:
+        raise ValueError(f'Cover image too large: {url}')
+    return data
+
+
+class CoverCache:
+    """Content-addressed on-disk cache of cover images and thumbnails."""
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 50 * 1024 * 1024,
+                 thumbnail_size: Tuple[int, int] = THUMBNAIL_SIZE):
+        if cache_dir is None:
+            cache_dir = os.path.expanduser("~/.booktrack/covers")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.thumbnail_size = thumbnail_size
+        for subdir in ('urls', 'objects', 'thumbs'):
+            os.makedirs(os.path.join(cache_dir, subdir), exist_ok=True)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+    
+    def _url_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, 'urls', self._digest(url.encode('utf-8')))
+    
+    def _object_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, 'objects', content_hash)
+    
+    def _thumb_path(self, content_hash: str) -> str:
+        width, height = self.thumbnail_size
+        return os.path.join(self.cache_dir, 'thumbs', f'{content_hash}_{width}x{height}.png')
+    
+    def lookup(self, url: str) -> Optional[str]:
+        """Return the cached thumbnail path for a URL, or None."""
+        try:
+            with open(self._url_path(url), 'r', encoding='ascii') as f:
+                content_hash = f.read().strip()
+        except FileNotFoundError:
+            return None
+        for path in (self._thumb_path(content_hash), self._object_path(content_hash)):
+            if os.path.exists(path):
+                # mtime doubles as the LRU access time
+                os.utime(path)
+                return path
+        return None
+    
+    def store(self, url: str, data: bytes) -> str:
+        """Store downloaded bytes for a URL and return the thumbnail path."""
+        content_hash = self._digest(data)
+        with self._lock:
+            path = self._make_thumbnail(content_hash, data)
+            tmp_path = self._url_path(url) + '.tmp'
+            with open(tmp_path, 'w', encoding='ascii') as f:
+                f.write(content_hash)
+            os.replace(tmp_path, self._url_path(url))
+            self.evict()
+        return path
+    
+    def _make_thumbnail(self, content_hash: str, data: bytes) -> str:
+        thumb_path = self._thumb_path(content_hash)
+        if os.path.exists(thumb_path):
+            return thumb_path
+        if Image is not None:
+            try:
+                with Image.open(io.BytesIO(data)) as image:
+                    image.thumbnail(self.thumbnail_size)
+                    image.save(thumb_path + '.tmp', format='PNG')
+                os.replace(thumb_path + '.tmp', thumb_path)
+                return thumb_path
+            except Exception:
+                # Not an image Pillow understands; keep the original bytes
+                pass
+        object_path = self._object_path(content_hash)
+        if not os.path.exists(object_path):
+            with open(object_path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(object_path + '.tmp', object_path)
+        return object_path
+    
+    def size(self) -> int:
+        """Total bytes of cached images."""
+        total = 0
+        for subdir in ('objects', 'thumbs'):
+            directory = os.path.join(self.cache_dir, subdir)
+            for name in os.listdir(directory):
+                total += os.path.getsize(os.path.join(directory, name))
+        return total
+    
+    def evict(self):
+        """Delete least recently used images until the cache fits max_bytes."""
+        files = []
+        for subdir in ('objects', 'thumbs'):
+            directory = os.path.join(self.cache_dir, subdir)
+            for name in os.listdir(directory):
+                stat = os.stat(os.path.join(directory, name))
+                files.append((stat.st_mtime, stat.st_size, os.path.join(directory, name)))
+        total = sum(size for _, size, _ in files)
+        evicted = set()
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.unlink(path)
+            total -= size
+            evicted.add(os.path.basename(path).split('_')[0])
+        if not evicted:
+            return
+        
+        # Drop the URL entries whose image is gone entirely
+        urls_dir = os.path.join(self.cache_dir, 'urls')
+        for name in os.listdir(urls_dir):
+            path = os.path.join(urls_dir, name)
+            try:
+                with open(path, 'r', encoding='ascii') as f:
+                    content_hash = f.read().strip()
+            except (FileNotFoundError, UnicodeDecodeError):
+                continue
+            if (content_hash in evicted and not os.path.exists(self._thumb_path(content_hash))
+                    and not os.path.exists(self._object_path(content_hash))):
+                os.unlink(path)
+
+
+class CoverLoader:
+    """Loads covers in the background with bounded concurrency."""
+    
+    def __init__(self, cache: CoverCache, max_concurrency: int = 4,
+                 fetch: Callable[[str], bytes] = fetch_url, retry_after: float = 60.0):
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.fetch = fetch
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Background tasks are referenced here until done, so they are not collected mid-download
+        self._tasks: Set[asyncio.Future] = set()
+        # URL -> error of its last failed download; retried once its delay has passed
+        self.failed: Dict[str, str] = {}
+        self.retry_after = retry_after
+        self._failures: Dict[str, Tuple[int, float]] = {}
+    
+    def start(self, coroutine: Coroutine) -> asyncio.Future:
+        """Run a coroutine in the background, keeping it referenced until it finishes."""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+    
+    def _task_done(self, task: asyncio.Future):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning('Cover task failed', exc_info=task.exception())
+    
+    def cached(self, url: str) -> Optional[str]:
+        """Return the thumbnail path if the cover is already cached."""
+        return self.cache.lookup(url)
+    
+    async def load(self, url: str) -> Optional[str]:
+        """Return the thumbnail path for a URL, downloading it if needed.
+        
+        Concurrent requests for the same URL share one download. Returns
+        None if the cover cannot be fetched.
+        """
+        path = self.cache.lookup(url)
+        if path is not None:
+            return path
+        if url in self.failed and time.monotonic() < self._failures[url][1]:
+            return None
+        pending = self._pending.get(url)
+        if pending is None:
+            pending = asyncio.ensure_future(self._download(url))
+            self._pending[url] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(url, None))
+        return await asyncio.shield(pending)
+    
+    async def _download(self, url: str) -> Optional[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_event_loop()
+        async with self._semaphore:
+            try:
+                data = await loop.run_in_executor(None, self.fetch, url)
+                path = await loop.run_in_executor(None, self.cache.store, url, data)
+            except Exception as e:
+                attempts = self._failures.get(url, (0, 0.0))[0] + 1
+                delay = min(self.retry_after * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+                self._failures[url] = (attempts, time.monotonic() + delay)
+                self.failed[url] = str(e)
+                return None
+        self.failed.pop(url, None)
+        self._failures.pop(url, None)
+        return path
@@ -1,13 +1,292 @@
 import sqlite3
+import functools
+import math
 import os
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+import random
+import re
+import threading
+import time
+import unicodedata
+import uuid
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from pathlib import Path
+from typing import Iterator, List, Dict, Optional, Sequence, Tuple, Union
+
+from .profiling import ProfilingConnection, QueryProfiler, profiled
+from .timezones import TIME_ZONE_SETTING, local_day, resolve_time_zone
+
+# Current time in epoch milliseconds, usable inside SQL statements and triggers
+NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+# Pass as db_path to keep the database in RAM
+MEMORY = ':memory:'
+
+# Stored in PRAGMA user_version by init_database(); bump when the schema changes
+SCHEMA_VERSION = 1
+
+# Finished books that archive_books() moves out of the hot database
+ARCHIVE_STATUSES = ('Read', 'Abandoned')
+# Settings key bumped whenever books move into or out of the archive
+ARCHIVE_VERSION_SETTING = 'archive_version'
+
+# Columns of the temp.all_books / temp.all_reading_sessions union views
+_ARCHIVE_VIEWS = {
+    'books': 'id, title, author, total_pages, cover_image_url, status, created_at, '
+             'total_seconds, total_pages_read, session_count, last_session_at',
+    'reading_sessions': 'id, book_id, duration_seconds, pages_read, notes, start_time, end_time, '
+                        'session_date, local_day',
+    'book_notes': 'book_id, body'
+}
+
+# Backoff between retries of a write transaction that found the database locked
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+# A session's day in the configured time zone, via the local_day() SQL function
+LOCAL_DAY_SQL = "local_day(COALESCE(start_time, session_date))"
+
+# Book notes live out-of-row in book_notes; longer ones are stored zlib-compressed
+NOTES_COMPRESS_THRESHOLD = 512
+BOOK_NOTES_SQL = "unpack_notes((SELECT body FROM book_notes WHERE book_id = books.id))"
+
+BOOK_COLUMNS = ('id', 'title', 'author', 'author_id', 'total_pages', 'cover_image_url', 'status', 'notes',
+                'created_at', 'total_seconds', 'total_pages_read', 'session_count', 'last_session_at')
+# What book lists need by default; notes are loaded on demand
+BOOK_LIST_COLUMNS = tuple(column for column in BOOK_COLUMNS if column != 'notes')
+
+# Share of the book read; books without a page count sort after all others
+PROGRESS_SQL = "COALESCE(CAST(total_pages_read AS REAL) / total_pages, 1e300)"
+
+# get_books() orderings, each served by an index (with and without a status filter)
+BOOK_SORTS = {
+    'created': 'created_at DESC',
+    'recently_read': 'last_session_at DESC',
+    'most_read': 'total_seconds DESC',
+    'least_progress': f'{PROGRESS_SQL} ASC'
+}
+
+# get_authors() orderings
+AUTHOR_SORTS = {
+    'name': 'a.key',
+    'most_read': 'total_seconds DESC, a.key',
+    'most_books': 'book_count DESC, a.key'
+}
+
+# Session result keys -> SQL expressions
+_SESSION_SELECT = {
+    'id': 'rs.id',
+    'book_id': 'rs.book_id',
+    'duration_seconds': 'rs.duration_seconds',
+    'pages_read': 'rs.pages_read',
+    'notes': 'rs.notes',
+    'session_date': 'rs.session_date',
+    'start_time': 'rs.start_time',
+    'end_time': 'rs.end_time',
+    'book_title': 'b.title',
+    'book_author': 'b.author'
+}
+SESSION_COLUMNS = tuple(_SESSION_SELECT)
+SESSION_LIST_COLUMNS = tuple(column for column in SESSION_COLUMNS if column != 'notes')
+
+
+def to_epoch(value) -> Optional[int]:
+    """Convert a datetime, ISO 8601 string or epoch number to epoch seconds (UTC).
+    
+    Naive datetimes and strings without an offset are taken as local time.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if not isinstance(value, (int, float)):
+        try:
+            value = float(str(value).strip())
+        except ValueError:
+            pass
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError(f'Invalid date/time: {value}')
+        return int(value)
+    text = str(value).strip()
+    try:
+        # fromisoformat() only accepts a trailing Z from Python 3.11
+        return int(datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        raise ValueError(f'Invalid date/time: {value}')
+
+
+def epoch_to_local_iso(value: Optional[int]) -> Optional[str]:
+    """Format epoch seconds as a local ISO 8601 string."""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value).isoformat(timespec='seconds')
+
+
+def epoch_to_utc_text(value: Optional[int]) -> Optional[str]:
+    """Format epoch seconds as a UTC 'YYYY-MM-DD HH:MM:SS' string."""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def pack_notes(notes: Optional[str]):
+    """Encode notes for book_notes: text, or a zlib-compressed blob when long."""
+    if not notes:
+        return None
+    encoded = notes.encode('utf-8')
+    if len(encoded) >= NOTES_COMPRESS_THRESHOLD:
+        compressed = zlib.compress(encoded)
+        if len(compressed) < len(encoded):
+            return compressed
+    return notes
+
+
+def unpack_notes(body) -> Optional[str]:
+    """Decode a value written by pack_notes()."""
+    if isinstance(body, bytes):
+        return zlib.decompress(body).decode('utf-8')
+    return body
+
+
+def store_notes(cursor: sqlite3.Cursor, book_id: int, notes: Optional[str]):
+    """Write a book's notes out-of-row, removing them when empty."""
+    body = pack_notes(notes)
+    if body is None:
+        cursor.execute('DELETE FROM book_notes WHERE book_id = ?', (book_id,))
+    else:
+        cursor.execute('''
+            INSERT INTO book_notes (book_id, body) VALUES (?, ?)
+            ON CONFLICT(book_id) DO UPDATE SET body = excluded.body
+        ''', (book_id, body))
+
+
+def clean_tags(tags: Sequence[str]) -> List[str]:
+    """Strip tag names and drop blanks and case-insensitive duplicates."""
+    names = {}
+    for tag in tags:
+        name = tag.strip()
+        if name:
+            names.setdefault(name.casefold(), name)
+    return list(names.values())
+
+
+def store_tags(cursor: sqlite3.Cursor, book_id: int, tags: Sequence[str]):
+    """Replace a book's tags, creating tags that do not exist yet."""
+    names = clean_tags(tags)
+    if not names:
+        cursor.execute('DELETE FROM book_tags WHERE book_id = ?', (book_id,))
+        return
+    placeholders = ', '.join('?' for _ in names)
+    cursor.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)', [(name,) for name in names])
+    cursor.execute(f'''
+        DELETE FROM book_tags
+        WHERE book_id = ? AND tag_id NOT IN (SELECT id FROM tags WHERE name IN ({placeholders}))
+    ''', [book_id] + names)
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO book_tags (book_id, tag_id)
+        SELECT ?, id FROM tags WHERE name IN ({placeholders})
+    ''', [book_id] + names)
+
+
+def load_tags(cursor: sqlite3.Cursor, book_ids: Sequence[int]) -> Dict[int, List[str]]:
+    """Map book ids to their tag names, sorted."""
+    tags = {book_id: [] for book_id in book_ids}
+    book_ids = list(tags)
+    # Stay below SQLite's limit on bound parameters
+    for i in range(0, len(book_ids), 500):
+        chunk = book_ids[i:i + 500]
+        cursor.execute(f'''
+            SELECT bt.book_id, t.name
+            FROM book_tags bt JOIN tags t ON t.id = bt.tag_id
+            WHERE bt.book_id IN ({', '.join('?' for _ in chunk)})
+            ORDER BY t.name COLLATE NOCASE
+        ''', chunk)
+        for book_id, name in cursor.fetchall():
+            tags[book_id].append(name)
+    return tags
+
+
+def fold_author(name: str) -> str:
+    """Author matching key: diacritics removed, case-folded, whitespace collapsed."""
+    if name.isascii():
+        return ' '.join(name.casefold().split())
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def store_author(cursor: sqlite3.Cursor, book_id: int, author: str):
+    """Link a book to its author row, creating the author on first use."""
+    key = fold_author(author)
+    cursor.execute('INSERT OR IGNORE INTO authors (key, name) VALUES (?, ?)', (key, ' '.join(author.split())))
+    cursor.execute('UPDATE books SET author_id = (SELECT id FROM authors WHERE key = ?) WHERE id = ?',
+                   (key, book_id))
+
+
+def link_authors(cursor: sqlite3.Cursor):
+    """Link every book without an author row, set-based; needs the fold_author() SQL function."""
+    cursor.execute('''
+        INSERT OR IGNORE INTO authors (key, name)
+        SELECT fold_author(author), author FROM books WHERE author_id IS NULL ORDER BY id
+    ''')
+    cursor.execute('''
+        UPDATE books SET author_id = (SELECT id FROM authors WHERE key = fold_author(books.author))
+        WHERE author_id IS NULL
+    ''')
+
+
+def refresh_book_totals(cursor: sqlite3.Cursor):
+    """Recompute every book's reading totals from its sessions."""
+    cursor.execute('''
+        UPDATE books SET
+            total_seconds = (SELECT COALESCE(SUM(duration_seconds), 0)
+                             FROM reading_sessions WHERE book_id = books.id),
+            total_pages_read = (SELECT COALESCE(SUM(pages_read), 0)
+                                FROM reading_sessions WHERE book_id = books.id),
+            session_count = (SELECT COUNT(*) FROM reading_sessions WHERE book_id = books.id),
+            last_session_at = (SELECT MAX(session_date) FROM reading_sessions WHERE book_id = books.id)
+    ''')
+
+
+def default_archive_path(db_path: str) -> str:
+    """The archive file kept next to a database file."""
+    root, _ = os.path.splitext(db_path)
+    return f'{root}-archive.db'
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_busy(method):
+    """Decorator retrying a DatabaseManager write while another process holds the lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt >= self.write_retries:
+                    raise
+            # Bounded exponential backoff with jitter so writers do not retry in lockstep
+            delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY)
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            attempt += 1
+    
+    return wrapper
 
 
 class DatabaseManager:
     """Manages SQLite database operations for the Booktrack application."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, profile: bool = False,
+                 reuse_connection: bool = False, read_only: bool = False,
+                 busy_timeout: float = 5.0, write_retries: int = 5,
+                 persist_path: Optional[str] = None, archive: Optional[bool] = None):
         if db_path is None:
             # Store in app's private data directory
             app_dir = os.path.expanduser("~/.booktrack")
@@ -15,11 +294,355 @@ class DatabaseManager:
             db_path = os.path.join(app_dir, "booktrack.db")
         
         self.db_path = db_path
+        self.profiler: Optional[QueryProfiler] = QueryProfiler() if profile else None
+        # With reuse_connection one connection is kept open and shared by all calls
+        self.reuse_connection = reuse_connection
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # Set while snapshot() holds a read transaction open on the reused connection
+        self._in_snapshot = False
+        self.last_used = time.monotonic()
+        # Seconds a statement waits for another writer's lock, and how often a
+        # write transaction is retried after that
+        self.busy_timeout = busy_timeout
+        self.write_retries = write_retries
+        # Configured time zone for day bucketing (None is the system zone) and
+        # the setting value it was resolved from
+        self._time_zone: Optional[tzinfo] = None
+        self._time_zone_name: Optional[str] = None
+        self._time_zone_loaded = False
+        # Read-only managers open an existing file with a mode=ro URI; a file
+        # with an older schema is first migrated once by a writable manager
+        self.read_only = read_only
+        # An in-memory database is a named shared-cache database, so all of this
+        # manager's connections see the same data. It lives while the keepalive
+        # connection is open and can be saved to persist_path on shutdown().
+        self.in_memory = db_path == MEMORY
+        self.persist_path = persist_path
+        self._keepalive: Optional[sqlite3.Connection] = None
+        if self.in_memory:
+            self._memory_uri = f'file:booktrack-{uuid.uuid4().hex}?mode=memory&cache=shared'
+            self._keepalive = sqlite3.connect(self._memory_uri, uri=True, check_same_thread=False)
+        # With archive, finished books can be moved to a second database file,
+        # attached to every connection as "archive". Unless archive is False,
+        # an archive that already exists is attached anyway, so that no reader
+        # or writer of the library leaves the archived books out.
+        self.archive_path: Optional[str] = None
+        if archive is not False and not self.in_memory:
+            archive_path = default_archive_path(db_path)
+            if (archive and not read_only) or os.path.exists(archive_path):
+                self.archive_path = archive_path
+        if not read_only:
+            self.init_database()
+        elif not self.in_memory and os.path.exists(db_path):
+            self._upgrade_for_reading()
+    
+    def _upgrade_for_reading(self):
+        """Migrate an older file through a writable manager before reading it read-only."""
+        conn = sqlite3.connect(Path(self.db_path).resolve().as_uri() + '?mode=ro', uri=True,
+                               timeout=self.busy_timeout)
+        try:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+        finally:
+            conn.close()
+        if version >= SCHEMA_VERSION:
+            return
+        try:
+            DatabaseManager(self.db_path, busy_timeout=self.busy_timeout, write_retries=self.write_retries)
+        except sqlite3.Error as e:
+            raise sqlite3.OperationalError(
+                f'{self.db_path} uses an older Booktrack schema and could not be upgraded ({e}); '
+                f'open it once with write access to upgrade it'
+            ) from e
+    
+    def _open_connection(self, instrument: bool = True) -> sqlite3.Connection:
+        """Open a new connection, instrumented when profiling is enabled."""
+        if self.in_memory:
+            database = self._memory_uri
+        else:
+            # Always connect by URI so ATTACH statements may use URI filenames too
+            database = Path(self.db_path).resolve().as_uri()
+            if self.read_only:
+                database += '?mode=ro'
+        options = {'check_same_thread': not self.reuse_connection, 'uri': True,
+                   'timeout': self.busy_timeout}
+        if self.profiler is None or not instrument:
+            conn = sqlite3.connect(database, **options)
+        else:
+            conn = sqlite3.connect(database, factory=ProfilingConnection, **options)
+            conn.profiler = self.profiler
+            self.profiler.attach(conn)
+        conn.create_function('local_day', 1, self._sql_local_day)
+        conn.create_function('pack_notes', 1, pack_notes)
+        conn.create_function('unpack_notes', 1, unpack_notes)
+        conn.create_function('fold_author', 1, fold_author, deterministic=True)
+        if self.archive_path:
+            archive_uri = Path(self.archive_path).resolve().as_uri()
+            if self.read_only:
+                archive_uri += '?mode=ro'
+            conn.execute('ATTACH DATABASE ? AS archive', (archive_uri,))
+            self._create_archive_views(conn)
+        return conn
+    
+    def _create_archive_views(self, conn: sqlite3.Connection):
+        """Create the per-connection union views over the hot and archived rows."""
+        tables = {row[0] for row in conn.execute("SELECT name FROM archive.sqlite_master WHERE type = 'table'")}
+        if not set(_ARCHIVE_VIEWS) <= tables:
+            # A new archive; init_database() creates its tables and calls this again
+            return
+        for table, columns in _ARCHIVE_VIEWS.items():
+            conn.execute(f'''
+                CREATE TEMP VIEW IF NOT EXISTS all_{table} AS
+                SELECT {columns} FROM main.{table}
+                UNION ALL
+                SELECT {columns} FROM archive.{table}
+            ''')
+    
+    def _source(self, table: str) -> str:
+        """The table to read for all-time results: a union view when an archive is attached."""
+        return f'temp.all_{table}' if self.archive_path else table
+    
+    def _sql_local_day(self, epoch: Optional[int]) -> Optional[str]:
+        """SQL function local_day(epoch): the day in the configured time zone."""
+        return local_day(epoch, self._time_zone)
+    
+    def _use_time_zone(self, name: Optional[str]):
+        if self._time_zone_loaded and name == self._time_zone_name:
+            return
+        try:
+            self._time_zone = resolve_time_zone(name)
+        except ValueError:
+            # Zone data unavailable on this system; fall back to the system zone
+            self._time_zone = None
+        self._time_zone_name = name
+        self._time_zone_loaded = True
+    
+    def _zone(self, cursor: Optional[sqlite3.Cursor] = None) -> Optional[tzinfo]:
+        """The configured time zone, as the settings hold it now.
+        
+        The setting is read again on every call, so a zone changed by another
+        manager or process on the same file is used from then on; pass the
+        cursor of a write transaction to read it within that transaction.
+        """
+        if cursor is None:
+            self._use_time_zone(self.get_setting(TIME_ZONE_SETTING))
+        else:
+            cursor.execute('SELECT value FROM settings WHERE key = ?', (TIME_ZONE_SETTING,))
+            row = cursor.fetchone()
+            self._use_time_zone(row[0] if row else None)
+        return self._time_zone
+    
+    @contextmanager
+    def _connect(self):
+        """Yield a connection, committing on success and rolling back on error."""
+        self.last_used = time.monotonic()
+        if self.reuse_connection:
+            with self._lock:
+                if self._conn is None:
+                    self._conn = self._open_connection()
+                if self._in_snapshot:
+                    # The snapshot's transaction stays open until its block ends
+                    yield self._conn
+                else:
+                    with self._conn:
+                        yield self._conn
+        else:
+            conn = self._open_connection()
+            try:
+                with conn:
+                    yield conn
+            finally:
+                conn.close()
+    
+    @contextmanager
+    def _transaction(self):
+        """Yield a connection in a write transaction that takes the write lock up front."""
+        with self._connect() as conn:
+            if not conn.in_transaction:
+                # A deferred transaction that later upgrades to a write lock can
+                # fail as busy without waiting; IMMEDIATE waits at BEGIN instead
+                conn.execute('BEGIN IMMEDIATE')
+            yield conn
+    
+    @contextmanager
+    def snapshot(self):
+        """Make every read in the block see one snapshot of the database.
+        
+        Requires reuse_connection: a read transaction is held open on the
+        reused connection, and other threads wait for it, until the block ends.
+        """
+        if not self.reuse_connection:
+            raise ValueError('snapshot() requires reuse_connection')
+        with self._lock:
+            if self._in_snapshot:
+                yield
+                return
+            with self._connect() as conn:
+                conn.execute('BEGIN')
+                self._in_snapshot = True
+                try:
+                    yield
+                finally:
+                    self._in_snapshot = False
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether a reused connection is currently open."""
+        return self._conn is not None
+    
+    def close(self):
+        """Close the reused connection; it is reopened on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    @profiled
+    def persist_to(self, path: str) -> str:
+        """Copy the database into a file with the SQLite online backup API."""
+        target = sqlite3.connect(path)
+        try:
+            with self._connect() as conn:
+                conn.backup(target)
+        finally:
+            target.close()
+        return path
+    
+    @profiled
+    def export_database(self, path: str) -> str:
+        """Write a compact copy of the library to a new file with VACUUM INTO.
+        
+        The copy is defragmented and has no free pages, and is made from a
+        read snapshot on its own connection, so other connections keep reading
+        and writing meanwhile. An attached archive is written next to it, at
+        default_archive_path(path).
+        """
+        if os.path.exists(path):
+            raise FileExistsError(f'Export target already exists: {path}')
+        conn = self._open_connection()
+        try:
+            conn.execute('VACUUM INTO ?', (path,))
+            if self.archive_path:
+                conn.execute('VACUUM archive INTO ?', (default_archive_path(path),))
+        finally:
+            conn.close()
+        return path
+    
+    @profiled
+    @retry_on_busy
+    def restore_database(self, path: str):
+        """Replace the library with a database file written by export_database().
+        
+        Pages are copied with the backup API, then the copy is brought up to
+        the current schema, so files from older versions (with only books and
+        reading_sessions) restore too. Raises ValueError for a file that is
+        not a Booktrack database; every source is checked before anything is
+        written, so the library is left unchanged then.
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f'No database file at {path}')
+        # (source file or None, target schema); an archive without a source is emptied
+        copies = [(path, 'main')]
+        if self.archive_path:
+            archive_source = default_archive_path(path)
+            copies.append((archive_source if os.path.exists(archive_source) else None, 'archive'))
+        
+        sources = {}
+        try:
+            for source_path, schema in copies:
+                if source_path is None:
+                    continue
+                source = sqlite3.connect(Path(source_path).resolve().as_uri() + '?mode=ro', uri=True)
+                sources[schema] = source
+                try:
+                    tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                except sqlite3.DatabaseError as e:
+                    raise ValueError(f'Not a database file: {source_path} ({e})')
+                if not {'books', 'reading_sessions'} <= tables:
+                    raise ValueError(f'Not a Booktrack database: {source_path}')
+            
+            for source_path, schema in copies:
+                if schema == 'main':
+                    with self._connect() as conn:
+                        sources[schema].backup(conn)
+                elif source_path is None:
+                    with self._transaction() as conn:
+                        for table in ('reading_sessions', 'book_notes', 'book_tags', 'books'):
+                            conn.execute(f'DELETE FROM archive.{table}')
+                else:
+                    target = sqlite3.connect(self.archive_path, timeout=self.busy_timeout)
+                    try:
+                        sources[schema].backup(target)
+                    finally:
+                        target.close()
+        finally:
+            for source in sources.values():
+                source.close()
+        self._time_zone_loaded = False
+        # Exports from older versions are migrated like any other database
         self.init_database()
     
+    def shutdown(self):
+        """Close all connections, first saving an in-memory database to persist_path if set."""
+        if self.in_memory and self.persist_path and self._keepalive is not None:
+            self.persist_to(self.persist_path)
+        self.close()
+        if self._keepalive is not None:
+            # Closing the last connection frees an in-memory database
+            self._keepalive.close()
+            self._keepalive = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+    
+    def enable_profiling(self) -> QueryProfiler:
+        """Start recording method and statement timings."""
+        if self.profiler is None:
+            self.profiler = QueryProfiler()
+            # Reopen the shared connection so it is instrumented
+            self.close()
+        return self.profiler
+    
+    def disable_profiling(self):
+        """Stop recording timings and drop collected metrics."""
+        self.profiler = None
+        self.close()
+    
+    def explain_query_plan(self, sql: str, params: Union[Sequence, Dict, None] = ()) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN detail lines for a statement.
+        
+        Positional or named params are bound as given. When their number does
+        not match the statement's, NULLs are bound in their place instead.
+        """
+        # A separate uninstrumented connection keeps EXPLAIN out of the profile
+        conn = self._open_connection(instrument=False)
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params if params is not None else ())
+            except sqlite3.ProgrammingError as e:
+                # SQLite reports how many parameters the prepared statement takes
+                match = re.search(r'statement uses (\d+)', str(e))
+                if match is None:
+                    raise
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', (None,) * int(match.group(1)))
+            return [row[3] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
+    @retry_on_busy
     def init_database(self):
         """Initialize the database with required tables."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            # WAL lets readers carry on while another process writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            if self.archive_path:
+                conn.execute('PRAGMA archive.journal_mode=WAL')
+        
+        with self._transaction() as conn:
             cursor = conn.cursor()
             
             # Create books table
@@ -43,6 +666,21 @@ class DatabaseManager:
                 # Column already exists
                 pass
             
+            # Notes are kept out of the books rows so listings never read them;
+            # body is TEXT, or a zlib-compressed BLOB for long notes
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS book_notes (
+                    book_id INTEGER PRIMARY KEY REFERENCES books (id) ON DELETE CASCADE,
+                    body BLOB NOT NULL
+                )
+            ''')
+            self._migrate_book_notes(cursor)
+            self._init_tags(cursor)
+            
+            # Book listings are ordered by created_at, optionally within one status
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_created_at ON books (created_at)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_books_status_created_at ON books (status, created_at)')
+            
             # Create reading_sessions table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS reading_sessions (
@@ -51,9 +689,10 @@ class DatabaseManager:
                     duration_seconds INTEGER NOT NULL,
                     pages_read INTEGER,
                     notes TEXT,
-                    start_time TIMESTAMP,
-                    end_time TIMESTAMP,
-                    session_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    start_time INTEGER,
+                    end_time INTEGER,
+                    session_date INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                    local_day TEXT,
                     FOREIGN KEY (book_id) REFERENCES books (id) ON DELETE CASCADE
                 )
             ''')
@@ -68,11 +707,487 @@ class DatabaseManager:
             except sqlite3.OperationalError:
                 pass
             
+            # Session times are stored as integer epoch seconds (UTC)
+            self._migrate_session_timestamps(cursor)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_reading_sessions_session_date
+                ON reading_sessions (session_date)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_reading_sessions_book_date
+                ON reading_sessions (book_id, session_date)
+            ''')
+            
+            self._init_change_tracking(cursor)
+            self._init_book_totals(cursor)
+            self._init_authors(cursor)
+            if self.archive_path:
+                self._init_archive(cursor)
+            
+            # Precomputed day of each session in the configured time zone
+            try:
+                cursor.execute('ALTER TABLE reading_sessions ADD COLUMN local_day TEXT')
+            except sqlite3.OperationalError:
+                pass
+            self._zone(cursor)
+            cursor.execute(f'UPDATE reading_sessions SET local_day = {LOCAL_DAY_SQL} WHERE local_day IS NULL')
+            # Covering index: daily totals are read from the index alone
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_reading_sessions_local_day
+                ON reading_sessions (local_day, duration_seconds, pages_read)
+            ''')
+            
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
             conn.commit()
+        
+        if self.archive_path:
+            with self._connect() as conn:
+                self._create_archive_views(conn)
+    
+    def _migrate_book_notes(self, cursor: sqlite3.Cursor):
+        """Move notes still stored in the books rows into book_notes."""
+        cursor.execute('SELECT id, notes FROM books WHERE notes IS NOT NULL')
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        # Moving notes is not a change to sync; the triggers are recreated afterwards
+        for trigger in ('books_change_update', 'book_notes_change_insert', 'book_notes_change_update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        for book_id, notes in rows:
+            store_notes(cursor, book_id, notes)
+        cursor.execute('UPDATE books SET notes = NULL WHERE notes IS NOT NULL')
     
+    def _migrate_session_timestamps(self, cursor: sqlite3.Cursor):
+        """Rebuild reading_sessions with text timestamps as integer epoch seconds."""
+        cursor.execute('PRAGMA table_info(reading_sessions)')
+        columns = [(row[1], row[2]) for row in cursor.fetchall()]
+        if dict(columns).get('session_date', '').upper() == 'INTEGER':
+            return
+        
+        # start_time/end_time were local ISO strings, session_date UTC text
+        def local_to_epoch(column):
+            return f'''CASE
+                WHEN typeof({column}) IN ('integer', 'real') THEN CAST({column} AS INTEGER)
+                WHEN {column} LIKE '%Z' OR {column} GLOB '*[+-][0-9][0-9]:[0-9][0-9]'
+                    THEN CAST(strftime('%s', {column}) AS INTEGER)
+                ELSE CAST(strftime('%s', {column}, 'utc') AS INTEGER)
+            END'''
+        converted = {
+            'start_time': local_to_epoch('start_time'),
+            'end_time': local_to_epoch('end_time'),
+            'session_date': f'''COALESCE(
+                CASE WHEN typeof(session_date) IN ('integer', 'real') THEN CAST(session_date AS INTEGER)
+                     ELSE CAST(strftime('%s', session_date) AS INTEGER) END,
+                {local_to_epoch('end_time')},
+                CAST(strftime('%s', 'now') AS INTEGER))'''
+        }
+        
+        # The rebuild is all-or-nothing
+        cursor.execute('SAVEPOINT migrate_session_timestamps')
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'reading_sessions'")
+        row = cursor.fetchone()
+        sequence = row[0] if row else None
+        
+        cursor.execute('''
+            CREATE TABLE reading_sessions_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                book_id INTEGER NOT NULL,
+                duration_seconds INTEGER NOT NULL,
+                pages_read INTEGER,
+                notes TEXT,
+                start_time INTEGER,
+                end_time INTEGER,
+                session_date INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+                FOREIGN KEY (book_id) REFERENCES books (id) ON DELETE CASCADE
+            )
+        ''')
+        base_columns = {'id', 'book_id', 'duration_seconds', 'pages_read', 'notes',
+                        'start_time', 'end_time', 'session_date'}
+        for name, declared_type in columns:
+            if name not in base_columns:
+                cursor.execute(f'ALTER TABLE reading_sessions_new ADD COLUMN {name} {declared_type}')
+        names = [name for name, _ in columns]
+        cursor.execute(f'''
+            INSERT INTO reading_sessions_new ({", ".join(names)})
+            SELECT {", ".join(converted.get(name, name) for name in names)}
+            FROM reading_sessions
+        ''')
+        # Dropping the table also drops its indexes and triggers; both are recreated
+        cursor.execute('DROP TABLE reading_sessions')
+        cursor.execute('ALTER TABLE reading_sessions_new RENAME TO reading_sessions')
+        if sequence is not None:
+            cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'reading_sessions'",
+                           (sequence,))
+            if cursor.rowcount == 0:
+                cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('reading_sessions', ?)",
+                               (sequence,))
+        cursor.execute('RELEASE migrate_session_timestamps')
+    
+    def _init_tags(self, cursor: sqlite3.Cursor):
+        """Create tags (shelves) and the book_tags join table with per-tag book counts."""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL COLLATE NOCASE UNIQUE,
+                book_count INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        # The primary key serves lookups by book, the second index lookups by tag
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS book_tags (
+                book_id INTEGER NOT NULL REFERENCES books (id) ON DELETE CASCADE,
+                tag_id INTEGER NOT NULL REFERENCES tags (id) ON DELETE CASCADE,
+                PRIMARY KEY (book_id, tag_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_book_tags_tag_book ON book_tags (tag_id, book_id)')
+        
+        # Counts for the navigation bar are kept current instead of aggregated on demand
+        for event, row, delta in (('insert', 'NEW', '+ 1'), ('delete', 'OLD', '- 1')):
+            cursor.execute(f'DROP TRIGGER IF EXISTS book_tags_count_{event}')
+            cursor.execute(f'''
+                CREATE TRIGGER book_tags_count_{event} AFTER {event.upper()} ON book_tags
+                BEGIN
+                    UPDATE tags SET book_count = book_count {delta} WHERE id = {row}.tag_id;
+                END
+            ''')
+    
+    def _init_book_totals(self, cursor: sqlite3.Cursor):
+        """Add per-book reading totals, kept current by triggers on reading_sessions."""
+        added = False
+        for column in ('total_seconds INTEGER NOT NULL DEFAULT 0',
+                       'total_pages_read INTEGER NOT NULL DEFAULT 0',
+                       'session_count INTEGER NOT NULL DEFAULT 0',
+                       'last_session_at INTEGER'):
+            try:
+                cursor.execute(f'ALTER TABLE books ADD COLUMN {column}')
+                added = True
+            except sqlite3.OperationalError:
+                pass
+        if added:
+            refresh_book_totals(cursor)
+        
+        # Derived data: these columns are not tracked as changes to the book
+        def add(row):
+            return f'''
+                UPDATE books SET
+                    total_seconds = total_seconds + {row}.duration_seconds,
+                    total_pages_read = total_pages_read + COALESCE({row}.pages_read, 0),
+                    session_count = session_count + 1,
+                    last_session_at = COALESCE(MAX(last_session_at, {row}.session_date),
+                                               last_session_at, {row}.session_date)
+                WHERE id = {row}.book_id;
+            '''
+        
+        def subtract(row):
+            # The latest remaining session is one step down idx_reading_sessions_book_date
+            return f'''
+                UPDATE books SET
+                    total_seconds = total_seconds - {row}.duration_seconds,
+                    total_pages_read = total_pages_read - COALESCE({row}.pages_read, 0),
+                    session_count = session_count - 1,
+                    last_session_at = (SELECT MAX(session_date) FROM reading_sessions
+                                       WHERE book_id = {row}.book_id)
+                WHERE id = {row}.book_id;
+            '''
+        
+        triggers = {
+            'insert': ('AFTER INSERT', add('NEW')),
+            'delete': ('AFTER DELETE', subtract('OLD')),
+            # Sync may move a session to another book or edit its numbers
+            'update': ('AFTER UPDATE OF book_id, duration_seconds, pages_read, session_date',
+                       subtract('OLD') + add('NEW'))
+        }
+        for name, (event, body) in triggers.items():
+            cursor.execute(f'DROP TRIGGER IF EXISTS reading_sessions_totals_{name}')
+            cursor.execute(f'''
+                CREATE TRIGGER reading_sessions_totals_{name} {event} ON reading_sessions
+                BEGIN
+                    {body}
+                END
+            ''')
+        
+        for name, order in (('last_session_at', 'last_session_at'),
+                            ('total_seconds', 'total_seconds'),
+                            ('progress', PROGRESS_SQL)):
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_books_{name} ON books ({order})')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_books_status_{name} ON books (status, {order})')
+    
+    def _init_authors(self, cursor: sqlite3.Cursor):
+        """Create the authors table, link books to it and keep it free of authors without books."""
+        # books.author keeps the spelling as entered; key groups spellings of one author
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS authors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL
+            )
+        ''')
+        try:
+            cursor.execute('ALTER TABLE books ADD COLUMN author_id INTEGER REFERENCES authors (id)')
+        except sqlite3.OperationalError:
+            pass
+        # Covering index: per-author totals are read from the index alone
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_books_author_totals
+            ON books (author_id, status, total_seconds, total_pages_read, last_session_at)
+        ''')
+        # author_id is derived data and not tracked as a change to the book
+        link_authors(cursor)
+        
+        release = '''
+            DELETE FROM authors WHERE id = OLD.author_id
+            AND NOT EXISTS (SELECT 1 FROM books WHERE author_id = OLD.author_id);
+        '''
+        events = {
+            'update': 'AFTER UPDATE OF author_id ON books WHEN OLD.author_id IS NOT NEW.author_id',
+            'delete': 'AFTER DELETE ON books'
+        }
+        for event, condition in events.items():
+            cursor.execute(f'DROP TRIGGER IF EXISTS books_author_release_{event}')
+            cursor.execute(f'''
+                CREATE TRIGGER books_author_release_{event} {condition}
+                BEGIN
+                    {release}
+                END
+            ''')
+    
+    def _init_archive(self, cursor: sqlite3.Cursor):
+        """Create or update the archive's tables to mirror the hot ones."""
+        for table in _ARCHIVE_VIEWS:
+            cursor.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            create = cursor.fetchone()[0]
+            cursor.execute("SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            if cursor.fetchone() is None:
+                # Same definition; triggers are not copied, so archived rows are not tracked changes
+                cursor.execute(re.sub(r'^CREATE TABLE\s+("?)\w+\1', f'CREATE TABLE archive.{table}', create))
+                continue
+            # Columns added to the hot table since the archive was created
+            cursor.execute(f'PRAGMA archive.table_info({table})')
+            archived = {row[1] for row in cursor.fetchall()}
+            cursor.execute(f'PRAGMA main.table_info({table})')
+            for row in cursor.fetchall():
+                if row[1] not in archived:
+                    cursor.execute(f'ALTER TABLE archive.{table} ADD COLUMN {row[1]} {row[2]}')
+        # Tags are kept by name, since tag ids belong to the hot database
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive.book_tags (
+                book_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                PRIMARY KEY (book_id, name)
+            ) WITHOUT ROWID
+        ''')
+        # The indexes that all-time statistics and sync lookups need on the hot tables
+        for name, definition in (('idx_books_uid', 'books (uid)'),
+                                 ('idx_books_created_at', 'books (created_at)'),
+                                 ('idx_reading_sessions_uid', 'reading_sessions (uid)'),
+                                 ('idx_reading_sessions_session_date', 'reading_sessions (session_date)'),
+                                 ('idx_reading_sessions_book_date', 'reading_sessions (book_id, session_date)'),
+                                 ('idx_reading_sessions_local_day',
+                                  'reading_sessions (local_day, duration_seconds, pages_read)')):
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS archive.{name} ON {definition}')
+    
+    def _init_change_tracking(self, cursor: sqlite3.Cursor):
+        """Create the change sequence, per-row change_seq columns and tombstones."""
+        # Single-row monotonic counter bumped by every tracked write
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS change_sequence (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                value INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('INSERT OR IGNORE INTO change_sequence (id, value) VALUES (1, 0)')
+        
+        # Deleted rows, so incremental consumers can replay deletions
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tombstones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                change_seq INTEGER NOT NULL
+            )
+        ''')
+        
+        try:
+            cursor.execute('ALTER TABLE tombstones ADD COLUMN uid TEXT')
+        except sqlite3.OperationalError:
+            pass
+        
+        # Key/value settings such as this database's sync replica id
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        cursor.execute(
+            "INSERT OR IGNORE INTO settings (key, value) VALUES ('replica_id', lower(hex(randomblob(16))))"
+        )
+        
+        # Last change sequence values exchanged with each sync peer
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_peers (
+                peer_id TEXT PRIMARY KEY,
+                last_seen_seq INTEGER NOT NULL DEFAULT 0,
+                last_sent_seq INTEGER NOT NULL DEFAULT 0,
+                last_sync_at TIMESTAMP
+            )
+        ''')
+        
+        for table in ('books', 'reading_sessions'):
+            # change_seq orders local changes; uid identifies a row across synced
+            # libraries; updated_at (epoch ms) resolves concurrent edits
+            for column in ('change_seq INTEGER', 'uid TEXT', 'updated_at INTEGER'):
+                try:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column}')
+                except sqlite3.OperationalError:
+                    pass
+            # Rows written before change tracking existed share one sequence value
+            cursor.execute(f'SELECT 1 FROM {table} WHERE change_seq IS NULL LIMIT 1')
+            if cursor.fetchone():
+                cursor.execute('UPDATE change_sequence SET value = value + 1 WHERE id = 1')
+                cursor.execute(f'''
+                    UPDATE {table} SET change_seq = (SELECT value FROM change_sequence WHERE id = 1)
+                    WHERE change_seq IS NULL
+                ''')
+            cursor.execute(f'''
+                UPDATE {table} SET uid = lower(hex(randomblob(16))), updated_at = {NOW_MS}
+                WHERE uid IS NULL
+            ''')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table} (change_seq)')
+            cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uid ON {table} (uid)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tombstones_change_seq ON tombstones (change_seq)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tombstones_uid ON tombstones (uid)')
+        
+        tracked_columns = {
+            'books': 'title, author, total_pages, cover_image_url, status',
+            'reading_sessions': 'book_id, duration_seconds, pages_read, notes, start_time, end_time, session_date'
+        }
+        bump = 'UPDATE change_sequence SET value = value + 1 WHERE id = 1;'
+        current = '(SELECT value FROM change_sequence WHERE id = 1)'
+        for table, columns in tracked_columns.items():
+            # Triggers are recreated so their definitions follow the schema.
+            # An explicitly written uid/updated_at (e.g. by sync) is preserved.
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_change_insert')
+            cursor.execute(f'''
+                CREATE TRIGGER {table}_change_insert AFTER INSERT ON {table}
+                BEGIN
+                    {bump}
+                    UPDATE {table} SET change_seq = {current},
+                        uid = COALESCE(NEW.uid, lower(hex(randomblob(16)))),
+                        updated_at = COALESCE(NEW.updated_at, {NOW_MS})
+                    WHERE id = NEW.id;
+                END
+            ''')
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_change_update')
+            cursor.execute(f'''
+                CREATE TRIGGER {table}_change_update AFTER UPDATE OF {columns} ON {table}
+                BEGIN
+                    {bump}
+                    UPDATE {table} SET change_seq = {current},
+                        updated_at = CASE WHEN NEW.updated_at IS OLD.updated_at
+                                          THEN {NOW_MS} ELSE NEW.updated_at END
+                    WHERE id = NEW.id;
+                END
+            ''')
+            cursor.execute(f'DROP TRIGGER IF EXISTS {table}_change_delete')
+            cursor.execute(f'''
+                CREATE TRIGGER {table}_change_delete AFTER DELETE ON {table}
+                BEGIN
+                    {bump}
+                    INSERT INTO tombstones (table_name, row_id, uid, change_seq)
+                    VALUES ('{table}', OLD.id, OLD.uid, {current});
+                END
+            ''')
+        
+        # A change to a book's notes or tags is a change to the book. Rows removed
+        # along with their book are covered by the book's tombstone.
+        for table in ('book_notes', 'book_tags'):
+            for event, row in (('insert', 'NEW'), ('update', 'NEW'), ('delete', 'OLD')):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {table}_change_{event}')
+                cursor.execute(f'''
+                    CREATE TRIGGER {table}_change_{event} AFTER {event.upper()} ON {table}
+                    WHEN EXISTS (SELECT 1 FROM books WHERE id = {row}.book_id)
+                    BEGIN
+                        {bump}
+                        UPDATE books SET change_seq = {current}, updated_at = {NOW_MS}
+                        WHERE id = {row}.book_id;
+                    END
+                ''')
+    
+    @profiled
+    def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a stored setting value."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            return row[0] if row else default
+    
+    @profiled
+    @retry_on_busy
+    def set_setting(self, key: str, value: Optional[str]):
+        """Store a setting value."""
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO settings (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            ''', (key, value))
+            conn.commit()
+    
+    @profiled
+    def get_change_version(self) -> int:
+        """Get the current value of the database change sequence."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM change_sequence WHERE id = 1')
+            return cursor.fetchone()[0]
+    
+    @profiled
+    def get_changes_since(self, since: int = 0) -> Dict:
+        """Get rows and deletions recorded after the given change sequence value."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            # Read everything from one snapshot of the database
+            if not conn.in_transaction:
+                cursor.execute('BEGIN')
+            cursor.execute('SELECT value FROM change_sequence WHERE id = 1')
+            version = cursor.fetchone()[0]
+            
+            changes = {'since': since, 'version': version}
+            # Stored notes replace the books.notes column left over from before book_notes
+            selects = {'books': f'*, {BOOK_NOTES_SQL} AS notes', 'reading_sessions': '*'}
+            for table, select in selects.items():
+                cursor.execute(f'''
+                    SELECT {select} FROM {table}
+                    WHERE change_seq > ? AND change_seq <= ?
+                    ORDER BY change_seq
+                ''', (since, version))
+                columns = [column[0] for column in cursor.description]
+                changes[table] = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            tags = load_tags(cursor, [book['id'] for book in changes['books']])
+            for book in changes['books']:
+                book['tags'] = tags[book['id']]
+            
+            cursor.execute('''
+                SELECT table_name, row_id, uid, change_seq FROM tombstones
+                WHERE change_seq > ? AND change_seq <= ?
+                ORDER BY change_seq
+            ''', (since, version))
+            changes['deleted'] = [
+                {'table': row[0], 'row_id': row[1], 'uid': row[2], 'change_seq': row[3]}
+                for row in cursor.fetchall()
+            ]
+            conn.commit()
+            return changes
+    
+    @profiled
+    @retry_on_busy
     def add_book(self, title: str, author: str, total_pages: Optional[int] = None, 
-                 cover_image_url: Optional[str] = None, notes: Optional[str] = None) -> int:
-        """Add a new book to the library."""
+                 cover_image_url: Optional[str] = None, notes: Optional[str] = None,
+                 tags: Sequence[str] = ()) -> int:
+        """Add a new book to the library, with its tags, in one transaction."""
         # Convert total_pages to int if it's a Decimal or other numeric type
         if total_pages is not None:
             try:
@@ -80,52 +1195,93 @@ class DatabaseManager:
             except (ValueError, TypeError):
                 total_pages = None
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO books (title, author, total_pages, cover_image_url, notes)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (title, author, total_pages, cover_image_url, notes))
+                INSERT INTO books (title, author, total_pages, cover_image_url)
+                VALUES (?, ?, ?, ?)
+            ''', (title, author, total_pages, cover_image_url))
+            book_id = cursor.lastrowid
+            store_author(cursor, book_id, author)
+            if notes:
+                store_notes(cursor, book_id, notes)
+            if tags:
+                store_tags(cursor, book_id, tags)
             conn.commit()
-            return cursor.lastrowid
+            return book_id
     
-    def get_books(self, status: Optional[str] = None) -> List[Dict]:
-        """Get books from the library, optionally filtered by status."""
-        with sqlite3.connect(self.db_path) as conn:
+    @profiled
+    def get_books(self, status: Optional[str] = None,
+                  columns: Sequence[str] = BOOK_LIST_COLUMNS, sort: str = 'created',
+                  all_tags: Sequence[str] = (), any_tags: Sequence[str] = (),
+                  without_tags: Sequence[str] = (), author_id: Optional[int] = None) -> List[Dict]:
+        """Get books from the library, optionally filtered by status, tags and author.
+        
+        Only the given columns (from BOOK_COLUMNS) are read; notes are left
+        out unless asked for. `sort` is one of BOOK_SORTS. Books must carry
+        every tag in `all_tags`, at least one in `any_tags` and none in
+        `without_tags`.
+        """
+        unknown = set(columns) - set(BOOK_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown book columns: {', '.join(sorted(unknown))}")
+        if sort not in BOOK_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        select = ', '.join(BOOK_NOTES_SQL if column == 'notes' else column for column in columns)
+        
+        conditions = []
+        params = []
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if author_id is not None:
+            conditions.append('author_id = ?')
+            params.append(author_id)
+        
+        # Tag filters are one compound SELECT over book_tags, evaluated by SQLite
+        tagged = 'SELECT book_id FROM book_tags WHERE tag_id IN (SELECT id FROM tags WHERE name IN ({}))'
+        parts = []
+        tag_params = []
+        for tag in all_tags:
+            parts.append(tagged.format('?'))
+            tag_params.append(tag)
+        if any_tags:
+            parts.append(tagged.format(', '.join('?' for _ in any_tags)))
+            tag_params.extend(any_tags)
+        excluded = tagged.format(', '.join('?' for _ in without_tags))
+        if parts:
+            compound = ' INTERSECT '.join(parts)
+            if without_tags:
+                compound += f' EXCEPT {excluded}'
+                tag_params.extend(without_tags)
+            conditions.append(f'id IN ({compound})')
+            params.extend(tag_params)
+        elif without_tags:
+            conditions.append(f'id NOT IN ({excluded})')
+            params.extend(without_tags)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        
+        with self._connect() as conn:
             cursor = conn.cursor()
-            if status:
-                cursor.execute('''
-                    SELECT id, title, author, total_pages, cover_image_url, status, notes, created_at
-                    FROM books WHERE status = ?
-                    ORDER BY created_at DESC
-                ''', (status,))
-            else:
-                cursor.execute('''
-                    SELECT id, title, author, total_pages, cover_image_url, status, notes, created_at
-                    FROM books
-                    ORDER BY created_at DESC
-                ''')
-            
-            books = []
-            for row in cursor.fetchall():
-                books.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'author': row[2],
-                    'total_pages': row[3],
-                    'cover_image_url': row[4],
-                    'status': row[5],
-                    'notes': row[6],
-                    'created_at': row[7]
-                })
-            return books
+            cursor.execute(f'''
+                SELECT {select}
+                FROM books {where}
+                ORDER BY {BOOK_SORTS[sort]}
+            ''', params)
+            books = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        if 'last_session_at' in columns:
+            for book in books:
+                book['last_session_at'] = epoch_to_local_iso(book['last_session_at'])
+        return books
     
+    @profiled
     def get_book(self, book_id: int) -> Optional[Dict]:
-        """Get a specific book by ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Get a specific book by ID, including its notes."""
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                SELECT id, title, author, total_pages, cover_image_url, status, notes, created_at
+            cursor.execute(f'''
+                SELECT id, title, author, total_pages, cover_image_url, status, {BOOK_NOTES_SQL}, created_at
                 FROM books WHERE id = ?
             ''', (book_id,))
             
@@ -143,10 +1299,111 @@ class DatabaseManager:
                 }
             return None
     
+    @profiled
+    def get_book_notes(self, book_id: int) -> Optional[str]:
+        """Get the notes of a book, for views that show or edit them."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT body FROM book_notes WHERE book_id = ?', (book_id,))
+            row = cursor.fetchone()
+            return unpack_notes(row[0]) if row else None
+    
+    @profiled
+    def get_book_tags(self, book_id: int) -> List[str]:
+        """Get the tags of a book, sorted by name."""
+        with self._connect() as conn:
+            return load_tags(conn.cursor(), [book_id])[book_id]
+    
+    @profiled
+    @retry_on_busy
+    def set_book_tags(self, book_id: int, tags: Sequence[str]) -> bool:
+        """Replace the tags of a book; tags are created as needed."""
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT 1 FROM books WHERE id = ?', (book_id,))
+            if cursor.fetchone() is None:
+                return False
+            store_tags(cursor, book_id, tags)
+            conn.commit()
+            return True
+    
+    @profiled
+    def get_tags(self) -> List[Tuple[str, int]]:
+        """Get (tag, number of books) for every tag, sorted by name."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT name, book_count FROM tags ORDER BY name')
+            return cursor.fetchall()
+    
+    @profiled
+    @retry_on_busy
+    def delete_tag(self, name: str) -> bool:
+        """Remove a tag from all books and delete it."""
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM book_tags WHERE tag_id IN (SELECT id FROM tags WHERE name = ?)', (name,))
+            cursor.execute('DELETE FROM tags WHERE name = ?', (name,))
+            conn.commit()
+            return cursor.rowcount > 0
+    
+    @profiled
+    def get_authors(self, prefix: Optional[str] = None, sort: str = 'name',
+                    limit: Optional[int] = None) -> List[Dict]:
+        """Get every author with books and their reading totals, in one grouped query.
+        
+        `prefix` matches the start of the name, ignoring case and diacritics.
+        `sort` is one of AUTHOR_SORTS.
+        """
+        if sort not in AUTHOR_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        conditions = []
+        params = []
+        if prefix:
+            # A key range, so the search is a seek on the unique key index
+            key = fold_author(prefix)
+            conditions.append('a.key >= ? AND a.key < ?')
+            params.extend([key, key + '\U0010ffff'])
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        if limit is not None:
+            params.append(limit)
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            # Authors are walked in key order and each one's per-book totals are
+            # summed straight from idx_books_author_totals
+            cursor.execute(f'''
+                SELECT a.id, a.name, COUNT(*) AS book_count, SUM(b.status = 'Read'),
+                       SUM(b.total_seconds) AS total_seconds, SUM(b.total_pages_read), MAX(b.last_session_at)
+                FROM authors a
+                JOIN books b ON b.author_id = a.id
+                {where}
+                GROUP BY a.key
+                ORDER BY {AUTHOR_SORTS[sort]}
+                {'LIMIT ?' if limit is not None else ''}
+            ''', params)
+            columns = ('id', 'name', 'book_count', 'books_read', 'total_seconds', 'total_pages_read',
+                       'last_session_at')
+            authors = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        for author in authors:
+            author['last_session_at'] = epoch_to_local_iso(author['last_session_at'])
+        return authors
+    
+    @profiled
+    def get_author_count(self) -> int:
+        """Get the number of authors in the library."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM authors')
+            return cursor.fetchone()[0]
+    
+    @profiled
+    @retry_on_busy
     def update_book(self, book_id: int, title: str = None, author: str = None,
                     total_pages: int = None, cover_image_url: str = None,
-                    status: str = None, notes: str = None) -> bool:
-        """Update an existing book."""
+                    status: str = None, notes: str = None,
+                    tags: Optional[Sequence[str]] = None) -> bool:
+        """Update an existing book; tags, when given, replace its tags in the same transaction."""
         updates = []
         params = []
         
@@ -170,41 +1427,59 @@ class DatabaseManager:
         if status is not None:
             updates.append("status = ?")
             params.append(status)
-        if notes is not None:
-            updates.append("notes = ?")
-            params.append(notes)
         
-        if not updates:
+        if not updates and notes is None and tags is None:
             return False
         
         params.append(book_id)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute(f'''
-                UPDATE books SET {", ".join(updates)}
-                WHERE id = ?
-            ''', params)
+            if updates:
+                cursor.execute(f'''
+                    UPDATE books SET {", ".join(updates)}
+                    WHERE id = ?
+                ''', params)
+                found = cursor.rowcount > 0
+            else:
+                cursor.execute('SELECT 1 FROM books WHERE id = ?', (book_id,))
+                found = cursor.fetchone() is not None
+            if found and author is not None:
+                store_author(cursor, book_id, author)
+            # Notes are stored out-of-row; a trigger bumps the book's change_seq
+            if found and notes is not None:
+                store_notes(cursor, book_id, notes)
+            if found and tags is not None:
+                store_tags(cursor, book_id, tags)
             conn.commit()
-            return cursor.rowcount > 0
+            return found
     
+    @profiled
+    @retry_on_busy
     def delete_book(self, book_id: int) -> bool:
         """Delete a book and all associated reading sessions."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
             # Delete associated reading sessions first
             cursor.execute('DELETE FROM reading_sessions WHERE book_id = ?', (book_id,))
             # Delete the book
             cursor.execute('DELETE FROM books WHERE id = ?', (book_id,))
+            deleted = cursor.rowcount > 0
+            cursor.execute('DELETE FROM book_notes WHERE book_id = ?', (book_id,))
+            cursor.execute('DELETE FROM book_tags WHERE book_id = ?', (book_id,))
             conn.commit()
-            return cursor.rowcount > 0
+            return deleted
     
+    @profiled
+    @retry_on_busy
     def add_reading_session(self, book_id: int, duration_seconds: int,
                            pages_read: Optional[int] = None,
                            notes: Optional[str] = None,
-                           start_time: Optional[str] = None,
-                           end_time: Optional[str] = None) -> int:
-        """Add a new reading session."""
+                           start_time=None, end_time=None) -> int:
+        """Add a new reading session; times may be datetimes, ISO strings or epoch seconds."""
+        start_time = to_epoch(start_time)
+        end_time = to_epoch(end_time)
+        
         # Convert pages_read to int if it's a Decimal or other numeric type
         if pages_read is not None:
             try:
@@ -212,84 +1487,102 @@ class DatabaseManager:
             except (ValueError, TypeError):
                 pages_read = None
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
+            self._zone(cursor)
             cursor.execute('''
-                INSERT INTO reading_sessions (book_id, duration_seconds, pages_read, notes, start_time, end_time)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (book_id, duration_seconds, pages_read, notes, start_time, end_time))
+                INSERT INTO reading_sessions
+                    (book_id, duration_seconds, pages_read, notes, start_time, end_time, local_day)
+                VALUES (?, ?, ?, ?, ?, ?, local_day(COALESCE(?, CAST(strftime('%s', 'now') AS INTEGER))))
+            ''', (book_id, duration_seconds, pages_read, notes, start_time, end_time, start_time))
             conn.commit()
             return cursor.lastrowid
     
-    def get_reading_sessions(self, book_id: Optional[int] = None) -> List[Dict]:
-        """Get reading sessions, optionally filtered by book."""
-        with sqlite3.connect(self.db_path) as conn:
+    @profiled
+    def get_reading_sessions(self, book_id: Optional[int] = None, start=None, end=None,
+                             columns: Sequence[str] = SESSION_LIST_COLUMNS) -> List[Dict]:
+        """Get reading sessions, optionally filtered by book and by session date in [start, end).
+        
+        Only the given columns (from SESSION_COLUMNS) are read; notes are left
+        out unless asked for.
+        """
+        unknown = set(columns) - set(SESSION_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown session columns: {', '.join(sorted(unknown))}")
+        select = ', '.join(_SESSION_SELECT[column] for column in columns)
+        
+        conditions = []
+        params = []
+        if book_id:
+            conditions.append('rs.book_id = ?')
+            params.append(book_id)
+        # Range bounds are converted once so the filter is an index seek
+        if start is not None:
+            conditions.append('rs.session_date >= ?')
+            params.append(to_epoch(start))
+        if end is not None:
+            conditions.append('rs.session_date < ?')
+            params.append(to_epoch(end))
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        
+        with self._connect() as conn:
             cursor = conn.cursor()
-            if book_id:
-                cursor.execute('''
-                    SELECT rs.id, rs.book_id, rs.duration_seconds, rs.pages_read,
-                           rs.notes, rs.session_date, rs.start_time, rs.end_time, b.title, b.author
-                    FROM reading_sessions rs
-                    JOIN books b ON rs.book_id = b.id
-                    WHERE rs.book_id = ?
-                    ORDER BY rs.session_date DESC
-                ''', (book_id,))
-            else:
-                cursor.execute('''
-                    SELECT rs.id, rs.book_id, rs.duration_seconds, rs.pages_read,
-                           rs.notes, rs.session_date, rs.start_time, rs.end_time, b.title, b.author
-                    FROM reading_sessions rs
-                    JOIN books b ON rs.book_id = b.id
-                    ORDER BY rs.session_date DESC
-                ''')
+            cursor.execute(f'''
+                SELECT {select}
+                FROM reading_sessions rs
+                JOIN books b ON rs.book_id = b.id
+                {where}
+                ORDER BY rs.session_date DESC
+            ''', params)
             
-            sessions = []
-            for row in cursor.fetchall():
-                sessions.append({
-                    'id': row[0],
-                    'book_id': row[1],
-                    'duration_seconds': row[2],
-                    'pages_read': row[3],
-                    'notes': row[4],
-                    'session_date': row[5],
-                    'start_time': row[6],
-                    'end_time': row[7],
-                    'book_title': row[8],
-                    'book_author': row[9]
-                })
-            return sessions
+            sessions = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        # Times are stored as epoch seconds
+        for session in sessions:
+            if 'session_date' in session:
+                session['session_date'] = epoch_to_utc_text(session['session_date'])
+            for key in ('start_time', 'end_time'):
+                if key in session:
+                    session[key] = epoch_to_local_iso(session[key])
+        return sessions
     
+    @profiled
     def get_statistics(self) -> Dict:
         """Get reading statistics."""
-        with sqlite3.connect(self.db_path) as conn:
+        first_day = (self._today() - timedelta(days=29)).isoformat()
+        with self._connect() as conn:
             cursor = conn.cursor()
             
+            # All-time figures include archived books
+            books = self._source('books')
+            sessions = self._source('reading_sessions')
+            
             # Total reading time
-            cursor.execute('SELECT SUM(duration_seconds) FROM reading_sessions')
+            cursor.execute(f'SELECT SUM(duration_seconds) FROM {sessions}')
             total_seconds = cursor.fetchone()[0] or 0
             
             # Total sessions
-            cursor.execute('SELECT COUNT(*) FROM reading_sessions')
+            cursor.execute(f'SELECT COUNT(*) FROM {sessions}')
             total_sessions = cursor.fetchone()[0]
             
             # Total books
-            cursor.execute('SELECT COUNT(*) FROM books')
+            cursor.execute(f'SELECT COUNT(*) FROM {books}')
             total_books = cursor.fetchone()[0]
             
             # Books by status
-            cursor.execute('''
-                SELECT status, COUNT(*) FROM books GROUP BY status
+            cursor.execute(f'''
+                SELECT status, COUNT(*) FROM {books} GROUP BY status
             ''')
             books_by_status = dict(cursor.fetchall())
             
-            # Reading time by day (last 30 days)
-            cursor.execute('''
-                SELECT DATE(session_date) as date, SUM(duration_seconds) as total_seconds
-                FROM reading_sessions
-                WHERE session_date >= datetime('now', '-30 days')
-                GROUP BY DATE(session_date)
-                ORDER BY date DESC
-            ''')
+            # Reading time by local day (last 30 days)
+            cursor.execute(f'''
+                SELECT local_day, SUM(duration_seconds) as total_seconds
+                FROM {sessions}
+                WHERE local_day >= ?
+                GROUP BY local_day
+                ORDER BY local_day DESC
+            ''', (first_day,))
             daily_stats = cursor.fetchall()
             
             return {
@@ -300,51 +1593,300 @@ class DatabaseManager:
                 'daily_stats': daily_stats
             }
     
+    @profiled
+    def get_daily_totals(self, since: Optional[str] = None) -> List[Tuple[str, int, int, int]]:
+        """Get (local day, seconds, sessions, pages read) for every day with reading, e.g. for a heatmap."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT local_day, SUM(duration_seconds), COUNT(*), COALESCE(SUM(pages_read), 0)
+                FROM {self._source('reading_sessions')}
+                WHERE local_day >= ?
+                GROUP BY local_day
+                ORDER BY local_day DESC
+            ''', (since or '',))
+            return cursor.fetchall()
+    
+    @profiled
+    def get_reading_streaks(self) -> Dict[str, int]:
+        """Get the current and longest runs of consecutive days with reading."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            # Consecutive days share the same (day number - row number)
+            cursor.execute(f'''
+                SELECT MAX(day), COUNT(*)
+                FROM (
+                    SELECT local_day AS day,
+                           julianday(local_day) - ROW_NUMBER() OVER (ORDER BY local_day) AS island
+                    FROM {self._source('reading_sessions')}
+                    WHERE local_day IS NOT NULL
+                    GROUP BY local_day
+                )
+                GROUP BY island
+            ''')
+            runs = cursor.fetchall()
+        
+        today = self._today()
+        current = 0
+        for last_day, length in runs:
+            # A streak is still alive until a whole day passes without reading
+            if (today - date.fromisoformat(last_day)).days <= 1:
+                current = max(current, length)
+        return {'current': current, 'longest': max((length for _, length in runs), default=0)}
+    
+    def _today(self) -> date:
+        return date.fromisoformat(local_day(time.time(), self._zone()))
+    
+    @profiled
+    def get_time_zone(self) -> Optional[str]:
+        """Get the configured IANA time zone name, or None for the system zone."""
+        return self.get_setting(TIME_ZONE_SETTING)
+    
+    @profiled
+    def set_time_zone(self, name: Optional[str]):
+        """Set the time zone used to bucket new sessions into days (None for the system zone)."""
+        zone = resolve_time_zone(name)
+        self.set_setting(TIME_ZONE_SETTING, name)
+        self._time_zone = zone
+        self._time_zone_name = name
+        self._time_zone_loaded = True
+    
+    @profiled
+    @retry_on_busy
+    def rebucket_local_days(self, start=None, end=None) -> int:
+        """Recompute the local day of sessions in [start, end) for the configured time zone.
+        
+        Archived sessions are re-bucketed along with the hot ones.
+        """
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append('session_date >= ?')
+            params.append(to_epoch(start))
+        if end is not None:
+            conditions.append('session_date < ?')
+            params.append(to_epoch(end))
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            self._zone(cursor)
+            # One set-based UPDATE per file; local_day() runs in-process for every row
+            count = 0
+            for schema in ('main', 'archive') if self.archive_path else ('main',):
+                cursor.execute(f'UPDATE {schema}.reading_sessions SET local_day = {LOCAL_DAY_SQL} {where}', params)
+                count += cursor.rowcount
+            conn.commit()
+            return count
+    
+    @profiled
     def export_data(self) -> Dict:
         """Export all data as JSON-serializable dictionary following SRS v1.4 format."""
-        books = self.get_books()
+        return {
+            'export_date': datetime.now().isoformat() + 'Z',  # Add Z for UTC
+            'books': list(self.iter_export_books())
+        }
+    
+    def iter_export_books(self, totals: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+        """Yield the exported books one at a time, in export_data() format.
         
-        # Format data according to SRS v1.4 specification
-        export_books = []
-        for book in books:
-            # Get reading sessions for this book
-            sessions = self.get_reading_sessions(book['id'])
-            reading_logs = []
+        Books and sessions are read from one snapshot on a connection of the
+        iterator's own, by two cursors walked in step in the same order, so
+        memory use does not grow with the library and other calls are not
+        held up while the iterator is consumed. Archived books are included.
+        When given, `totals` is filled with the number of books and sessions
+        in that snapshot once iteration starts. Inside snapshot(), the
+        enclosing snapshot is read instead.
+        """
+        own = not self._in_snapshot
+        conn = self._open_connection() if own else self._conn
+        try:
+            if own:
+                conn.execute('BEGIN')
+            if totals is not None:
+                totals['books'], totals['sessions'] = conn.execute(f'''
+                    SELECT (SELECT COUNT(*) FROM {self._source('books')}),
+                           (SELECT COUNT(*) FROM {self._source('reading_sessions')})
+                ''').fetchone()
+            books = conn.execute(f'''
+                SELECT b.id, b.title, b.author, b.status, b.total_pages,
+                       unpack_notes((SELECT body FROM {self._source('book_notes')} WHERE book_id = b.id))
+                FROM {self._source('books')} b
+                ORDER BY b.created_at DESC, b.id DESC
+            ''')
+            sessions = conn.execute(f'''
+                SELECT rs.book_id, rs.duration_seconds, rs.pages_read, rs.session_date, rs.start_time, rs.end_time
+                FROM {self._source('reading_sessions')} rs JOIN {self._source('books')} b ON b.id = rs.book_id
+                ORDER BY b.created_at DESC, b.id DESC, rs.session_date DESC
+            ''')
+            session = sessions.fetchone()
             
-            for session in sessions:
-                log_entry = {
-                    'start_time': session['start_time'] or session['session_date'],
-                    'end_time': session['end_time'] or session['session_date'],
-                    'time': session['duration_seconds'],
-                    'pages_read': session['pages_read']
+            # Format data according to SRS v1.4 specification
+            for book_id, title, author, status, total_pages, notes in books:
+                reading_logs = []
+                while session is not None and session[0] == book_id:
+                    _, seconds, pages_read, session_date, start_time, end_time = session
+                    session_date = epoch_to_utc_text(session_date)
+                    reading_logs.append({
+                        'start_time': epoch_to_local_iso(start_time) or session_date,
+                        'end_time': epoch_to_local_iso(end_time) or session_date,
+                        'time': seconds,
+                        'pages_read': pages_read
+                    })
+                    session = sessions.fetchone()
+                yield {
+                    'title': title,
+                    'author': author,
+                    'status': status,
+                    'totalPages': total_pages,
+                    'notes': notes,
+                    'reading_logs': reading_logs
                 }
-                reading_logs.append(log_entry)
-            
-            book_entry = {
-                'title': book['title'],
-                'author': book['author'],
-                'status': book['status'],
-                'totalPages': book['total_pages'],
-                'notes': book['notes'],
-                'reading_logs': reading_logs
-            }
-            export_books.append(book_entry)
+        finally:
+            if own:
+                conn.close()
+    
+    @profiled
+    @retry_on_busy
+    def archive_books(self, statuses: Sequence[str] = ARCHIVE_STATUSES, before=None) -> Dict[str, int]:
+        """Move finished books and their sessions from the hot database to the archive.
         
-        return {
-            'export_date': datetime.now().isoformat() + 'Z',  # Add Z for UTC
-            'books': export_books
-        }
+        Books with one of `statuses` are moved; with `before`, only those not
+        read since then. Returns the number of books and sessions moved.
+        """
+        if not self.archive_path:
+            raise ValueError('This library has no archive')
+        conditions = [f"status IN ({', '.join('?' for _ in statuses)})"]
+        params = list(statuses)
+        if before is not None:
+            conditions.append('COALESCE(last_session_at, 0) < ?')
+            params.append(to_epoch(before))
+        
+        # Writes to two database files are not atomic together in WAL mode, so
+        # rows are copied first and removed from the hot tables in a second
+        # transaction, which also finishes any earlier move that was cut short
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS archive_move (id INTEGER PRIMARY KEY)')
+            cursor.execute('DELETE FROM temp.archive_move')
+            cursor.execute(f'INSERT INTO temp.archive_move SELECT id FROM main.books WHERE {" AND ".join(conditions)}',
+                           params)
+            moved = {'books': cursor.rowcount}
+            for table, key in (('books', 'id'), ('reading_sessions', 'book_id'), ('book_notes', 'book_id')):
+                cursor.execute(f'PRAGMA main.table_info({table})')
+                columns = ', '.join(row[1] for row in cursor.fetchall())
+                cursor.execute(f'''
+                    INSERT OR REPLACE INTO archive.{table} ({columns})
+                    SELECT {columns} FROM main.{table} WHERE {key} IN (SELECT id FROM temp.archive_move)
+                ''')
+                if table == 'reading_sessions':
+                    moved['sessions'] = cursor.rowcount
+            cursor.execute('''
+                INSERT OR IGNORE INTO archive.book_tags (book_id, name)
+                SELECT bt.book_id, t.name FROM main.book_tags bt JOIN main.tags t ON t.id = bt.tag_id
+                WHERE bt.book_id IN (SELECT id FROM temp.archive_move)
+            ''')
+            conn.commit()
+        
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM change_sequence WHERE id = 1')
+            version = cursor.fetchone()[0]
+            archived = 'SELECT id FROM archive.books'
+            cursor.execute(f'DELETE FROM main.reading_sessions WHERE book_id IN ({archived})')
+            cursor.execute(f'DELETE FROM main.books WHERE id IN ({archived})')
+            cursor.execute(f'DELETE FROM main.book_notes WHERE book_id IN ({archived})')
+            cursor.execute(f'DELETE FROM main.book_tags WHERE book_id IN ({archived})')
+            # The rows still exist, so sync peers and snapshots must not see them as deleted
+            cursor.execute('DELETE FROM tombstones WHERE change_seq > ?', (version,))
+            self._bump_archive_version(cursor)
+            conn.commit()
+        return moved
     
+    @profiled
+    @retry_on_busy
+    def restore_archived_book(self, book_id: int) -> bool:
+        """Move an archived book and its sessions back to the hot database."""
+        if not self.archive_path:
+            return False
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT author FROM archive.books WHERE id = ?', (book_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            cursor.execute('SELECT 1 FROM main.books WHERE id = ?', (book_id,))
+            if cursor.fetchone() is None:
+                # Totals are rebuilt by the triggers as the sessions are inserted
+                derived = {'total_seconds': '0', 'total_pages_read': '0', 'session_count': '0',
+                           'last_session_at': 'NULL', 'author_id': 'NULL'}
+                for table, key in (('books', 'id'), ('book_notes', 'book_id'), ('reading_sessions', 'book_id')):
+                    cursor.execute(f'PRAGMA main.table_info({table})')
+                    columns = [column[1] for column in cursor.fetchall()]
+                    values = [derived.get(column, column) if table == 'books' else column for column in columns]
+                    cursor.execute(f'''
+                        INSERT INTO main.{table} ({', '.join(columns)})
+                        SELECT {', '.join(values)} FROM archive.{table} WHERE {key} = ?
+                    ''', (book_id,))
+                store_author(cursor, book_id, row[0])
+                cursor.execute('SELECT name FROM archive.book_tags WHERE book_id = ?', (book_id,))
+                store_tags(cursor, book_id, [tag for tag, in cursor.fetchall()])
+                # Copying notes and tags stamps the book; it was not edited, so
+                # keep its timestamp for sync conflict resolution
+                cursor.execute('''
+                    UPDATE main.books SET updated_at = (SELECT updated_at FROM archive.books WHERE id = ?)
+                    WHERE id = ?
+                ''', (book_id, book_id))
+            conn.commit()
+        
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            for table, key in (('reading_sessions', 'book_id'), ('book_notes', 'book_id'),
+                               ('book_tags', 'book_id'), ('books', 'id')):
+                cursor.execute(f'DELETE FROM archive.{table} WHERE {key} = ?', (book_id,))
+            self._bump_archive_version(cursor)
+            conn.commit()
+        return True
+    
+    def _bump_archive_version(self, cursor: sqlite3.Cursor):
+        cursor.execute(f'''
+            INSERT INTO settings (key, value) VALUES ('{ARCHIVE_VERSION_SETTING}', '1')
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        ''')
+    
+    @profiled
+    def get_archived_books(self) -> List[Dict]:
+        """Get the archived books, most recently read first."""
+        if not self.archive_path:
+            return []
+        columns = ('id', 'title', 'author', 'status', 'total_seconds', 'session_count', 'last_session_at')
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT {', '.join(columns)} FROM archive.books
+                ORDER BY last_session_at DESC
+            ''')
+            books = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for book in books:
+            book['last_session_at'] = epoch_to_local_iso(book['last_session_at'])
+        return books
+    
+    @profiled
+    @retry_on_busy
     def delete_all_data(self) -> bool:
         """Delete all application data (books and reading sessions)."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                # Delete reading sessions first (due to foreign key constraint)
-                cursor.execute('DELETE FROM reading_sessions')
-                # Delete books
-                cursor.execute('DELETE FROM books')
-                conn.commit()
-                return True
-        except Exception:
-            return False
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            # Delete reading sessions first (due to foreign key constraint)
+            cursor.execute('DELETE FROM reading_sessions')
+            # Delete books
+            cursor.execute('DELETE FROM books')
+            cursor.execute('DELETE FROM book_notes')
+            cursor.execute('DELETE FROM book_tags')
+            cursor.execute('DELETE FROM tags')
+            cursor.execute('DELETE FROM authors')
+            if self.archive_path:
+                for table in ('reading_sessions', 'book_notes', 'book_tags', 'books'):
+                    cursor.execute(f'DELETE FROM archive.{table}')
+            conn.commit()
+            return True
@@ -0,0 +1,245 @@
+"""
+Find and merge duplicate books.
+
+Titles and authors are reduced to keys (case, diacritics, punctuation and a
+leading article ignored) and compared by their sets of character trigrams.
+Books are blocked by author key and by title key, and within a block
+candidate pairs come from an inverted index over each key's rarest trigrams
+(prefix filtering), so only books that can reach the similarity threshold
+are ever compared, instead of every pair. Titles that differ in a number
+(volume 1 and volume 2) are never duplicates.
+
+Merging keeps the copy with the most reading sessions, moves the other
+copies' sessions, tags and notes to it and deletes them, all in one
+transaction. Synced libraries receive the merge as ordinary changes.
+
+Usage: python -m booktrack dedup [--threshold 0.7] [--apply] [--json] [--db BOOKTRACK_DB]
+"""
+
+import argparse
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .database import DatabaseManager, fold_author, store_notes, unpack_notes
+
+DEFAULT_THRESHOLD = 0.7
+# Authors are only compared once the titles match, so a looser bound suffices
+AUTHOR_THRESHOLD = 0.5
+
+_ARTICLE = re.compile(r'^(the|a|an) ')
+_NUMBER = re.compile(r'\d+')
+
+
+def title_key(title: str) -> str:
+    """Matching key of a title: folded, without punctuation or a leading article."""
+    key = fold_author(title).replace("'", '').replace('’', '').replace('&', ' and ')
+    key = ' '.join(re.sub(r'[^\w]', ' ', key).split())
+    return _ARTICLE.sub('', key)
+
+
+def author_key(author: str) -> str:
+    """Matching key of an author: folded and without punctuation."""
+    return ' '.join(re.sub(r'[^\w]', ' ', fold_author(author)).split())
+
+
+def trigrams(key: str) -> Set[str]:
+    """Character trigrams of a key, padded so short keys still have some."""
+    if not key:
+        return set()
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def similar_pairs(grams: List[Set[str]], threshold: float) -> Iterator[Tuple[int, int, float]]:
+    """Yield (i, j, similarity) for the sets with a Jaccard similarity of at least threshold.
+
+    Prefix filtering: with each set's trigrams ordered rarest first, two sets
+    that reach the threshold share one of their first few trigrams, so only
+    sets found through an inverted index over those prefixes are compared.
+    """
+    frequency = Counter(gram for item in grams for gram in item)
+    index = defaultdict(list)
+    # Visiting the smallest sets first lets the size filter skip whole postings
+    for i in sorted(range(len(grams)), key=lambda i: len(grams[i])):
+        size = len(grams[i])
+        if not size:
+            continue
+        min_size = threshold * size - 1e-9
+        ordered = sorted(grams[i], key=lambda gram: (frequency[gram], gram))
+        prefix = ordered[:size - math.ceil(min_size) + 1]
+        candidates = {j for gram in prefix for j in index[gram] if len(grams[j]) >= min_size}
+        for j in candidates:
+            score = jaccard(grams[i], grams[j])
+            if score >= threshold:
+                yield i, j, score
+        for gram in prefix:
+            index[gram].append(i)
+
+
+def find_duplicates(db_manager: DatabaseManager, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Find groups of books that look like copies of one another.
+
+    Books by the same author are compared by title, and books with the same
+    title by author, so misspellings of either are found. Each group is
+    {'keep': book, 'merge': [book, ...]}; merged books carry the 'similarity'
+    of their title to the closest book in the group.
+    """
+    with db_manager._connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, title, author, session_count FROM books ORDER BY id')
+        books = [{'id': row[0], 'title': row[1], 'author': row[2], 'session_count': row[3]}
+                 for row in cursor.fetchall()]
+
+    title_keys = [title_key(book['title']) for book in books]
+    author_keys = [author_key(book['author']) for book in books]
+    by_author = defaultdict(list)
+    by_title = defaultdict(list)
+    for i in range(len(books)):
+        by_author[author_keys[i]].append(i)
+        by_title[title_keys[i]].append(i)
+
+    parent = list(range(len(books)))
+    similarity = {}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def join(i, j, score):
+        for k in (i, j):
+            similarity[k] = max(similarity.get(k, 0.0), score)
+        parent[find(i)] = find(j)
+
+    for block in by_author.values():
+        if len(block) > 1:
+            for a, b, score in similar_pairs([trigrams(title_keys[i]) for i in block], threshold):
+                i, j = block[a], block[b]
+                if _NUMBER.findall(title_keys[i]) == _NUMBER.findall(title_keys[j]):
+                    join(i, j, score)
+    for key, block in by_title.items():
+        if len(block) > 1 and key:
+            for a, b, _ in similar_pairs([trigrams(author_keys[i]) for i in block], AUTHOR_THRESHOLD):
+                join(block[a], block[b], 1.0)
+
+    clusters = defaultdict(list)
+    for i in similarity:
+        clusters[find(i)].append(i)
+    groups = []
+    for members in clusters.values():
+        # The copy with the most reading history survives; the oldest on a tie
+        members.sort(key=lambda i: (-books[i]['session_count'], books[i]['id']))
+        groups.append({
+            'keep': books[members[0]],
+            'merge': [dict(books[i], similarity=round(similarity[i], 3)) for i in members[1:]]
+        })
+    groups.sort(key=lambda group: group['keep']['id'])
+    return groups
+
+
+def merge_duplicates(db_manager: DatabaseManager, groups: List[Dict]) -> Dict[str, int]:
+    """Merge each group into its kept book in a single transaction.
+
+    Books deleted since the groups were found are skipped. Returns the
+    number of groups merged, books removed and sessions moved.
+    """
+    result = {'groups': 0, 'books_merged': 0, 'sessions_moved': 0}
+    with db_manager._transaction() as conn:
+        cursor = conn.cursor()
+        for group in groups:
+            keep = group['keep']['id']
+            ids = [keep] + [book['id'] for book in group['merge']]
+            cursor.execute(f'SELECT id FROM books WHERE id IN ({", ".join("?" for _ in ids)})', ids)
+            present = {row[0] for row in cursor.fetchall()}
+            merged = [book_id for book_id in ids[1:] if book_id in present]
+            if keep not in present or not merged:
+                continue
+            placeholders = ', '.join('?' for _ in merged)
+
+            # Triggers move the reading totals and stamp the sessions as changed
+            cursor.execute(f'UPDATE reading_sessions SET book_id = ? WHERE book_id IN ({placeholders})',
+                           [keep] + merged)
+            result['sessions_moved'] += cursor.rowcount
+
+            # Fill in what the kept copy lacks
+            cursor.execute(f'''
+                UPDATE books SET
+                    total_pages = COALESCE(total_pages,
+                        (SELECT MAX(total_pages) FROM books WHERE id IN ({placeholders}))),
+                    cover_image_url = COALESCE(cover_image_url,
+                        (SELECT MAX(cover_image_url) FROM books WHERE id IN ({placeholders})))
+                WHERE id = ? AND (total_pages IS NULL OR cover_image_url IS NULL)
+            ''', merged + merged + [keep])
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO book_tags (book_id, tag_id)
+                SELECT ?, tag_id FROM book_tags WHERE book_id IN ({placeholders})
+            ''', [keep] + merged)
+            cursor.execute(f'SELECT book_id, body FROM book_notes WHERE book_id IN (?, {placeholders})',
+                           [keep] + merged)
+            notes = {book_id: unpack_notes(body) for book_id, body in cursor.fetchall()}
+            combined = []
+            for book_id in [keep] + merged:
+                if notes.get(book_id) and notes[book_id] not in combined:
+                    combined.append(notes[book_id])
+            if len(combined) > 1 or (combined and keep not in notes):
+                store_notes(cursor, keep, '\n\n'.join(combined))
+
+            cursor.execute(f'DELETE FROM book_notes WHERE book_id IN ({placeholders})', merged)
+            cursor.execute(f'DELETE FROM book_tags WHERE book_id IN ({placeholders})', merged)
+            cursor.execute(f'DELETE FROM books WHERE id IN ({placeholders})', merged)
+            result['groups'] += 1
+            result['books_merged'] += cursor.rowcount
+        conn.commit()
+    return result
+
+
+def format_report(groups: List[Dict]) -> str:
+    """Describe the groups found, one kept book and its copies per block."""
+    lines = []
+    for group in groups:
+        keep = group['keep']
+        lines.append(f"Keep #{keep['id']} {keep['title']!r} by {keep['author']} "
+                     f"({keep['session_count']} sessions)")
+        for book in group['merge']:
+            lines.append(f"  merge #{book['id']} {book['title']!r} by {book['author']} "
+                         f"({book['session_count']} sessions, similarity {book['similarity']:.2f})")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for dedup."""
+    parser = argparse.ArgumentParser(prog='booktrack dedup',
+                                     description='Find duplicate books and merge them.')
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='title similarity (0-1) for books to count as duplicates')
+    parser.add_argument('--apply', action='store_true', help='merge the duplicates instead of only reporting them')
+    parser.add_argument('--json', action='store_true', help='print the groups found as JSON')
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    groups = find_duplicates(db, args.threshold)
+    if args.json:
+        print(json.dumps(groups, indent=2))
+    else:
+        if groups:
+            print(format_report(groups))
+        if not args.apply:
+            duplicates = sum(len(group['merge']) for group in groups)
+            print(f"Dry run: {duplicates} duplicate books in {len(groups)} groups; use --apply to merge them")
+    if args.apply:
+        result = merge_duplicates(db, groups)
+        print(f"Merged {result['books_merged']} books into {result['groups']} and moved "
+              f"{result['sessions_moved']} reading sessions")
+    return 0
@@ -0,0 +1,110 @@
+"""
+Streaming, compressed JSON exports.
+
+An ExportJob writes the export_data() document one book at a time into a
+gzip- or xz-compressed file, so memory use stays flat however large the
+library. It is meant to run in a worker thread: progress (books and
+sessions written, compressed bytes) is reported through a callback at most
+every `interval` seconds, and cancel() stops the job at the next book,
+removing the partial file. Output goes to a temporary file that replaces
+the target only once complete.
+"""
+
+import gzip
+import io
+import json
+import lzma
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from .database import DatabaseManager
+
+# Compression name -> (file suffix, opener of a binary writer around a raw file)
+COMPRESSIONS = {
+    'gzip': ('.json.gz', lambda raw: gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)),
+    'xz': ('.json.xz', lambda raw: lzma.LZMAFile(raw, mode='wb', preset=6)),
+}
+
+
+class ExportCancelled(Exception):
+    """Raised by ExportJob.run() when the job was cancelled."""
+
+
+class ExportJob:
+    """Streams a library export into a compressed file."""
+
+    def __init__(self, db_manager: DatabaseManager, path: str, compression: str = 'gzip',
+                 progress: Optional[Callable[[Dict[str, int]], None]] = None, interval: float = 0.2):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f'Unknown compression: {compression}')
+        self.db_manager = db_manager
+        self.path = path
+        self.compression = compression
+        self.progress = progress
+        self.interval = interval
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Ask the job to stop; safe to call from any thread."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self) -> Dict[str, int]:
+        """Write the export and return the final counts.
+
+        Raises ExportCancelled when cancelled; no output is left behind then,
+        nor on any other error.
+        """
+        stats = {'books': 0, 'sessions': 0, 'bytes': 0, 'total_books': 0, 'total_sessions': 0}
+        tmp_path = self.path + '.part'
+        reported = time.monotonic()
+        # Totals are counted in the iterator's snapshot, so progress ends at exactly 100%
+        totals = {}
+        books = self.db_manager.iter_export_books(totals=totals)
+        try:
+            with open(tmp_path, 'wb') as raw:
+                with COMPRESSIONS[self.compression][1](raw) as compressed:
+                    out = io.TextIOWrapper(compressed, encoding='utf-8')
+                    out.write('{"export_date": %s, "books": [' % json.dumps(datetime.now().isoformat() + 'Z'))
+                    for book in books:
+                        if self.cancelled:
+                            raise ExportCancelled()
+                        if not stats['books']:
+                            stats.update(total_books=totals['books'], total_sessions=totals['sessions'])
+                        out.write(',\n' if stats['books'] else '\n')
+                        out.write(json.dumps(book, ensure_ascii=False))
+                        stats['books'] += 1
+                        stats['sessions'] += len(book['reading_logs'])
+                        if self.progress and time.monotonic() - reported >= self.interval:
+                            out.flush()
+                            stats['bytes'] = raw.tell()
+                            self.progress(dict(stats))
+                            reported = time.monotonic()
+                    out.write('\n]}\n')
+                    out.flush()
+                    # Leave the raw file open for the compressor to finish into
+                    out.detach()
+                stats['bytes'] = raw.tell()
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        finally:
+            # Releases the export's read snapshot when stopped early
+            books.close()
+        if self.progress:
+            self.progress(dict(stats))
+        return stats
+
+
+def export_filename(compression: str = 'gzip') -> str:
+    """Default export file name, timestamped."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"booktrack_export_{timestamp}{COMPRESSIONS[compression][0]}"
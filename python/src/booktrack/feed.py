@@ -0,0 +1,97 @@
+"""
+Incremental NDJSON export of library changes.
+
+Each export appends one JSON record per line for the books and reading
+sessions created or changed, and the rows deleted, since the previous
+export to the same file, in change order. The change sequence reached is
+stored in the database as that file's checkpoint, so an export reads only
+the rows changed since (through the change_seq indexes), not the whole
+library. Each batch ends with a checkpoint record.
+
+The feed is written before the checkpoint is saved, so an interrupted
+export is repeated in full by the next one: consumers should treat records
+as upserts keyed by uid, which makes a repeated record harmless.
+
+Usage: python -m booktrack export-feed PATH [--full] [--db BOOKTRACK_DB]
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, Iterator, List, Optional
+
+from .database import DatabaseManager
+from .sync import BOOK_FIELDS, BOOK_NOTES_FIELD, BOOK_TAGS_FIELD, SESSION_FIELDS
+
+# Settings key prefix of the change sequence each feed file has reached
+FEED_CHECKPOINT_PREFIX = 'feed_checkpoint:'
+
+
+def checkpoint_key(path: str) -> str:
+    """Settings key of a feed file's checkpoint."""
+    return FEED_CHECKPOINT_PREFIX + os.path.abspath(path)
+
+
+def feed_records(changes: Dict) -> List[Dict]:
+    """Turn DatabaseManager.get_changes_since() output into feed records, in change order."""
+    records = []
+    for book in changes['books']:
+        record = {'type': 'book', 'seq': book['change_seq'], 'id': book['id'], 'uid': book['uid'],
+                  'updated_at': book['updated_at']}
+        for field in BOOK_FIELDS + (BOOK_NOTES_FIELD, BOOK_TAGS_FIELD):
+            record[field] = book[field]
+        records.append(record)
+    for session in changes['reading_sessions']:
+        record = {'type': 'session', 'seq': session['change_seq'], 'id': session['id'], 'uid': session['uid'],
+                  'book_id': session['book_id'], 'updated_at': session['updated_at']}
+        for field in SESSION_FIELDS + ('local_day',):
+            record[field] = session[field]
+        records.append(record)
+    for deleted in changes['deleted']:
+        records.append({'type': 'deleted', 'seq': deleted['change_seq'], 'table': deleted['table'],
+                        'id': deleted['row_id'], 'uid': deleted['uid']})
+    records.sort(key=lambda record: record['seq'])
+    return records
+
+
+def export_changes(db_manager: DatabaseManager, path: str, full: bool = False) -> Dict[str, int]:
+    """Append the changes since the file's checkpoint to an NDJSON feed file.
+
+    With full, the file is rewritten from the start of the change history.
+    Returns the sequence range exported and the number of records written.
+    """
+    since = 0 if full else int(db_manager.get_setting(checkpoint_key(path), '0'))
+    changes = db_manager.get_changes_since(since)
+    records = feed_records(changes)
+    result = {'since': since, 'version': changes['version'], 'records': len(records)}
+    if records or full:
+        with open(path, 'w' if full else 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.write(json.dumps({'type': 'checkpoint', 'since': since, 'version': changes['version']}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    db_manager.set_setting(checkpoint_key(path), str(changes['version']))
+    return result
+
+
+def read_feed(path: str) -> Iterator[Dict]:
+    """Yield the records of a feed file one line at a time."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for export-feed."""
+    parser = argparse.ArgumentParser(prog='booktrack export-feed',
+                                     description='Append the changes since the last export to an NDJSON file.')
+    parser.add_argument('path', help='feed file to append to')
+    parser.add_argument('--full', action='store_true', help='rewrite the file with the whole change history')
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    args = parser.parse_args(argv)
+
+    result = export_changes(DatabaseManager(args.db), args.path, full=args.full)
+    print(f"Exported {result['records']} records (changes {result['since']}-{result['version']}) to {args.path}")
+    return 0
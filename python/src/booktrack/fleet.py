@@ -0,0 +1,141 @@
+"""
+Fleet-wide reading statistics across many library databases.
+
+Each database is opened read-only (mode=ro) in a worker process, which
+computes that library's aggregates; the parent only merges the partial
+results, so the work scales with the number of cores.
+
+Usage: python -m booktrack fleet-stats PATH [PATH ...] [--workers N] [--json]
+"""
+
+import argparse
+import glob
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from .database import DatabaseManager
+
+
+def library_aggregates(db_path: str) -> Dict:
+    """Compute the aggregates of one library (runs in a worker process)."""
+    try:
+        db = DatabaseManager(db_path, read_only=True)
+        stats = db.get_statistics()
+        daily = {date: [seconds, sessions, pages]
+                 for date, seconds, sessions, pages in db.get_daily_totals()}
+    except Exception as e:
+        return {'path': db_path, 'error': str(e)}
+    return {
+        'path': db_path,
+        'total_reading_time_seconds': stats['total_reading_time_seconds'],
+        'total_sessions': stats['total_sessions'],
+        'total_books': stats['total_books'],
+        'books_by_status': stats['books_by_status'],
+        'total_pages_read': sum(day[2] for day in daily.values()),
+        'daily': daily
+    }
+
+
+class FleetStatistics:
+    """Running merge of per-library aggregates."""
+
+    def __init__(self):
+        self.libraries = 0
+        self.total_reading_time_seconds = 0
+        self.total_sessions = 0
+        self.total_books = 0
+        self.total_pages_read = 0
+        self.books_by_status = Counter()
+        self.daily_seconds = Counter()
+        self.daily_sessions = Counter()
+        self.daily_pages = Counter()
+        self.errors: Dict[str, str] = {}
+
+    def add(self, partial: Dict):
+        """Merge one library_aggregates() result."""
+        if 'error' in partial:
+            self.errors[partial['path']] = partial['error']
+            return
+        self.libraries += 1
+        self.total_reading_time_seconds += partial['total_reading_time_seconds']
+        self.total_sessions += partial['total_sessions']
+        self.total_books += partial['total_books']
+        self.total_pages_read += partial['total_pages_read']
+        self.books_by_status.update(partial['books_by_status'])
+        for date, (seconds, sessions, pages) in partial['daily'].items():
+            self.daily_seconds[date] += seconds
+            self.daily_sessions[date] += sessions
+            self.daily_pages[date] += pages
+
+    def to_dict(self) -> Dict:
+        """Return the merged statistics as a JSON-serializable dictionary."""
+        return {
+            'libraries': self.libraries,
+            'total_reading_time_seconds': self.total_reading_time_seconds,
+            'total_sessions': self.total_sessions,
+            'total_books': self.total_books,
+            'total_pages_read': self.total_pages_read,
+            'books_by_status': dict(self.books_by_status),
+            'daily': [
+                {
+                    'date': date,
+                    'seconds': self.daily_seconds[date],
+                    'sessions': self.daily_sessions[date],
+                    'pages': self.daily_pages[date]
+                }
+                for date in sorted(self.daily_seconds, reverse=True)
+            ],
+            'errors': self.errors
+        }
+
+
+def find_databases(paths: Iterable[str]) -> List[str]:
+    """Expand directories into the .db files they contain."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, '*.db'))))
+        else:
+            found.append(path)
+    return found
+
+
+def collect_fleet_statistics(db_paths: List[str], max_workers: Optional[int] = None) -> Dict:
+    """Aggregate many libraries using a process pool."""
+    fleet = FleetStatistics()
+    if not db_paths:
+        return fleet.to_dict()
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(db_paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(library_aggregates, db_paths, chunksize=chunksize):
+            fleet.add(partial)
+    return fleet.to_dict()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for fleet-stats."""
+    parser = argparse.ArgumentParser(prog='booktrack fleet-stats',
+                                     description='Aggregate reading statistics across library databases.')
+    parser.add_argument('paths', nargs='+', help='database files or directories of .db files')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--json', action='store_true', help='print the full result as JSON')
+    args = parser.parse_args(argv)
+
+    result = collect_fleet_statistics(find_databases(args.paths), args.workers)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Libraries: {result['libraries']}")
+        print(f"Total Reading Time: {result['total_reading_time_seconds'] / 3600:.1f} hours")
+        print(f"Total Reading Sessions: {result['total_sessions']}")
+        print(f"Total Books: {result['total_books']}")
+        print(f"Total Pages Read: {result['total_pages_read']}")
+        for status, count in sorted(result['books_by_status'].items()):
+            print(f"  {status}: {count}")
+        for path, error in result['errors'].items():
+            print(f"ERROR: {path}: {error}")
+    return 1 if result['errors'] else 0
@@ -0,0 +1,134 @@
+"""
+Registry of Booktrack libraries, one database file per reader.
+
+Each library is a DatabaseManager that keeps its connection open between
+calls. Libraries are opened lazily, closed again after sitting idle, and can
+be aggregated in parallel.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from .database import DatabaseManager
+
+_LIBRARY_NAME = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+def merge_statistics(stats_list: Iterable[Dict]) -> Dict:
+    """Combine get_statistics() results from several libraries."""
+    totals = {
+        'total_reading_time_seconds': 0,
+        'total_sessions': 0,
+        'total_books': 0,
+        'books_by_status': Counter(),
+        'daily_stats': Counter()
+    }
+    for stats in stats_list:
+        totals['total_reading_time_seconds'] += stats['total_reading_time_seconds']
+        totals['total_sessions'] += stats['total_sessions']
+        totals['total_books'] += stats['total_books']
+        totals['books_by_status'].update(stats['books_by_status'])
+        for date, seconds in stats['daily_stats']:
+            totals['daily_stats'][date] += seconds
+    totals['books_by_status'] = dict(totals['books_by_status'])
+    totals['daily_stats'] = sorted(totals['daily_stats'].items(), reverse=True)
+    return totals
+
+
+class LibraryRegistry:
+    """Manages many library databases with lazy opening and idle eviction."""
+
+    def __init__(self, root_dir: Optional[str] = None, max_open: int = 16,
+                 idle_timeout: float = 300.0):
+        if root_dir is None:
+            root_dir = os.path.expanduser("~/.booktrack/libraries")
+        os.makedirs(root_dir, exist_ok=True)
+        self.root_dir = root_dir
+        self.max_open = max_open
+        self.idle_timeout = idle_timeout
+        self._paths: Dict[str, str] = {}
+        self._libraries: Dict[str, DatabaseManager] = {}
+        self._lock = threading.Lock()
+
+    def library_path(self, name: str) -> str:
+        """Return the database file used for a library name."""
+        if name in self._paths:
+            return self._paths[name]
+        if not _LIBRARY_NAME.match(name):
+            raise ValueError(f"Invalid library name: {name!r}")
+        return os.path.join(self.root_dir, f"{name}.db")
+
+    def register(self, name: str, db_path: str):
+        """Register a library stored outside the registry directory."""
+        with self._lock:
+            self._paths[name] = db_path
+
+    def list_libraries(self) -> List[str]:
+        """Return the names of all known libraries."""
+        names = set(self._paths)
+        for filename in os.listdir(self.root_dir):
+            if filename.endswith('.db'):
+                names.add(filename[:-3])
+        return sorted(names)
+
+    def get(self, name: str) -> DatabaseManager:
+        """Return the library's DatabaseManager, opening it on first use."""
+        with self._lock:
+            library = self._libraries.get(name)
+            if library is None:
+                library = DatabaseManager(self.library_path(name), reuse_connection=True)
+                self._libraries[name] = library
+        self.evict_idle(keep=name)
+        return library
+
+    def open_libraries(self) -> List[str]:
+        """Return the names of libraries whose connection is currently open."""
+        with self._lock:
+            return [name for name, library in self._libraries.items() if library.is_open]
+
+    def evict_idle(self, now: Optional[float] = None, keep: Optional[str] = None) -> List[str]:
+        """Close idle connections and enforce max_open, least recently used first."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            candidates = sorted(
+                ((library.last_used, name, library) for name, library in self._libraries.items()
+                 if library.is_open and name != keep),
+                key=lambda item: item[0]
+            )
+        open_count = len(candidates) + (1 if keep in self._libraries else 0)
+        closed = []
+        for last_used, name, library in candidates:
+            if now - last_used >= self.idle_timeout or open_count > self.max_open:
+                library.close()
+                closed.append(name)
+                open_count -= 1
+        return closed
+
+    def close(self, name: str):
+        """Close a library's connection."""
+        with self._lock:
+            library = self._libraries.get(name)
+        if library is not None:
+            library.close()
+
+    def close_all(self):
+        """Close every open library connection."""
+        with self._lock:
+            libraries = list(self._libraries.values())
+        for library in libraries:
+            library.close()
+
+    def aggregate_statistics(self, names: Optional[List[str]] = None,
+                             max_workers: Optional[int] = None) -> Dict:
+        """Compute statistics for each library in a thread pool and merge them."""
+        names = self.list_libraries() if names is None else names
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            per_library = dict(zip(names, executor.map(lambda n: self.get(n).get_statistics(), names)))
+        result = merge_statistics(per_library.values())
+        result['libraries'] = per_library
+        return result
@@ -0,0 +1,253 @@
+"""
+Opt-in instrumentation for DatabaseManager.
+
+Records per-method and per-statement latency histograms, row counts and
+connection opens so slow queries can be found without an external profiler.
+"""
+
+import functools
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Upper bounds (in milliseconds) of the latency histogram buckets
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so the same statement always maps to one key."""
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count, total and max."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float):
+        """Record a single observation in milliseconds."""
+        index = len(BUCKET_BOUNDS_MS)
+        for i, bound in enumerate(BUCKET_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def percentile(self, pct: float) -> float:
+        """Estimate a percentile (0-100) from the bucket upper bounds."""
+        if self.count == 0:
+            return 0.0
+        target = self.count * pct / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                if i < len(BUCKET_BOUNDS_MS):
+                    return min(BUCKET_BOUNDS_MS[i], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict:
+        """Return a JSON-serializable summary of the histogram."""
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}ms"]
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.mean_ms, 3),
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'buckets': {label: n for label, n in zip(labels, self.buckets) if n}
+        }
+
+
+class StatementStats:
+    """Timing and row counts for one normalized SQL statement."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.latency = LatencyHistogram()
+        self.rows = 0
+        self.sample_params = ()
+
+    def to_dict(self) -> Dict:
+        data = self.latency.to_dict()
+        data['sql'] = self.sql
+        data['rows'] = self.rows
+        return data
+
+
+class QueryProfiler:
+    """Collects method, statement and connection metrics for a DatabaseManager."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discard everything recorded so far."""
+        with self._lock:
+            self.methods: Dict[str, LatencyHistogram] = {}
+            self.statements: Dict[str, StatementStats] = {}
+            self.traced: Dict[str, int] = {}
+            self.connections_opened = 0
+
+    def record_method(self, name: str, elapsed_ms: float):
+        with self._lock:
+            histogram = self.methods.get(name)
+            if histogram is None:
+                histogram = self.methods[name] = LatencyHistogram()
+            histogram.record(elapsed_ms)
+
+    def record_statement(self, sql: str, params, elapsed_ms: float, rows: int = 0):
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is None:
+                stats = self.statements[key] = StatementStats(key)
+            # Keep the parameters of the slowest execution for EXPLAIN
+            if elapsed_ms >= stats.latency.max_ms:
+                stats.sample_params = tuple(params) if params is not None else ()
+            stats.latency.record(elapsed_ms)
+            stats.rows += max(rows, 0)
+
+    def record_rows(self, sql: str, rows: int):
+        key = normalize_sql(sql)
+        with self._lock:
+            stats = self.statements.get(key)
+            if stats is not None:
+                stats.rows += rows
+
+    def record_trace(self, sql: str):
+        """sqlite3 trace callback: counts every statement the engine runs."""
+        key = normalize_sql(sql)
+        with self._lock:
+            self.traced[key] = self.traced.get(key, 0) + 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def attach(self, conn: sqlite3.Connection):
+        """Register this profiler's trace callback on a new connection."""
+        self.record_connection()
+        conn.set_trace_callback(self.record_trace)
+
+    def slowest_statements(self, limit: int = 10) -> List[StatementStats]:
+        """Return statements ordered by their worst observed latency."""
+        with self._lock:
+            stats = list(self.statements.values())
+        stats.sort(key=lambda s: s.latency.max_ms, reverse=True)
+        return stats[:limit]
+
+    def to_dict(self) -> Dict:
+        """Return all recorded metrics as a JSON-serializable dictionary."""
+        with self._lock:
+            return {
+                'connections_opened': self.connections_opened,
+                'methods': {name: h.to_dict() for name, h in sorted(self.methods.items())},
+                'statements': [s.to_dict() for s in self.statements.values()],
+                'traced_statements': dict(self.traced)
+            }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def export_json(self, path: str):
+        """Write the recorded metrics to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """Cursor that reports statement latency and row counts to a profiler."""
+
+    profiler: Optional[QueryProfiler] = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._last_sql = sql
+            self.profiler.record_statement(sql, parameters, elapsed_ms, self.rowcount)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._last_sql = sql
+            self.profiler.record_statement(sql, None, elapsed_ms, self.rowcount)
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self.profiler.record_rows(self._last_sql, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size) if size is not None else super().fetchmany()
+        self.profiler.record_rows(self._last_sql, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self.profiler.record_rows(self._last_sql, len(rows))
+        return rows
+
+
+class ProfilingConnection(sqlite3.Connection):
+    """Connection whose cursors are ProfilingCursors bound to a profiler."""
+
+    profiler: Optional[QueryProfiler] = None
+
+    def cursor(self, factory=None):
+        cursor = super().cursor(factory or ProfilingCursor)
+        cursor.profiler = self.profiler
+        cursor._last_sql = ''
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def profiled(method):
+    """Decorator timing a DatabaseManager method when profiling is enabled."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            profiler.record_method(name, (time.perf_counter() - start) * 1000)
+
+    return wrapper
@@ -0,0 +1,111 @@
+"""
+Import a library from the Android app's Room database.
+
+The Room file (pulled from the device, e.g. with `adb exec-out run-as
+com.example.booktrack cat databases/booktrack_database`) is attached
+read-only and copied with set-based INSERT ... SELECT statements, so no
+row passes through Python.
+
+Usage: python -m booktrack import-room ROOM_DB [--db BOOKTRACK_DB]
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .database import DatabaseManager, link_authors
+
+# BookStatus enum names (ACTIVE, READ, ...) become 'Active', 'Read', ...
+_STATUS = "UPPER(SUBSTR(b.status, 1, 1)) || LOWER(SUBSTR(b.status, 2))"
+
+# Room stores reading_logs.date as epoch milliseconds when the session was saved
+_END = "l.date / 1000"
+_START = "(l.date / 1000 - l.duration)"
+
+
+def import_room_database(db_manager: DatabaseManager, room_path: str) -> Dict[str, int]:
+    """Copy all books and reading logs from a Room database into Booktrack.
+
+    Returns the number of books and sessions imported.
+    """
+    if not Path(room_path).is_file():
+        raise FileNotFoundError(room_path)
+    room_uri = Path(room_path).resolve().as_uri() + '?mode=ro'
+
+    with db_manager._connect() as conn:
+        cursor = conn.cursor()
+        # ATTACH is not allowed inside a transaction, so the write lock is taken after it
+        cursor.execute('ATTACH DATABASE ? AS room', (room_uri,))
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            # Room ids are renumbered after the current highest Booktrack id
+            cursor.execute('''
+                SELECT MAX(COALESCE((SELECT seq FROM main.sqlite_sequence WHERE name = 'books'), 0),
+                           COALESCE((SELECT MAX(id) FROM main.books), 0))
+            ''')
+            offset = cursor.fetchone()[0]
+
+            cursor.execute('DROP TABLE IF EXISTS temp.room_book_map')
+            cursor.execute('''
+                CREATE TEMP TABLE room_book_map (
+                    room_id INTEGER PRIMARY KEY,
+                    book_id INTEGER NOT NULL
+                )
+            ''')
+            cursor.execute('''
+                INSERT INTO temp.room_book_map (room_id, book_id)
+                SELECT id, ? + ROW_NUMBER() OVER (ORDER BY id) FROM room.books
+            ''', (offset,))
+
+            cursor.execute(f'''
+                INSERT INTO main.books (id, title, author, total_pages, cover_image_url, status)
+                SELECT m.book_id, b.title, b.author, b.totalPages, b.coverImage, {_STATUS}
+                FROM room.books b
+                JOIN temp.room_book_map m ON m.room_id = b.id
+                ORDER BY m.book_id
+            ''')
+            books_imported = cursor.rowcount
+
+            link_authors(cursor)
+
+            cursor.execute('''
+                INSERT INTO main.book_notes (book_id, body)
+                SELECT m.book_id, pack_notes(b.notes)
+                FROM room.books b
+                JOIN temp.room_book_map m ON m.room_id = b.id
+                WHERE b.notes <> ''
+            ''')
+
+            db_manager._zone(cursor)
+            cursor.execute(f'''
+                INSERT INTO main.reading_sessions
+                    (book_id, duration_seconds, pages_read, start_time, end_time, session_date, local_day)
+                SELECT m.book_id, l.duration, l.pagesRead, {_START}, {_END}, {_END}, local_day({_START})
+                FROM room.reading_logs l
+                JOIN temp.room_book_map m ON m.room_id = l.bookId
+                ORDER BY l.date
+            ''')
+            sessions_imported = cursor.rowcount
+
+            cursor.execute('DROP TABLE temp.room_book_map')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute('DETACH DATABASE room')
+
+    return {'books': books_imported, 'sessions': sessions_imported}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for import-room."""
+    parser = argparse.ArgumentParser(prog='booktrack import-room',
+                                     description="Import the Android app's Room database.")
+    parser.add_argument('room_db', help='path to the pulled Room database file')
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    args = parser.parse_args(argv)
+
+    result = import_room_database(DatabaseManager(args.db), args.room_db)
+    print(f"Imported {result['books']} books and {result['sessions']} reading sessions")
+    return 0
@@ -0,0 +1,363 @@
+"""
+Local HTTP/JSON API over DatabaseManager.
+
+Reads run on a pool of read-only connections; all writes go through a single
+serialized writer. Every response carries an ETag derived from the database
+change sequence, read in the same snapshot as the payload, so polling
+clients sending If-None-Match get a 304 without any query beyond reading
+the sequence.
+
+Endpoints:
+    GET  /books[?status=Active&tags=a,b&any_tags=c,d&without_tags=e&author_id=<id>&sort=most_read]
+    GET  /books/<id>
+    GET  /authors[?prefix=<text>&sort=most_read&limit=<n>]
+    GET  /books/<id>/sessions       GET  /sessions[?book_id=<id>&start=<iso>&end=<iso>]
+    GET  /statistics                GET  /export
+    GET  /version
+    POST /books                     POST /sessions
+
+Lists leave out notes; GET /books/<id> includes the book's notes.
+
+Usage: python -m booktrack serve [--host 127.0.0.1] [--port 8765] [--db PATH]
+"""
+
+import argparse
+import asyncio
+import collections
+import contextvars
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .database import DatabaseManager, to_epoch
+
+MAX_BODY_SIZE = 1024 * 1024
+
+# Change versions seen by the reads of the GET request being handled
+_read_versions: contextvars.ContextVar = contextvars.ContextVar('read_versions', default=None)
+
+
+def parse_etags(header: Optional[str]) -> List[str]:
+    """The entity tags of an If-None-Match header, without weak prefixes; '*' is kept."""
+    if not header:
+        return []
+    etags = []
+    for etag in header.split(','):
+        etag = etag.strip()
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        if etag:
+            etags.append(etag)
+    return etags
+
+
+class HTTPError(Exception):
+    """An error answered with the given status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class BooktrackServer:
+    """asyncio HTTP server exposing a Booktrack library as JSON."""
+
+    def __init__(self, db_path: Optional[str] = None, host: str = '127.0.0.1', port: int = 8765,
+                 read_pool_size: int = 4, cache_size: int = 128):
+        self.host = host
+        self.port = port
+        # The writer migrates the schema before any reader opens the file
+        self.writer = DatabaseManager(db_path, reuse_connection=True)
+        self.readers: queue.Queue = queue.Queue()
+        for _ in range(read_pool_size):
+            self.readers.put(DatabaseManager(self.writer.db_path, reuse_connection=True, read_only=True))
+        self._read_executor = ThreadPoolExecutor(max_workers=read_pool_size,
+                                                 thread_name_prefix='booktrack-read')
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='booktrack-write')
+        self._cache: 'collections.OrderedDict[Tuple[str, int], bytes]' = collections.OrderedDict()
+        self._cache_size = cache_size
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # Database access
+
+    def _with_reader(self, func: Callable[[DatabaseManager], object], versions: Optional[List[int]] = None):
+        reader = self.readers.get()
+        try:
+            with reader.snapshot():
+                if versions is not None:
+                    versions.append(reader.get_change_version())
+                return func(reader)
+        finally:
+            self.readers.put(reader)
+
+    async def read(self, func: Callable[[DatabaseManager], object]):
+        """Run a read on the pooled read-only connections, in one snapshot.
+
+        During a GET request, the change version of that snapshot is recorded
+        for the response's ETag.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._read_executor, self._with_reader, func, _read_versions.get())
+
+    async def write(self, func: Callable[[DatabaseManager], object]):
+        """Run a write on the single serialized writer."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._write_executor, func, self.writer)
+
+    # Routing
+
+    def route(self, method: str, path: str) -> Tuple[Optional[Callable], Dict]:
+        """Return the handler for a request and its path parameters."""
+        parts = [part for part in path.split('/') if part]
+        if method == 'GET':
+            if parts == ['books']:
+                return self.get_books, {}
+            if len(parts) == 2 and parts[0] == 'books':
+                return self.get_book, {'book_id': parts[1]}
+            if len(parts) == 3 and parts[0] == 'books' and parts[2] == 'sessions':
+                return self.get_sessions, {'book_id': parts[1]}
+            if parts == ['sessions']:
+                return self.get_sessions, {}
+            if parts == ['authors']:
+                return self.get_authors, {}
+            if parts == ['statistics']:
+                return self.get_statistics, {}
+            if parts == ['export']:
+                return self.get_export, {}
+            if parts == ['version']:
+                return self.get_version, {}
+        elif method == 'POST':
+            if parts == ['books']:
+                return self.post_book, {}
+            if parts == ['sessions']:
+                return self.post_session, {}
+        return None, {}
+
+    @staticmethod
+    def _int_param(value, name: str) -> Optional[int]:
+        if value is None:
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f'{name} must be an integer')
+
+    async def get_books(self, query: Dict, body: Optional[Dict]):
+        status = query.get('status')
+        sort = query.get('sort', 'created')
+        author_id = self._int_param(query.get('author_id'), 'author_id')
+        # Tag lists are comma-separated
+        tags = {key: [tag for tag in query.get(key, '').split(',') if tag]
+                for key in ('tags', 'any_tags', 'without_tags')}
+        try:
+            return await self.read(lambda db: db.get_books(
+                status=status, sort=sort, all_tags=tags['tags'], any_tags=tags['any_tags'],
+                without_tags=tags['without_tags'], author_id=author_id))
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+
+    async def get_authors(self, query: Dict, body: Optional[Dict]):
+        prefix = query.get('prefix')
+        sort = query.get('sort', 'name')
+        limit = self._int_param(query.get('limit'), 'limit')
+        try:
+            return await self.read(lambda db: db.get_authors(prefix=prefix, sort=sort, limit=limit))
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+
+    async def get_book(self, query: Dict, body: Optional[Dict], book_id: str):
+        book_id = self._int_param(book_id, 'book id')
+        book = await self.read(lambda db: db.get_book(book_id))
+        if book is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'Book not found')
+        return book
+
+    async def get_sessions(self, query: Dict, body: Optional[Dict], book_id: Optional[str] = None):
+        book_id = self._int_param(book_id or query.get('book_id'), 'book_id')
+        try:
+            start = to_epoch(query.get('start'))
+            end = to_epoch(query.get('end'))
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        return await self.read(lambda db: db.get_reading_sessions(book_id, start=start, end=end))
+
+    async def get_statistics(self, query: Dict, body: Optional[Dict]):
+        return await self.read(lambda db: db.get_statistics())
+
+    async def get_export(self, query: Dict, body: Optional[Dict]):
+        return await self.read(lambda db: db.export_data())
+
+    async def get_version(self, query: Dict, body: Optional[Dict]):
+        return {'version': await self.read(lambda db: db.get_change_version())}
+
+    async def post_book(self, query: Dict, body: Optional[Dict]):
+        if not body or not body.get('title') or not body.get('author'):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'title and author are required')
+        book_id = await self.write(lambda db: db.add_book(
+            title=body['title'],
+            author=body['author'],
+            total_pages=body.get('total_pages'),
+            cover_image_url=body.get('cover_image_url'),
+            notes=body.get('notes')
+        ))
+        return {'id': book_id}
+
+    async def post_session(self, query: Dict, body: Optional[Dict]):
+        if not body or 'book_id' not in body or 'duration_seconds' not in body:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'book_id and duration_seconds are required')
+        book_id = self._int_param(body['book_id'], 'book_id')
+        duration = self._int_param(body['duration_seconds'], 'duration_seconds')
+        try:
+            start_time = to_epoch(body.get('start_time'))
+            end_time = to_epoch(body.get('end_time'))
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        book = await self.read(lambda db: db.get_book(book_id))
+        if book is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'Book not found')
+        session_id = await self.write(lambda db: db.add_reading_session(
+            book_id=book_id,
+            duration_seconds=duration,
+            pages_read=body.get('pages_read'),
+            notes=body.get('notes'),
+            start_time=start_time,
+            end_time=end_time
+        ))
+        return {'id': session_id}
+
+    # HTTP handling
+
+    async def handle_request(self, method: str, target: str, headers: Dict[str, str],
+                             body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Produce (status, headers, body) for one request."""
+        url = urlsplit(target)
+        handler, params = self.route(method, url.path)
+        if handler is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, 'Not found')
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if method == 'GET':
+            version = await self.read(lambda db: db.get_change_version())
+            etags = parse_etags(headers.get('if-none-match'))
+            if '*' in etags or f'"{version}"' in etags:
+                return HTTPStatus.NOT_MODIFIED, {'ETag': f'W/"{version}"'}, b''
+            payload = self._cache.get((target, version))
+            if payload is None:
+                versions = []
+                token = _read_versions.set(versions)
+                try:
+                    result = await handler(query, None, **params)
+                finally:
+                    _read_versions.reset(token)
+                # The payload is tagged with the version of the snapshot it was read from
+                version = versions[-1]
+                payload = json.dumps(result).encode('utf-8')
+                self._cache[(target, version)] = payload
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end((target, version))
+            return HTTPStatus.OK, {'ETag': f'W/"{version}"', 'Content-Type': 'application/json'}, payload
+
+        try:
+            data = json.loads(body.decode('utf-8')) if body else None
+        except (UnicodeDecodeError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Body must be JSON')
+        result = await handler(query, data, **params)
+        return HTTPStatus.CREATED, {'Content-Type': 'application/json'}, json.dumps(result).encode('utf-8')
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one (keep-alive) connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length > MAX_BODY_SIZE:
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Body too large')
+                    body = await reader.readexactly(length) if length else b''
+                    status, response_headers, payload = await self.handle_request(
+                        method.upper(), target, headers, body)
+                except HTTPError as e:
+                    status, response_headers = e.status, {'Content-Type': 'application/json'}
+                    payload = json.dumps({'error': e.message}).encode('utf-8')
+                except Exception as e:
+                    status, response_headers = HTTPStatus.INTERNAL_SERVER_ERROR, {'Content-Type': 'application/json'}
+                    payload = json.dumps({'error': str(e)}).encode('utf-8')
+
+                status = HTTPStatus(status)
+                response_headers['Content-Length'] = str(len(payload))
+                response_headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+                head = f'HTTP/1.1 {status.value} {status.phrase}\r\n' + ''.join(
+                    f'{name}: {value}\r\n' for name, value in response_headers.items()) + '\r\n'
+                writer.write(head.encode('latin-1') + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Start listening; returns the asyncio server."""
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def stop(self):
+        """Stop listening and release connections and worker threads."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._read_executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+        while not self.readers.empty():
+            self.readers.get().close()
+        self.writer.close()
+
+    async def serve_forever(self):
+        server = await self.start()
+        print(f"Booktrack API listening on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for serve."""
+    parser = argparse.ArgumentParser(prog='booktrack serve', description='Serve the library as a JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    parser.add_argument('--readers', type=int, default=4, help='number of pooled read connections')
+    args = parser.parse_args(argv)
+
+    server = BooktrackServer(args.db, args.host, args.port, read_pool_size=args.readers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
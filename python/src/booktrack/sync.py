@@ -0,0 +1,357 @@
+"""
+Delta sync between Booktrack libraries.
+
+Every tracked row carries a local change_seq, a uid shared by all copies of
+the row, and an updated_at timestamp (epoch ms). A changeset holds the rows
+changed and the uids deleted after a given change_seq, so a sync costs what
+changed rather than the size of the library.
+
+Conflict rules:
+- Concurrent edits of the same row: the newer updated_at wins; ties go to
+  the larger replica id so both sides pick the same winner.
+- Deletes win over concurrent edits; a deleted uid is never re-created.
+- Rows identical to the local copy are skipped, so echoed changes are free.
+- A book archived locally is restored when a peer edits or deletes it or
+  logs a session for it.
+
+Usage: python -m booktrack sync OTHER_DB [--db BOOKTRACK_DB]
+"""
+
+import argparse
+import gzip
+import json
+from typing import Dict, List, Optional
+
+from .database import (BOOK_NOTES_SQL, LOCAL_DAY_SQL, DatabaseManager, clean_tags, load_tags,
+                       store_author, store_notes, store_tags, unpack_notes)
+
+BOOK_FIELDS = ('title', 'author', 'total_pages', 'cover_image_url', 'status', 'created_at')
+# Notes and tags are stored in their own tables but travel with their book
+BOOK_NOTES_FIELD = 'notes'
+BOOK_TAGS_FIELD = 'tags'
+# Session times travel as integer epoch seconds (UTC), as stored
+SESSION_FIELDS = ('duration_seconds', 'pages_read', 'notes', 'start_time', 'end_time', 'session_date')
+
+
+def build_changeset(db_manager: DatabaseManager, since: int = 0) -> Dict:
+    """Build the changeset of everything changed after change_seq `since`."""
+    with db_manager._connect() as conn:
+        cursor = conn.cursor()
+        # Read everything from one snapshot of the database
+        cursor.execute('BEGIN')
+        cursor.execute('SELECT value FROM change_sequence WHERE id = 1')
+        version = cursor.fetchone()[0]
+        cursor.execute("SELECT value FROM settings WHERE key = 'replica_id'")
+        replica_id = cursor.fetchone()[0]
+
+        cursor.execute(f'''
+            SELECT id, uid, updated_at, {", ".join(BOOK_FIELDS)}, {BOOK_NOTES_SQL}
+            FROM books
+            WHERE change_seq > ? AND change_seq <= ?
+            ORDER BY change_seq
+        ''', (since, version))
+        rows = cursor.fetchall()
+        tags = load_tags(cursor, [row[0] for row in rows])
+        books = [
+            dict(zip(('uid', 'updated_at') + BOOK_FIELDS + (BOOK_NOTES_FIELD,), row[1:]),
+                 **{BOOK_TAGS_FIELD: tags[row[0]]})
+            for row in rows
+        ]
+
+        session_columns = ', '.join(f'rs.{field}' for field in SESSION_FIELDS)
+        cursor.execute(f'''
+            SELECT rs.uid, rs.updated_at, b.uid, {session_columns}
+            FROM reading_sessions rs
+            JOIN books b ON rs.book_id = b.id
+            WHERE rs.change_seq > ? AND rs.change_seq <= ?
+            ORDER BY rs.change_seq
+        ''', (since, version))
+        sessions = [
+            dict(zip(('uid', 'updated_at', 'book_uid') + SESSION_FIELDS, row))
+            for row in cursor.fetchall()
+        ]
+
+        cursor.execute('''
+            SELECT table_name, uid FROM tombstones
+            WHERE change_seq > ? AND change_seq <= ? AND uid IS NOT NULL
+            ORDER BY change_seq
+        ''', (since, version))
+        deleted = [{'table': row[0], 'uid': row[1]} for row in cursor.fetchall()]
+        conn.commit()
+
+    return {
+        'replica_id': replica_id,
+        'since': since,
+        'version': version,
+        'books': books,
+        'sessions': sessions,
+        'deleted': deleted
+    }
+
+
+def _remote_wins(remote: Dict, local_updated_at: Optional[int],
+                 remote_replica: str, local_replica: str) -> bool:
+    remote_updated_at = remote['updated_at'] or 0
+    local_updated_at = local_updated_at or 0
+    if remote_updated_at != local_updated_at:
+        return remote_updated_at > local_updated_at
+    return remote_replica > local_replica
+
+
+def _archived_books_changed(db_manager: DatabaseManager, changeset: Dict) -> List[int]:
+    """Ids of archived books that the changeset edits, adds sessions to or deletes from."""
+    book_ids = set()
+    with db_manager._connect() as conn:
+        cursor = conn.cursor()
+
+        def archived_book(uid):
+            cursor.execute('SELECT id FROM archive.books WHERE uid = ?', (uid,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+        for book in changeset['books']:
+            book_id = archived_book(book['uid'])
+            if book_id is None:
+                continue
+            cursor.execute(f'SELECT {", ".join(BOOK_FIELDS)} FROM archive.books WHERE id = ?', (book_id,))
+            archived = tuple(cursor.fetchone())
+            cursor.execute('SELECT body FROM archive.book_notes WHERE book_id = ?', (book_id,))
+            row = cursor.fetchone()
+            notes = unpack_notes(row[0]) if row else None
+            cursor.execute('SELECT name FROM archive.book_tags WHERE book_id = ?', (book_id,))
+            tags = sorted((name for name, in cursor.fetchall()), key=str.casefold)
+            remote = (tuple(book[field] for field in BOOK_FIELDS), book.get(BOOK_NOTES_FIELD) or None,
+                      sorted(clean_tags(book.get(BOOK_TAGS_FIELD) or []), key=str.casefold))
+            if remote != (archived, notes, tags):
+                book_ids.add(book_id)
+        for session in changeset['sessions']:
+            book_id = archived_book(session['book_uid'])
+            if book_id is None:
+                continue
+            cursor.execute(f'SELECT {", ".join(SESSION_FIELDS)} FROM archive.reading_sessions WHERE uid = ?',
+                           (session['uid'],))
+            archived = cursor.fetchone()
+            if archived is None or tuple(archived) != tuple(session[field] for field in SESSION_FIELDS):
+                book_ids.add(book_id)
+        for deleted in changeset['deleted']:
+            if deleted['table'] == 'books':
+                book_id = archived_book(deleted['uid'])
+            else:
+                cursor.execute('SELECT book_id FROM archive.reading_sessions WHERE uid = ?', (deleted['uid'],))
+                row = cursor.fetchone()
+                book_id = row[0] if row else None
+            if book_id is not None:
+                book_ids.add(book_id)
+    return sorted(book_ids)
+
+
+def apply_changeset(db_manager: DatabaseManager, changeset: Dict) -> Dict[str, int]:
+    """Apply a peer's changeset in a single transaction.
+
+    Returns counts of rows inserted, updated, deleted, skipped as unchanged,
+    and conflicts resolved in favour of the local copy.
+    """
+    result = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0, 'conflicts': 0}
+    remote_replica = changeset['replica_id']
+
+    # A peer's edits, sessions and deletes for a book archived here apply to
+    # the book as usual once it is restored; echoes of unchanged rows do not
+    # restore it
+    if db_manager.archive_path:
+        for book_id in _archived_books_changed(db_manager, changeset):
+            db_manager.restore_archived_book(book_id)
+
+    with db_manager._transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM settings WHERE key = 'replica_id'")
+        local_replica = cursor.fetchone()[0]
+
+        def is_deleted(table, uid):
+            cursor.execute('SELECT 1 FROM tombstones WHERE table_name = ? AND uid = ? LIMIT 1', (table, uid))
+            return cursor.fetchone() is not None
+
+        def is_archived(table, uid):
+            if table != 'books' or not db_manager.archive_path:
+                return False
+            cursor.execute('SELECT 1 FROM archive.books WHERE uid = ? LIMIT 1', (uid,))
+            return cursor.fetchone() is not None
+
+        def upsert(table, fields, values, row, extra=(), read_extra=None):
+            """Insert or update a row; returns its local id when written.
+
+            `extra` holds values kept outside the row, compared with
+            `read_extra(local id)` along with the fields but written by the caller.
+            """
+            cursor.execute(f'SELECT id, updated_at, {", ".join(fields)} FROM {table} WHERE uid = ?',
+                           (row['uid'],))
+            local = cursor.fetchone()
+            if local is None:
+                if is_deleted(table, row['uid']):
+                    result['conflicts'] += 1
+                    return None
+                if is_archived(table, row['uid']):
+                    # Only unchanged books are still archived at this point
+                    result['unchanged'] += 1
+                    return None
+                columns = ('uid', 'updated_at') + fields
+                cursor.execute(
+                    f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" for _ in columns)})',
+                    (row['uid'], row['updated_at']) + values
+                )
+                result['inserted'] += 1
+                return cursor.lastrowid
+            elif tuple(local[2:]) + (read_extra(local[0]) if read_extra else ()) == values + extra:
+                result['unchanged'] += 1
+            elif _remote_wins(row, local[1], remote_replica, local_replica):
+                assignments = ', '.join(f'{field} = ?' for field in fields)
+                cursor.execute(f'UPDATE {table} SET {assignments}, updated_at = ? WHERE id = ?',
+                               values + (row['updated_at'], local[0]))
+                # On a tie the timestamp is unchanged, so the update trigger restamped
+                # it; keep the peer's, or the row would echo back as a newer edit
+                cursor.execute(f'UPDATE {table} SET updated_at = ? WHERE id = ?', (row['updated_at'], local[0]))
+                result['updated'] += 1
+                return local[0]
+            else:
+                result['conflicts'] += 1
+            return None
+
+        def book_extras(book_id):
+            cursor.execute(f'SELECT {BOOK_NOTES_SQL} FROM books WHERE id = ?', (book_id,))
+            return (cursor.fetchone()[0], load_tags(cursor, [book_id])[book_id])
+
+        for book in changeset['books']:
+            notes = book.get(BOOK_NOTES_FIELD) or None
+            tags = sorted(clean_tags(book.get(BOOK_TAGS_FIELD) or []), key=str.casefold)
+            book_id = upsert('books', BOOK_FIELDS, tuple(book[field] for field in BOOK_FIELDS), book,
+                             extra=(notes, tags), read_extra=book_extras)
+            if book_id is not None:
+                store_author(cursor, book_id, book['author'])
+                store_notes(cursor, book_id, notes)
+                store_tags(cursor, book_id, tags)
+                # Writing notes and tags stamps the book; keep the peer's timestamp
+                cursor.execute('UPDATE books SET updated_at = ? WHERE id = ?', (book['updated_at'], book_id))
+
+        for session in changeset['sessions']:
+            cursor.execute('SELECT id FROM books WHERE uid = ?', (session['book_uid'],))
+            book = cursor.fetchone()
+            if book is None:
+                # The book was deleted here; the delete wins
+                result['conflicts'] += 1
+                continue
+            fields = ('book_id',) + SESSION_FIELDS
+            values = (book[0],) + tuple(session[field] for field in SESSION_FIELDS)
+            upsert('reading_sessions', fields, values, session)
+        # Days are bucketed in this library's own time zone
+        db_manager._zone(cursor)
+        cursor.executemany(f'UPDATE reading_sessions SET local_day = {LOCAL_DAY_SQL} WHERE uid = ?',
+                           [(session['uid'],) for session in changeset['sessions']])
+
+        for deleted in changeset['deleted']:
+            if deleted['table'] == 'books':
+                cursor.execute('SELECT id FROM books WHERE uid = ?', (deleted['uid'],))
+                book = cursor.fetchone()
+                if book is not None:
+                    cursor.execute('DELETE FROM reading_sessions WHERE book_id = ?', (book[0],))
+                    cursor.execute('DELETE FROM books WHERE id = ?', (book[0],))
+                    cursor.execute('DELETE FROM book_notes WHERE book_id = ?', (book[0],))
+                    cursor.execute('DELETE FROM book_tags WHERE book_id = ?', (book[0],))
+                    result['deleted'] += 1
+            elif deleted['table'] == 'reading_sessions':
+                cursor.execute('DELETE FROM reading_sessions WHERE uid = ?', (deleted['uid'],))
+                result['deleted'] += cursor.rowcount
+
+        conn.commit()
+    return result
+
+
+def get_peer_state(db_manager: DatabaseManager, peer_id: str) -> Dict:
+    """Return the last change sequence values exchanged with a peer."""
+    with db_manager._connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT last_seen_seq, last_sent_seq, last_sync_at FROM sync_peers WHERE peer_id = ?',
+                       (peer_id,))
+        row = cursor.fetchone()
+    if row is None:
+        return {'peer_id': peer_id, 'last_seen_seq': 0, 'last_sent_seq': 0, 'last_sync_at': None}
+    return {'peer_id': peer_id, 'last_seen_seq': row[0], 'last_sent_seq': row[1], 'last_sync_at': row[2]}
+
+
+def set_peer_state(db_manager: DatabaseManager, peer_id: str, last_seen_seq: int, last_sent_seq: int):
+    """Record the change sequence values exchanged with a peer."""
+    with db_manager._transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO sync_peers (peer_id, last_seen_seq, last_sent_seq, last_sync_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(peer_id) DO UPDATE SET
+                last_seen_seq = excluded.last_seen_seq,
+                last_sent_seq = excluded.last_sent_seq,
+                last_sync_at = excluded.last_sync_at
+        ''', (peer_id, last_seen_seq, last_sent_seq))
+        conn.commit()
+
+
+class DatabasePeer:
+    """A sync peer backed by another Booktrack database file."""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    @property
+    def replica_id(self) -> str:
+        return self.db_manager.get_setting('replica_id')
+
+    def changes_since(self, since: int) -> Dict:
+        return build_changeset(self.db_manager, since)
+
+    def apply(self, changeset: Dict) -> Dict[str, int]:
+        return apply_changeset(self.db_manager, changeset)
+
+    def record_sync(self, peer_id: str, last_seen_seq: int):
+        """Remember what was received from `peer_id`, including its echo."""
+        version = self.db_manager.get_change_version()
+        set_peer_state(self.db_manager, peer_id, last_seen_seq, version)
+
+
+def synchronize(db_manager: DatabaseManager, peer: DatabasePeer) -> Dict:
+    """Exchange changes with a peer in both directions."""
+    local_replica = db_manager.get_setting('replica_id')
+    state = get_peer_state(db_manager, peer.replica_id)
+
+    incoming = peer.changes_since(state['last_seen_seq'])
+    received = apply_changeset(db_manager, incoming)
+
+    outgoing = build_changeset(db_manager, state['last_sent_seq'])
+    sent = peer.apply(outgoing)
+
+    set_peer_state(db_manager, peer.replica_id, incoming['version'], outgoing['version'])
+    peer.record_sync(local_replica, outgoing['version'])
+    return {'received': received, 'sent': sent}
+
+
+def write_changeset(path: str, changeset: Dict):
+    """Write a changeset to a gzip-compressed JSON file for offline transfer."""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(changeset, f, separators=(',', ':'))
+
+
+def read_changeset(path: str) -> Dict:
+    """Read a changeset written by write_changeset()."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for sync."""
+    parser = argparse.ArgumentParser(prog='booktrack sync',
+                                     description='Synchronize with another Booktrack database file.')
+    parser.add_argument('peer_db', help='path to the other library database')
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    args = parser.parse_args(argv)
+
+    result = synchronize(DatabaseManager(args.db), DatabasePeer(DatabaseManager(args.peer_db)))
+    for direction in ('received', 'sent'):
+        counts = result[direction]
+        print(f"{direction.capitalize()}: {counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['deleted']} deleted, {counts['conflicts']} conflicts")
+    return 0
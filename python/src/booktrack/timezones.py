@@ -0,0 +1,66 @@
+"""
+Time zone handling for day-based statistics.
+
+Each reading session stores a precomputed local day ('YYYY-MM-DD') in the
+reader's configured time zone, so daily totals, streaks and heatmaps group
+on an indexed column instead of converting every row. When the configured
+zone changes, existing sessions can be re-bucketed in one statement.
+
+Usage: python -m booktrack timezone [ZONE] [--rebucket] [--since DATE] [--db BOOKTRACK_DB]
+"""
+
+import argparse
+from datetime import datetime, tzinfo
+from typing import List, Optional
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # Python 3.8: only the system time zone is available
+    ZoneInfo = None
+
+# Setting holding the IANA zone name; unset means the system time zone
+TIME_ZONE_SETTING = 'time_zone'
+
+
+def resolve_time_zone(name: Optional[str]) -> Optional[tzinfo]:
+    """Return the tzinfo for an IANA zone name, or None for the system zone."""
+    if not name:
+        return None
+    if ZoneInfo is None:
+        raise ValueError('Named time zones require Python 3.9 or later')
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown time zone: {name}')
+
+
+def local_day(epoch: Optional[float], zone: Optional[tzinfo] = None) -> Optional[str]:
+    """Return the 'YYYY-MM-DD' day of an epoch timestamp in a time zone."""
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, zone).date().isoformat()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for timezone."""
+    from .database import DatabaseManager
+
+    parser = argparse.ArgumentParser(prog='booktrack timezone',
+                                     description='Show or change the time zone used for daily statistics.')
+    parser.add_argument('zone', nargs='?', help="IANA time zone such as 'Europe/Berlin', or 'system'")
+    parser.add_argument('--rebucket', action='store_true',
+                        help='recompute the day of existing sessions in the new zone')
+    parser.add_argument('--since', default=None, help='only re-bucket sessions from this date on')
+    parser.add_argument('--db', default=None, help='Booktrack database (default: ~/.booktrack/booktrack.db)')
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.db)
+    if args.zone is not None:
+        try:
+            db.set_time_zone(None if args.zone == 'system' else args.zone)
+        except ValueError as e:
+            parser.error(str(e))
+    print(f"Time zone: {db.get_time_zone() or 'system'}")
+    if args.rebucket:
+        print(f"Re-bucketed {db.rebucket_local_days(start=args.since)} sessions")
+    return 0
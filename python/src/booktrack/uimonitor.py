@@ -0,0 +1,222 @@
+"""
+Event-loop lag sampler and handler timing for the Booktrack UI.
+
+Enabled with the BOOKTRACK_UI_MONITOR environment variable. Set it to "1"
+to use the default stall threshold, or to a number of milliseconds.
+"""
+
+import asyncio
+import collections
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import time
+from typing import Deque, Dict, Optional, Tuple
+
+from .profiling import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = 'BOOKTRACK_UI_MONITOR'
+DEFAULT_STALL_THRESHOLD_MS = 100.0
+DEFAULT_SAMPLE_INTERVAL = 0.05
+
+# Task (None outside one) running the outermost timed handler call, if any
+_timing: contextvars.ContextVar = contextvars.ContextVar('timing')
+_NOT_TIMING = object()
+
+
+class EventLoopMonitor:
+    """Samples event-loop lag and records how long UI handlers block the loop."""
+
+    def __init__(self, stall_threshold_ms: float = DEFAULT_STALL_THRESHOLD_MS,
+                 sample_interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.stall_threshold_ms = stall_threshold_ms
+        self.sample_interval = sample_interval
+        self.lag = LatencyHistogram()
+        self.handlers: Dict[str, LatencyHistogram] = {}
+        self.stalls = 0
+        # (handler name, start, end) of recently completed handler calls
+        self._recent: Deque[Tuple[str, float, float]] = collections.deque(maxlen=32)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start the lag sampler on the given (or running) event loop."""
+        if self._task is None:
+            loop = loop or asyncio.get_event_loop()
+            self._task = loop.create_task(self._sample())
+
+    def stop(self):
+        """Stop the lag sampler and log a summary."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.log_summary()
+
+    async def _sample(self):
+        """Measure how late each wake-up is compared to the requested interval."""
+        while True:
+            expected = time.perf_counter() + self.sample_interval
+            await asyncio.sleep(self.sample_interval)
+            now = time.perf_counter()
+            self.record_lag(max(now - expected, 0.0) * 1000, expected, now)
+
+    def record_lag(self, lag_ms: float, window_start: float, window_end: float):
+        """Record one lag sample and report it if it exceeds the threshold."""
+        self.lag.record(lag_ms)
+        if lag_ms >= self.stall_threshold_ms:
+            self.stalls += 1
+            culprit = self.find_culprit(window_start, window_end)
+            logger.warning(
+                "Event loop stalled for %.1f ms (handler: %s)",
+                lag_ms, culprit or 'unknown'
+            )
+
+    def find_culprit(self, window_start: float, window_end: float) -> Optional[str]:
+        """Return the longest handler call that overlapped the given window."""
+        culprit = None
+        longest = 0.0
+        for name, started, finished in self._recent:
+            if finished >= window_start and started <= window_end:
+                if finished - started > longest:
+                    culprit, longest = name, finished - started
+        return culprit
+
+    def record_handler(self, name: str, started: float, finished: float):
+        """Record a completed handler call."""
+        histogram = self.handlers.get(name)
+        if histogram is None:
+            histogram = self.handlers[name] = LatencyHistogram()
+        elapsed_ms = (finished - started) * 1000
+        histogram.record(elapsed_ms)
+        self._recent.append((name, started, finished))
+        if elapsed_ms >= self.stall_threshold_ms:
+            logger.warning("Handler %s blocked the event loop for %.1f ms", name, elapsed_ms)
+
+    def stall_percentiles(self) -> Dict[str, float]:
+        """Return p50/p95/p99 event-loop lag in milliseconds."""
+        return {
+            'p50_ms': self.lag.percentile(50),
+            'p95_ms': self.lag.percentile(95),
+            'p99_ms': self.lag.percentile(99),
+            'max_ms': round(self.lag.max_ms, 3)
+        }
+
+    def to_dict(self) -> Dict:
+        """Return all recorded metrics as a JSON-serializable dictionary."""
+        return {
+            'stall_threshold_ms': self.stall_threshold_ms,
+            'stalls': self.stalls,
+            'loop_lag': self.lag.to_dict(),
+            'handlers': {name: h.to_dict() for name, h in sorted(self.handlers.items())}
+        }
+
+    def log_summary(self):
+        """Log handler timings and loop lag percentiles."""
+        lag = self.stall_percentiles()
+        logger.info(
+            "Event loop lag p50=%.1f ms p95=%.1f ms p99=%.1f ms max=%.1f ms, %d stalls",
+            lag['p50_ms'], lag['p95_ms'], lag['p99_ms'], lag['max_ms'], self.stalls
+        )
+        for name, histogram in sorted(self.handlers.items(), key=lambda item: -item[1].max_ms):
+            logger.info(
+                "Handler %s: %d calls, mean %.1f ms, max %.1f ms",
+                name, histogram.count, histogram.mean_ms, histogram.max_ms
+            )
+
+
+def monitor_from_environment() -> Optional[EventLoopMonitor]:
+    """Create a monitor if BOOKTRACK_UI_MONITOR is set, otherwise return None."""
+    value = os.environ.get(ENV_VAR, '').strip()
+    if not value or value.lower() in ('0', 'false', 'no', 'off'):
+        return None
+    try:
+        threshold = float(value)
+        if value == '1' or threshold <= 0:
+            threshold = DEFAULT_STALL_THRESHOLD_MS
+    except ValueError:
+        threshold = DEFAULT_STALL_THRESHOLD_MS
+    return EventLoopMonitor(stall_threshold_ms=threshold)
+
+
+def _current_task() -> Optional[asyncio.Task]:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        # No running event loop
+        return None
+
+
+def _is_timing() -> bool:
+    """Whether a timed handler call is already being timed in this task."""
+    return _timing.get(_NOT_TIMING) is _current_task()
+
+
+def timed_handler(method):
+    """Decorator timing an app callback when the app has a ui_monitor.
+
+    For coroutine handlers only the time until the first suspension is
+    counted, since that is the part that blocks the event loop. Handlers
+    called from within a timed handler are not timed again, so one click
+    is counted once.
+    """
+    name = method.__name__
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            monitor = getattr(self, 'ui_monitor', None)
+            if monitor is None or _is_timing():
+                return await method(self, *args, **kwargs)
+            coroutine = method(self, *args, **kwargs)
+            token = _timing.set(_current_task())
+            started = time.perf_counter()
+            try:
+                future = coroutine.send(None)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                monitor.record_handler(name, started, time.perf_counter())
+                _timing.reset(token)
+            # Hand the rest of the coroutine back to the event loop unchanged
+            return await _Resume(coroutine, future)
+
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        monitor = getattr(self, 'ui_monitor', None)
+        if monitor is None or _is_timing():
+            return method(self, *args, **kwargs)
+        token = _timing.set(_current_task())
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            monitor.record_handler(name, started, time.perf_counter())
+            _timing.reset(token)
+
+    return wrapper
+
+
+class _Resume:
+    """Awaitable that continues a coroutine already advanced by one step."""
+
+    def __init__(self, coroutine, future):
+        self.coroutine = coroutine
+        self.future = future
+
+    def __await__(self):
+        future = self.future
+        while True:
+            try:
+                try:
+                    value = yield future
+                except BaseException as exc:
+                    future = self.coroutine.throw(exc)
+                else:
+                    future = self.coroutine.send(value)
+            except StopIteration as stop:
+                return stop.value
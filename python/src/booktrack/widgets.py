@@ -2,6 +2,7 @@ import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW
 from typing import List, Dict, Optional
+from .covers import THUMBNAIL_SIZE
 from .database import DatabaseManager
 
 
@@ -39,6 +40,12 @@ class BookForm:
             style=Pack(flex=1, height=100, margin=5)
         )
         
+        self.tags_input = toga.TextInput(
+            value=', '.join(book_data.get('tags', [])) if book_data else '',
+            placeholder='e.g. Fiction, Favourites',
+            style=Pack(flex=1, margin=5)
+        )
+        
         if self.is_edit_mode:
             self.status_selection = toga.Selection(
                 items=['Active', 'Read', 'Paused', 'Abandoned'],
@@ -70,6 +77,10 @@ class BookForm:
         form_box.add(toga.Label('Notes', style=Pack(margin=(10, 0, 5, 0))))
         form_box.add(self.notes_input)
         
+        # Tags
+        form_box.add(toga.Label('Tags (comma-separated)', style=Pack(margin=(10, 0, 5, 0))))
+        form_box.add(self.tags_input)
+        
         # Status (only for edit mode)
         if self.is_edit_mode:
             form_box.add(toga.Label('Status', style=Pack(margin=(10, 0, 5, 0))))
@@ -119,7 +130,8 @@ class BookForm:
             'author': self.author_input.value,
             'total_pages': total_pages,
             'cover_image_url': self.cover_url_input.value if self.cover_url_input.value else None,
-            'notes': self.notes_input.value if self.notes_input.value else None
+            'notes': self.notes_input.value if self.notes_input.value else None,
+            'tags': (self.tags_input.value or '').split(',')
         }
         
         if self.is_edit_mode:
@@ -136,11 +148,14 @@ class BookForm:
 class BookListItem:
     """Widget for displaying a single book in the list."""
     
-    def __init__(self, book_data: Dict, on_start_reading, on_edit_book, on_delete_book):
+    def __init__(self, book_data: Dict, on_start_reading, on_edit_book, on_delete_book,
+                 cover_loader=None):
         self.book_data = book_data
         self.on_start_reading = on_start_reading
         self.on_edit_book = on_edit_book
         self.on_delete_book = on_delete_book
+        self.cover_loader = cover_loader
+        self.cover_view = None
     
     def create_item_box(self) -> toga.Box:
         """Create the book item layout."""
@@ -149,6 +164,19 @@ class BookListItem:
         # Book info
         info_box = toga.Box(style=Pack(direction=ROW, margin=5))
         
+        # Cover: placeholder first, swapped for the thumbnail once it is loaded
+        if self.cover_loader and self.book_data.get('cover_image_url'):
+            width, height = THUMBNAIL_SIZE
+            self.cover_view = toga.ImageView(
+                style=Pack(width=width, height=height, margin=(0, 10, 0, 0), background_color='#E0E0E0')
+            )
+            info_box.add(self.cover_view)
+            cached_path = self.cover_loader.cached(self.book_data['cover_image_url'])
+            if cached_path:
+                self.cover_view.image = toga.Image(cached_path)
+            else:
+                self.cover_loader.start(self.load_cover())
+        
         # Book details
         details_box = toga.Box(style=Pack(direction=COLUMN, flex=1))
         
@@ -178,6 +206,16 @@ class BookListItem:
             )
             details_box.add(pages_label)
         
+        if self.book_data.get('session_count'):
+            minutes = self.book_data['total_seconds'] // 60
+            last_read = self.book_data['last_session_at'] or ''
+            reading_label = toga.Label(
+                f"Read {minutes // 60}h {minutes % 60}m in {self.book_data['session_count']} sessions"
+                f", last {last_read[:10]}",
+                style=Pack(font_size=10)
+            )
+            details_box.add(reading_label)
+        
         info_box.add(details_box)
         
         # Action buttons
@@ -215,6 +253,16 @@ class BookListItem:
         item_box.add(separator)
         
         return item_box
+    
+    async def load_cover(self):
+        """Fetch the cover in the background and swap it into the placeholder."""
+        path = await self.cover_loader.load(self.book_data['cover_image_url'])
+        if path and self.cover_view is not None:
+            try:
+                self.cover_view.image = toga.Image(path)
+            except Exception:
+                # Unreadable image: keep the placeholder
+                pass
 
 
 class SessionLogForm:
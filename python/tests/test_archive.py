@@ -0,0 +1,162 @@
+"""
+Tests for the archive tier of finished books
+"""
+
+import unittest
+import contextlib
+import io
+import tempfile
+import os
+import sys
+import time
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.backup import BackupManager
+from booktrack.database import DatabaseManager
+from booktrack.sync import DatabasePeer, build_changeset, synchronize
+from booktrack.sync import main as sync_main
+from booktrack.timezones import ZoneInfo
+
+
+class TestArchive(unittest.TestCase):
+    """Test cases for moving finished books to the archive and back."""
+
+    def setUp(self):
+        """Set up a library with one finished book and one in progress."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'test.db')
+        self.db_manager = DatabaseManager(self.db_path, archive=True)
+        self.read_id = self.db_manager.add_book("Dune", "Frank Herbert", 600, None, "Spice")
+        self.db_manager.set_book_tags(self.read_id, ['Fiction'])
+        self.db_manager.add_reading_session(self.read_id, 1800, 40, None, 1704067200, 1704069000)
+        self.db_manager.add_reading_session(self.read_id, 1200, 20, None, 1704153600, 1704154800)
+        self.db_manager.update_book(self.read_id, status='Read')
+        self.active_id = self.db_manager.add_book("Cosmos", "Carl Sagan")
+        self.db_manager.add_reading_session(self.active_id, 600, 10, None, 1704240000, 1704240600)
+
+    def tearDown(self):
+        """Clean up test databases."""
+        self.db_manager.shutdown()
+        self.temp_dir.cleanup()
+
+    def test_archive_keeps_all_time_results(self):
+        """Test that archived books leave the hot tables but not statistics or exports."""
+        stats = self.db_manager.get_statistics()
+        export = self.db_manager.export_data()
+
+        self.assertEqual(self.db_manager.archive_books(), {'books': 1, 'sessions': 2})
+        self.assertEqual([book['title'] for book in self.db_manager.get_books()], ['Cosmos'])
+        self.assertEqual(self.db_manager.get_reading_sessions(self.read_id), [])
+        self.assertEqual([book['title'] for book in self.db_manager.get_archived_books()], ['Dune'])
+
+        after = self.db_manager.get_statistics()
+        for key in ('total_reading_time_seconds', 'total_sessions', 'total_books', 'books_by_status'):
+            self.assertEqual(after[key], stats[key])
+        self.assertEqual(self.db_manager.export_data()['books'], export['books'])
+        self.assertEqual(self.db_manager.archive_books(), {'books': 0, 'sessions': 0})
+
+    def test_archive_cutoff(self):
+        """Test that only books not read since the cutoff are archived."""
+        self.assertEqual(self.db_manager.archive_books(before=time.time() - 86400)['books'], 0)
+        self.assertEqual(self.db_manager.archive_books(before=time.time() + 60)['books'], 1)
+
+    def test_restore(self):
+        """Test that a restored book gets back its sessions, notes, tags and totals."""
+        columns = ('id', 'title', 'status', 'notes', 'total_seconds', 'total_pages_read', 'session_count')
+        before = self.db_manager.get_books(columns=columns)
+        self.db_manager.archive_books()
+        self.assertTrue(self.db_manager.restore_archived_book(self.read_id))
+        self.assertFalse(self.db_manager.restore_archived_book(self.read_id))
+
+        self.assertEqual(self.db_manager.get_books(columns=columns), before)
+        self.assertEqual(self.db_manager.get_book_tags(self.read_id), ['Fiction'])
+        self.assertEqual(len(self.db_manager.get_reading_sessions(self.read_id)), 2)
+        self.assertEqual(self.db_manager.get_archived_books(), [])
+
+    def test_archiving_is_not_a_delete(self):
+        """Test that peers keep archived books and do not send them back."""
+        peer = DatabaseManager(os.path.join(self.temp_dir.name, 'peer.db'))
+        synchronize(self.db_manager, DatabasePeer(peer))
+        version = self.db_manager.get_change_version()
+        self.db_manager.archive_books()
+
+        self.assertEqual(build_changeset(self.db_manager, version)['deleted'], [])
+        result = synchronize(self.db_manager, DatabasePeer(peer))
+        self.assertEqual(result['received']['inserted'], 0)
+        self.assertEqual(len(peer.get_books()), 2)
+        self.assertEqual(len(self.db_manager.get_books()), 1)
+        peer.shutdown()
+
+    def test_peer_session_for_archived_book(self):
+        """Test that a peer's session for a book archived here restores the book instead of being lost."""
+        peer = DatabaseManager(os.path.join(self.temp_dir.name, 'peer.db'))
+        synchronize(self.db_manager, DatabasePeer(peer))
+        self.db_manager.archive_books()
+        peer_book = next(book for book in peer.get_books() if book['title'] == 'Dune')
+        peer.add_reading_session(peer_book['id'], 300, 5)
+        peer.update_book(peer_book['id'], notes='Spice must flow')
+
+        synchronize(self.db_manager, DatabasePeer(peer))
+        self.assertEqual(self.db_manager.get_archived_books(), [])
+        self.assertEqual(len(self.db_manager.get_reading_sessions(self.read_id)), 3)
+        self.assertEqual(self.db_manager.get_book_notes(self.read_id), 'Spice must flow')
+        self.assertEqual(self.db_manager.get_books(columns=('id', 'total_seconds'), status='Read'),
+                         [{'id': self.read_id, 'total_seconds': 3300}])
+        self.assertEqual(len(peer.get_reading_sessions(peer_book['id'])), 3)
+        peer.shutdown()
+
+    def test_command_line_sync_sees_archive(self):
+        """Test that the sync command recognises books archived here."""
+        peer_path = os.path.join(self.temp_dir.name, 'peer.db')
+        peer = DatabaseManager(peer_path)
+        synchronize(self.db_manager, DatabasePeer(peer))
+        self.db_manager.archive_books()
+        peer_book = next(book for book in peer.get_books() if book['title'] == 'Dune')
+        peer.update_book(peer_book['id'], notes='Spice must flow')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(sync_main([peer_path, '--db', self.db_path]), 0)
+        statistics = self.db_manager.get_statistics()
+        self.assertEqual((statistics['total_books'], statistics['total_sessions']), (2, 3))
+        self.assertEqual(self.db_manager.get_book_notes(self.read_id), 'Spice must flow')
+
+        # Managers opened without archive=True still attach the existing archive
+        self.assertEqual(DatabaseManager(self.db_path).archive_path, self.db_manager.archive_path)
+        peer.shutdown()
+
+    @unittest.skipIf(ZoneInfo is None, 'zoneinfo requires Python 3.9+')
+    def test_rebucket_archived_sessions(self):
+        """Test that re-bucketing after a zone change includes archived sessions."""
+        self.db_manager.set_time_zone('UTC')
+        self.db_manager.archive_books()
+        # Both sessions start at 2024-01-03 16:00 UTC, already the 4th in Tokyo
+        self.db_manager.add_reading_session(self.active_id, 600, 10, None, 1704297600, 1704298200)
+        archived_id = self.db_manager.add_book("Solaris", "Stanislaw Lem")
+        self.db_manager.update_book(archived_id, status='Read')
+        self.db_manager.add_reading_session(archived_id, 600, 10, None, 1704297600, 1704298200)
+        self.db_manager.archive_books()
+
+        self.db_manager.set_time_zone('Asia/Tokyo')
+        self.assertEqual(self.db_manager.rebucket_local_days(), 5)
+        self.assertEqual(self.db_manager.get_daily_totals(since='2024-01-03')[0], ('2024-01-04', 1200, 2, 20))
+
+    def test_backup_includes_archive(self):
+        """Test that archiving forces a full backup that restores the archive too."""
+        backups = BackupManager(self.db_manager, os.path.join(self.temp_dir.name, 'backups'))
+        backups.full_backup()
+        self.db_manager.archive_books()
+        self.assertIn('full_', os.path.basename(backups.snapshot()))
+
+        target = os.path.join(self.temp_dir.name, 'restored.db')
+        backups.restore(target)
+        restored = DatabaseManager(target, archive=True)
+        self.assertEqual([book['title'] for book in restored.get_books()], ['Cosmos'])
+        self.assertEqual([book['title'] for book in restored.get_archived_books()], ['Dune'])
+        self.assertEqual(restored.get_statistics()['total_sessions'], 3)
+        restored.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
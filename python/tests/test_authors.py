@@ -0,0 +1,121 @@
+"""
+Tests for the normalized authors table and per-author totals
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import os
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.backup import BackupManager
+from booktrack.database import MEMORY, DatabaseManager, fold_author
+from booktrack.sync import DatabasePeer, synchronize
+
+
+class TestAuthors(unittest.TestCase):
+    """Test cases for linking books to authors and browsing by author."""
+
+    def setUp(self):
+        """Set up an in-memory library with a few authors."""
+        self.db_manager = DatabaseManager(MEMORY)
+        self.dune = self.db_manager.add_book('Dune', 'Frank Herbert', 400)
+        self.messiah = self.db_manager.add_book('Dune Messiah', '  frank  HERBERT ', 250)
+        self.zola = self.db_manager.add_book('Germinal', 'Émile Zola', 500)
+        self.db_manager.add_book('Nana', 'Emile Zola')
+        self.db_manager.update_book(self.dune, status='Read')
+        self.db_manager.add_reading_session(self.dune, 3600, 40)
+        self.db_manager.add_reading_session(self.messiah, 600, 10)
+        self.db_manager.add_reading_session(self.zola, 1200, 25)
+
+    def tearDown(self):
+        """Free the in-memory library."""
+        self.db_manager.shutdown()
+
+    def test_fold_author(self):
+        """Test that spellings of one name share a key."""
+        self.assertEqual(fold_author('  Émile   ZOLA '), 'emile zola')
+        self.assertEqual(fold_author('Gabriel García Márquez'), fold_author('gabriel garcia marquez'))
+        self.assertEqual(fold_author('Straße'), 'strasse')
+
+    def test_author_totals(self):
+        """Test the grouped per-author totals, searches and orderings."""
+        authors = self.db_manager.get_authors()
+        self.assertEqual([(a['name'], a['book_count'], a['books_read'], a['total_seconds'], a['total_pages_read'])
+                          for a in authors],
+                         [('Émile Zola', 2, 0, 1200, 25), ('Frank Herbert', 2, 1, 4200, 50)])
+        self.assertIsNotNone(authors[1]['last_session_at'])
+        self.assertEqual(self.db_manager.get_author_count(), 2)
+
+        self.assertEqual([a['name'] for a in self.db_manager.get_authors(prefix='emi')], ['Émile Zola'])
+        self.assertEqual([a['name'] for a in self.db_manager.get_authors(sort='most_read', limit=1)],
+                         ['Frank Herbert'])
+        with self.assertRaises(ValueError):
+            self.db_manager.get_authors(sort='shortest')
+
+        herbert = authors[1]['id']
+        self.assertEqual(sorted(b['title'] for b in self.db_manager.get_books(author_id=herbert)),
+                         ['Dune', 'Dune Messiah'])
+
+    def test_authors_follow_books(self):
+        """Test that renaming and deleting books relinks and removes authors."""
+        self.db_manager.update_book(self.messiah, author='Brian Herbert')
+        self.assertEqual([a['name'] for a in self.db_manager.get_authors()],
+                         ['Brian Herbert', 'Émile Zola', 'Frank Herbert'])
+
+        self.db_manager.delete_book(self.dune)
+        self.assertEqual([a['name'] for a in self.db_manager.get_authors()], ['Brian Herbert', 'Émile Zola'])
+        self.assertEqual(self.db_manager.get_author_count(), 2)
+
+    def test_authors_in_synced_and_restored_libraries(self):
+        """Test that books arriving by sync or restore are linked to authors."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            peer = DatabaseManager(os.path.join(temp_dir, 'peer.db'))
+            synchronize(self.db_manager, DatabasePeer(peer))
+            # The first spelling to arrive names the author
+            self.assertEqual([(fold_author(a['name']), a['book_count']) for a in peer.get_authors()],
+                             [('emile zola', 2), ('frank herbert', 2)])
+
+            backups = BackupManager(peer, os.path.join(temp_dir, 'backups'))
+            backups.full_backup()
+            peer.update_book(peer.get_books(author_id=peer.get_authors()[0]['id'])[0]['id'], author='Anon')
+            backups.snapshot()
+            restored = DatabaseManager(backups.restore(os.path.join(temp_dir, 'restored.db')))
+            self.assertEqual([(fold_author(a['name']), a['book_count']) for a in restored.get_authors()],
+                             [('anon', 1), ('emile zola', 1), ('frank herbert', 2)])
+
+
+class TestAuthorMigration(unittest.TestCase):
+    """Test cases for back-filling authors in an existing library."""
+
+    def test_existing_books_are_linked(self):
+        """Test that books from before the authors table get linked on open."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'legacy.db')
+            conn = sqlite3.connect(path)
+            conn.execute('''
+                CREATE TABLE books (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, author TEXT NOT NULL,
+                    total_pages INTEGER, cover_image_url TEXT, status TEXT DEFAULT 'Active',
+                    notes TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.executemany('INSERT INTO books (title, author) VALUES (?, ?)',
+                             [('Emma', 'Jane Austen'), ('Persuasion', 'JANE AUSTEN'), ('Ulysses', 'James Joyce')])
+            conn.commit()
+            conn.close()
+
+            legacy = DatabaseManager(path)
+            version = legacy.get_change_version()
+            self.assertEqual([(a['name'], a['book_count']) for a in legacy.get_authors()],
+                             [('James Joyce', 1), ('Jane Austen', 2)])
+            # Linking is not a change to sync
+            legacy.init_database()
+            self.assertEqual(legacy.get_change_version(), version)
+
+
+if __name__ == '__main__':
+    unittest.main()
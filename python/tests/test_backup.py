@@ -0,0 +1,242 @@
+"""
+Tests for Booktrack change tracking and backups
+"""
+
+import unittest
+import tempfile
+import os
+import sqlite3
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.backup import BackupManager
+from booktrack.database import DatabaseManager
+
+
+class TestChangeTracking(unittest.TestCase):
+    """Test cases for the change sequence and tombstones."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'test.db'))
+
+    def tearDown(self):
+        """Clean up test database."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def test_writes_bump_change_version(self):
+        """Test that inserts and tracked updates advance the version."""
+        start = self.db_manager.get_change_version()
+        book_id = self.db_manager.add_book("Book", "Author")
+        after_insert = self.db_manager.get_change_version()
+        self.db_manager.update_book(book_id, title="New Title")
+        after_update = self.db_manager.get_change_version()
+
+        self.assertGreater(after_insert, start)
+        self.assertGreater(after_update, after_insert)
+
+        changes = self.db_manager.get_changes_since(after_insert)
+        self.assertEqual([b['title'] for b in changes['books']], ["New Title"])
+        self.assertEqual(changes['reading_sessions'], [])
+
+    def test_deletes_leave_tombstones(self):
+        """Test that deletes are reported as tombstones."""
+        book_id = self.db_manager.add_book("Book", "Author")
+        session_id = self.db_manager.add_reading_session(book_id, 600)
+        version = self.db_manager.get_change_version()
+
+        self.db_manager.delete_book(book_id)
+        changes = self.db_manager.get_changes_since(version)
+        deleted = {(d['table'], d['row_id']) for d in changes['deleted']}
+        self.assertEqual(deleted, {('books', book_id), ('reading_sessions', session_id)})
+
+    def test_existing_rows_are_backfilled(self):
+        """Test that rows from before change tracking get a sequence value."""
+        path = os.path.join(self.temp_dir.name, 'legacy.db')
+        conn = sqlite3.connect(path)
+        conn.execute('''
+            CREATE TABLE books (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, author TEXT NOT NULL,
+                total_pages INTEGER, cover_image_url TEXT, status TEXT DEFAULT 'Active',
+                notes TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute("INSERT INTO books (title, author) VALUES ('Old', 'Author')")
+        conn.commit()
+        conn.close()
+
+        legacy = DatabaseManager(path)
+        changes = legacy.get_changes_since(0)
+        self.assertEqual([b['title'] for b in changes['books']], ['Old'])
+        self.assertEqual(legacy.get_books()[0]['session_count'], 0)
+
+
+class TestBackupManager(unittest.TestCase):
+    """Test cases for BackupManager."""
+
+    def setUp(self):
+        """Set up test database and backup directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'test.db'))
+        self.backups = BackupManager(self.db_manager, os.path.join(self.temp_dir.name, 'backups'))
+
+    def tearDown(self):
+        """Clean up test files."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def test_full_backup_and_incremental_restore(self):
+        """Test restoring a full backup followed by snapshots."""
+        book_id = self.db_manager.add_book("Book 1", "Author")
+        self.db_manager.add_reading_session(book_id, 600)
+        self.backups.full_backup(pages=1)
+
+        book_id2 = self.db_manager.add_book("Book 2", "Author", notes="Worth rereading " * 40)
+        self.db_manager.add_reading_session(book_id2, 1200, 10)
+        self.db_manager.update_book(book_id, status='Read')
+        first = self.backups.snapshot()
+        self.assertTrue(first.endswith('.json.gz'))
+
+        self.db_manager.delete_book(book_id)
+        self.backups.snapshot()
+        self.assertIsNone(self.backups.snapshot())
+
+        restored = DatabaseManager(self.backups.restore(os.path.join(self.temp_dir.name, 'restored.db')))
+        self.assertEqual([b['title'] for b in restored.get_books()], ["Book 2"])
+        self.assertEqual(restored.get_book_notes(book_id2), "Worth rereading " * 40)
+        sessions = restored.get_reading_sessions()
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(sessions[0]['duration_seconds'], 1200)
+        self.assertEqual(restored.get_books()[0]['total_seconds'], 1200)
+
+    def test_snapshot_without_full_backup_takes_full(self):
+        """Test that the first snapshot is a full backup."""
+        self.db_manager.add_book("Book", "Author")
+        path = self.backups.snapshot()
+        self.assertTrue(path.endswith('.db.gz'))
+        self.assertEqual(self.backups.list_backups()[0]['kind'], 'full')
+
+    def test_rotation_keeps_newest_full_backups(self):
+        """Test that old backup chains are removed."""
+        self.backups.keep_full = 2
+        for i in range(3):
+            self.db_manager.add_book(f"Book {i}", "Author")
+            self.backups.full_backup()
+            self.db_manager.add_book(f"Extra {i}", "Author")
+            self.backups.snapshot()
+
+        entries = self.backups.list_backups()
+        self.assertEqual([e['kind'] for e in entries], ['full', 'snapshot', 'full', 'snapshot'])
+        files = set(os.listdir(self.backups.backup_dir)) - {'manifest.json'}
+        self.assertEqual(files, {e['file'] for e in entries})
+
+
+class TestDatabaseExport(unittest.TestCase):
+    """Test cases for database-file exports and restores."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'test.db'))
+
+    def tearDown(self):
+        """Clean up test database."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_export_is_compact_copy(self):
+        """Test that the export holds the data without the free pages of deleted rows."""
+        for i in range(500):
+            book_id = self.db_manager.add_book(f"Book {i}", "Author", notes="Long notes " * 50)
+        self.db_manager.add_reading_session(book_id, 900)
+        for i in range(1, 450):
+            self.db_manager.delete_book(i)
+
+        self.db_manager.export_database(self.path('export.db'))
+        self.assertLess(os.path.getsize(self.path('export.db')), os.path.getsize(self.path('test.db')))
+        with self.assertRaises(FileExistsError):
+            self.db_manager.export_database(self.path('export.db'))
+
+        exported = DatabaseManager(self.path('export.db'), read_only=True)
+        self.assertEqual(len(exported.get_books()), 51)
+        self.assertEqual(exported.get_book_notes(book_id), "Long notes " * 50)
+        self.assertEqual(exported.get_books(sort='recently_read')[0]['total_seconds'], 900)
+
+    def test_restore_replaces_library(self):
+        """Test that a restore replaces the library, archive included, and rejects other files."""
+        source = DatabaseManager(self.path('source.db'), archive=True)
+        source.add_book("Current", "Author")
+        source.update_book(source.add_book("Finished", "Author"), status='Read')
+        source.archive_books()
+        source.export_database(self.path('export.db'))
+
+        target = DatabaseManager(self.path('target.db'), archive=True, reuse_connection=True)
+        target.add_book("Replaced", "Author")
+        target.restore_database(self.path('export.db'))
+        self.assertEqual([b['title'] for b in target.get_books()], ["Current"])
+        self.assertEqual([b['title'] for b in target.get_archived_books()], ["Finished"])
+        self.assertEqual(target.get_statistics()['total_books'], 2)
+        target.add_book("Added", "Author")
+        self.assertEqual(len(target.get_books()), 2)
+
+        other = sqlite3.connect(self.path('other.db'))
+        other.execute('CREATE TABLE things (id INTEGER)')
+        other.close()
+        with self.assertRaises(ValueError):
+            target.restore_database(self.path('other.db'))
+        with self.assertRaises(FileNotFoundError):
+            target.restore_database(self.path('missing.db'))
+        self.assertEqual(len(target.get_books()), 2)
+        target.shutdown()
+
+    def test_restore_older_library(self):
+        """Test that a library file from before change tracking restores and is migrated."""
+        path = self.path('legacy.db')
+        conn = sqlite3.connect(path)
+        conn.executescript('''
+            CREATE TABLE books (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, author TEXT NOT NULL,
+                total_pages INTEGER, cover_image_url TEXT, status TEXT DEFAULT 'Active',
+                notes TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE reading_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, book_id INTEGER NOT NULL,
+                duration_seconds INTEGER NOT NULL, pages_read INTEGER, notes TEXT,
+                start_time TIMESTAMP, end_time TIMESTAMP, session_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO books (title, author, notes) VALUES ('Old', 'Author', 'Old notes');
+            INSERT INTO reading_sessions (book_id, duration_seconds, pages_read, session_date)
+            VALUES (1, 900, 12, '2024-01-01 10:00:00');
+        ''')
+        conn.close()
+
+        self.db_manager.add_book("Replaced", "Author")
+        self.db_manager.restore_database(path)
+        books = self.db_manager.get_books(columns=('title', 'notes', 'total_seconds'))
+        self.assertEqual(books, [{'title': 'Old', 'notes': 'Old notes', 'total_seconds': 900}])
+        self.assertEqual(self.db_manager.get_changes_since(0)['books'][0]['title'], 'Old')
+
+    def test_restore_checks_archive_first(self):
+        """Test that a bad archive file is rejected before the library is touched."""
+        source = DatabaseManager(self.path('source.db'), archive=True)
+        source.add_book("Exported", "Author")
+        source.export_database(self.path('export.db'))
+        with open(self.path('export-archive.db'), 'wb') as f:
+            f.write(b'not a database' * 100)
+
+        target = DatabaseManager(self.path('target.db'), archive=True)
+        target.add_book("Kept", "Author")
+        with self.assertRaises(ValueError):
+            target.restore_database(self.path('export.db'))
+        self.assertEqual([b['title'] for b in target.get_books()], ["Kept"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,12 +8,13 @@ import tempfile
 import os
 import json
 import sys
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timezone
 
 # Add the src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
 
-from booktrack.database import DatabaseManager
+from booktrack.database import BOOK_SORTS, MEMORY, DatabaseManager
 from booktrack.timer import Timer
 
 
@@ -21,29 +22,13 @@ class TestDatabaseManager(unittest.TestCase):
     """Test cases for DatabaseManager."""
     
     def setUp(self):
-        """Set up test database."""
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.temp_db.close()
-        self.db_manager = DatabaseManager(self.temp_db.name)
+        """Set up an in-memory test database."""
+        self.db_manager = DatabaseManager(MEMORY)
     
     def tearDown(self):
         """Clean up test database."""
-        # Ensure database connection is closed
-        self.db_manager = None
-        # Give Windows time to release the file handle
-        import time
-        time.sleep(0.1)
-        try:
-            os.unlink(self.temp_db.name)
-        except (OSError, PermissionError):
-            # On Windows, sometimes the file is still locked
-            import gc
-            gc.collect()
-            time.sleep(0.2)
-            try:
-                os.unlink(self.temp_db.name)
-            except (OSError, PermissionError):
-                pass  # Ignore if we can't delete (Windows file locking)
+        # Closing the last connection frees the in-memory database
+        self.db_manager.shutdown()
     
     def test_add_book(self):
         """Test adding a book."""
@@ -178,6 +163,228 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertIn('end_time', log)
         self.assertIn('time', log)
         self.assertIn('pages_read', log)
+    
+    def test_session_times_stored_as_epoch(self):
+        """Test that session times are stored as epoch seconds and formatted on read."""
+        book_id = self.db_manager.add_book("Test Book", "Test Author")
+        self.db_manager.add_reading_session(
+            book_id, 1800,
+            start_time='2024-03-01T20:00:00',
+            end_time=datetime(2024, 3, 1, 20, 30)
+        )
+        
+        with self.db_manager._connect() as conn:
+            row = conn.execute('SELECT start_time, end_time, typeof(session_date) FROM reading_sessions').fetchone()
+        self.assertEqual(row[0], int(datetime(2024, 3, 1, 20, 0).timestamp()))
+        self.assertEqual(row[1] - row[0], 1800)
+        self.assertEqual(row[2], 'integer')
+        
+        session = self.db_manager.get_reading_sessions(book_id)[0]
+        self.assertEqual(session['start_time'], '2024-03-01T20:00:00')
+        self.assertEqual(session['end_time'], '2024-03-01T20:30:00')
+        
+        with self.assertRaises(ValueError):
+            self.db_manager.add_reading_session(book_id, 60, start_time='yesterday evening')
+        for value in (float('inf'), float('nan'), 'inf', '-Infinity', '1e400'):
+            with self.assertRaises(ValueError):
+                self.db_manager.add_reading_session(book_id, 60, start_time=value)
+    
+    def test_reading_sessions_date_range(self):
+        """Test filtering sessions by a session date range."""
+        book_id = self.db_manager.add_book("Test Book", "Test Author")
+        for day in (1, 2, 3):
+            session_id = self.db_manager.add_reading_session(book_id, 600 * day)
+            with self.db_manager._transaction() as conn:
+                conn.execute('UPDATE reading_sessions SET session_date = ? WHERE id = ?',
+                             (int(datetime(2024, 3, day, 12).timestamp()), session_id))
+        
+        sessions = self.db_manager.get_reading_sessions(
+            start=datetime(2024, 3, 2), end='2024-03-03T00:00:00')
+        self.assertEqual([s['duration_seconds'] for s in sessions], [1200])
+        sessions = self.db_manager.get_reading_sessions(book_id, start=datetime(2024, 3, 2))
+        self.assertEqual([s['duration_seconds'] for s in sessions], [1800, 1200])
+        
+        plan = ' '.join(self.db_manager.explain_query_plan(
+            'SELECT id FROM reading_sessions WHERE session_date >= ? AND session_date < ?', (0, 1)))
+        self.assertIn('idx_reading_sessions_session_date', plan)
+    
+    def test_migrate_text_timestamps(self):
+        """Test that text timestamps from older databases become epoch seconds."""
+        temp_dir = tempfile.TemporaryDirectory()
+        legacy_path = os.path.join(temp_dir.name, 'legacy.db')
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute('''
+                CREATE TABLE reading_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    book_id INTEGER NOT NULL,
+                    duration_seconds INTEGER NOT NULL,
+                    pages_read INTEGER,
+                    notes TEXT,
+                    start_time TIMESTAMP,
+                    end_time TIMESTAMP,
+                    session_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            conn.execute('''
+                INSERT INTO reading_sessions (id, book_id, duration_seconds, start_time, end_time, session_date)
+                VALUES (7, 1, 600, '2024-03-01T20:00:00.123456', '2024-03-01T20:10:00', '2024-03-01 19:10:00')
+            ''')
+        conn.close()
+        
+        try:
+            legacy = DatabaseManager(legacy_path)
+            with sqlite3.connect(legacy_path) as conn:
+                row = conn.execute('SELECT start_time, end_time, session_date FROM reading_sessions').fetchone()
+            conn.close()
+            self.assertEqual(row[0], int(datetime(2024, 3, 1, 20, 0).timestamp()))
+            self.assertEqual(row[1], int(datetime(2024, 3, 1, 20, 10).timestamp()))
+            self.assertEqual(row[2], int(datetime(2024, 3, 1, 19, 10, tzinfo=timezone.utc).timestamp()))
+            
+            # Ids keep counting after the migrated rows
+            self.assertGreater(legacy.add_reading_session(1, 60), 7)
+        finally:
+            temp_dir.cleanup()
+    
+    def test_book_totals_follow_sessions(self):
+        """Test that per-book totals are kept current without counting as changes."""
+        book_id = self.db_manager.add_book("Test Book", "Test Author", 100)
+        version = self.db_manager.get_change_version()
+        first = self.db_manager.add_reading_session(book_id, 600, 10, start_time=1704067200)
+        second = self.db_manager.add_reading_session(book_id, 1200, 20)
+        
+        book = self.db_manager.get_books()[0]
+        self.assertEqual((book['total_seconds'], book['total_pages_read'], book['session_count']), (1800, 30, 2))
+        self.assertIsNotNone(book['last_session_at'])
+        
+        with self.db_manager._transaction() as conn:
+            conn.execute('DELETE FROM reading_sessions WHERE id = ?', (second,))
+            conn.execute('UPDATE reading_sessions SET duration_seconds = 900, session_date = 1704067800 WHERE id = ?',
+                         (first,))
+        book = self.db_manager.get_books()[0]
+        self.assertEqual((book['total_seconds'], book['total_pages_read'], book['session_count']), (900, 10, 1))
+        self.assertEqual(book['last_session_at'], datetime.fromtimestamp(1704067800).isoformat())
+        
+        # Two inserts, one delete and one update; the totals themselves are not changes
+        self.assertEqual(self.db_manager.get_change_version(), version + 4)
+    
+    def test_book_sorts(self):
+        """Test the recently read, most read and least progress orderings."""
+        unread = self.db_manager.add_book("Unread", "Author", 100)
+        long_ago = self.db_manager.add_book("Long Ago", "Author", 400)
+        recent = self.db_manager.add_book("Recent", "Author", 200)
+        self.db_manager.add_reading_session(long_ago, 7200, 300, start_time=1704067200)
+        self.db_manager.add_reading_session(recent, 600, 20)
+        
+        def titles(sort):
+            return [book['title'] for book in self.db_manager.get_books(columns=('title',), sort=sort)]
+        
+        self.assertEqual(titles('recently_read'), ["Recent", "Long Ago", "Unread"])
+        self.assertEqual(titles('most_read'), ["Long Ago", "Recent", "Unread"])
+        self.assertEqual(titles('least_progress'), ["Unread", "Recent", "Long Ago"])
+        with self.assertRaises(ValueError):
+            self.db_manager.get_books(sort='title')
+        
+        plan = ' '.join(self.db_manager.explain_query_plan(
+            f"SELECT id FROM books WHERE status = ? ORDER BY {BOOK_SORTS['least_progress']}", ('Active',)))
+        self.assertIn('idx_books_status_progress', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+    
+    def test_notes_loaded_on_demand(self):
+        """Test that book lists leave notes out unless asked for."""
+        book_id = self.db_manager.add_book("Test Book", "Test Author", notes="Short note")
+        
+        self.assertNotIn('notes', self.db_manager.get_books()[0])
+        self.assertEqual(self.db_manager.get_books(columns=('id', 'notes')), [{'id': book_id, 'notes': "Short note"}])
+        self.assertEqual(self.db_manager.get_book(book_id)['notes'], "Short note")
+        self.assertEqual(self.db_manager.get_book_notes(book_id), "Short note")
+        with self.assertRaises(ValueError):
+            self.db_manager.get_books(columns=('id', 'body'))
+        
+        self.db_manager.add_reading_session(book_id, 600, notes="Session note")
+        self.assertNotIn('notes', self.db_manager.get_reading_sessions()[0])
+        self.assertEqual(self.db_manager.get_reading_sessions(columns=('notes',)), [{'notes': "Session note"}])
+    
+    def test_long_notes_compressed(self):
+        """Test that long notes are stored compressed and still bump the book."""
+        book_id = self.db_manager.add_book("Test Book", "Test Author")
+        version = self.db_manager.get_change_version()
+        long_notes = "A long passage worth remembering. " * 100
+        
+        self.assertTrue(self.db_manager.update_book(book_id, notes=long_notes))
+        with self.db_manager._connect() as conn:
+            stored_type, stored_size = conn.execute(
+                'SELECT typeof(body), length(body) FROM book_notes WHERE book_id = ?', (book_id,)).fetchone()
+        self.assertEqual(stored_type, 'blob')
+        self.assertLess(stored_size, len(long_notes))
+        self.assertEqual(self.db_manager.get_book_notes(book_id), long_notes)
+        self.assertEqual(self.db_manager.get_change_version(), version + 1)
+        self.assertEqual(self.db_manager.get_changes_since(version)['books'][0]['notes'], long_notes)
+        
+        # Clearing the notes removes them
+        self.db_manager.update_book(book_id, notes='')
+        self.assertIsNone(self.db_manager.get_book_notes(book_id))
+        self.assertFalse(self.db_manager.update_book(book_id + 1, notes="Nobody's"))
+    
+    def test_migrate_inline_notes(self):
+        """Test that notes stored in the books rows move to book_notes."""
+        book_id = self.db_manager.add_book("Test Book", "Test Author")
+        with self.db_manager._transaction() as conn:
+            conn.execute("UPDATE books SET notes = 'Inline note' WHERE id = ?", (book_id,))
+        version = self.db_manager.get_change_version()
+        
+        self.db_manager.init_database()
+        with self.db_manager._connect() as conn:
+            self.assertIsNone(conn.execute('SELECT notes FROM books').fetchone()[0])
+        self.assertEqual(self.db_manager.get_book_notes(book_id), 'Inline note')
+        self.assertEqual(self.db_manager.get_change_version(), version)
+
+
+class TestInMemoryDatabase(unittest.TestCase):
+    """Test cases for the in-memory database mode."""
+    
+    def setUp(self):
+        """Set up a directory for persisted copies."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'booktrack.db')
+    
+    def tearDown(self):
+        """Clean up persisted copies."""
+        self.temp_dir.cleanup()
+    
+    def test_data_shared_across_connections(self):
+        """Test that every connection of a manager sees the same database."""
+        with DatabaseManager(MEMORY) as db:
+            book_id = db.add_book("Test Book", "Test Author")
+            db.add_reading_session(book_id, 600)
+            with db._connect() as conn:
+                self.assertEqual(conn.execute('SELECT COUNT(*) FROM reading_sessions').fetchone()[0], 1)
+            self.assertEqual(db.get_statistics()['total_sessions'], 1)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+    
+    def test_managers_are_isolated(self):
+        """Test that two in-memory managers do not share data."""
+        with DatabaseManager(MEMORY) as first, DatabaseManager(MEMORY) as second:
+            first.add_book("Test Book", "Test Author")
+            self.assertEqual(second.get_books(), [])
+    
+    def test_persist_to(self):
+        """Test saving an in-memory database to a file."""
+        with DatabaseManager(MEMORY, reuse_connection=True) as db:
+            book_id = db.add_book("Test Book", "Test Author")
+            db.add_reading_session(book_id, 600, 10)
+            self.assertEqual(db.persist_to(self.db_path), self.db_path)
+        
+        saved = DatabaseManager(self.db_path)
+        self.assertEqual(saved.get_books()[0]['title'], "Test Book")
+        self.assertEqual(saved.get_reading_sessions()[0]['pages_read'], 10)
+    
+    def test_persist_on_shutdown(self):
+        """Test that shutdown() saves to persist_path."""
+        db = DatabaseManager(MEMORY, persist_path=self.db_path)
+        db.add_book("Test Book", "Test Author")
+        self.assertFalse(os.path.exists(self.db_path))
+        db.shutdown()
+        self.assertEqual(len(DatabaseManager(self.db_path).get_books()), 1)
 
 
 class TestTimer(unittest.TestCase):
@@ -254,29 +461,13 @@ class TestDecimalHandling(unittest.TestCase):
     """Test cases for Decimal value handling."""
     
     def setUp(self):
-        """Set up test database."""
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.temp_db.close()
-        self.db_manager = DatabaseManager(self.temp_db.name)
+        """Set up an in-memory test database."""
+        self.db_manager = DatabaseManager(MEMORY)
     
     def tearDown(self):
         """Clean up test database."""
-        # Ensure database connection is closed
-        self.db_manager = None
-        # Give Windows time to release the file handle
-        import time
-        time.sleep(0.1)
-        try:
-            os.unlink(self.temp_db.name)
-        except (OSError, PermissionError):
-            # On Windows, sometimes the file is still locked
-            import gc
-            gc.collect()
-            time.sleep(0.2)
-            try:
-                os.unlink(self.temp_db.name)
-            except (OSError, PermissionError):
-                pass  # Ignore if we can't delete (Windows file locking)
+        # Closing the last connection frees the in-memory database
+        self.db_manager.shutdown()
     
     def test_decimal_book_pages(self):
         """Test that Decimal total_pages values are properly converted."""
@@ -346,30 +537,14 @@ class TestIntegration(unittest.TestCase):
     
     def setUp(self):
         """Set up test environment."""
-        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
-        self.temp_db.close()
-        self.db_manager = DatabaseManager(self.temp_db.name)
+        self.db_manager = DatabaseManager(MEMORY)
         self.timer = Timer()
     
     def tearDown(self):
         """Clean up test environment."""
-        # Ensure database connection is closed
-        self.db_manager = None
+        # Closing the last connection frees the in-memory database
+        self.db_manager.shutdown()
         self.timer = None
-        # Give Windows time to release the file handle
-        import time
-        time.sleep(0.1)
-        try:
-            os.unlink(self.temp_db.name)
-        except (OSError, PermissionError):
-            # On Windows, sometimes the file is still locked
-            import gc
-            gc.collect()
-            time.sleep(0.2)
-            try:
-                os.unlink(self.temp_db.name)
-            except (OSError, PermissionError):
-                pass  # Ignore if we can't delete (Windows file locking)
     
     def test_complete_reading_workflow(self):
         """Test a complete reading session workflow."""
@@ -458,12 +633,7 @@ def run_standalone_tests():
     # Test database operations
     print("🗄️  Testing Database Operations...")
     
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tmp:
-        tmp_path = tmp.name
-    
-    try:
-        db = DatabaseManager(tmp_path)
-        
+    with DatabaseManager(MEMORY) as db:
         # Test adding a book
         book_id = db.add_book(
             title="Test Book", 
@@ -504,12 +674,6 @@ def run_standalone_tests():
         assert len(export_data['reading_sessions']) == 1
         print("✅ Data export successful")
         
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except:
-            pass
-    
     print("✅ All database tests passed!\n")
     
     # Test timer operations
@@ -0,0 +1,89 @@
+"""
+Tests for the columnar session snapshot
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.columnar import SessionColumns, refresh_snapshot
+from booktrack.database import DatabaseManager
+
+
+class TestSessionSnapshot(unittest.TestCase):
+    """Test cases for building and refreshing the snapshot."""
+
+    def setUp(self):
+        """Set up a library with sessions and a snapshot directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'test.db'), archive=True)
+        self.snapshot_dir = os.path.join(self.temp_dir.name, 'snapshot')
+        self.book_ids = [self.db_manager.add_book(f"Book {i}", "Author") for i in range(3)]
+        self.session_ids = [
+            self.db_manager.add_reading_session(self.book_ids[i % 3], 600 + i, i or None, None, 1704067200 + i, None)
+            for i in range(6)
+        ]
+
+    def tearDown(self):
+        """Clean up test database."""
+        self.db_manager.shutdown()
+        self.temp_dir.cleanup()
+
+    def assertMatchesDatabase(self):
+        """The snapshot holds exactly the sessions in the database."""
+        expected = sorted((s['id'], s['book_id'], s['duration_seconds'], s['pages_read'] or 0)
+                          for s in self.db_manager.get_reading_sessions())
+        with SessionColumns(self.snapshot_dir) as columns:
+            actual = list(zip(columns.id, columns.book_id, columns.duration, columns.pages))
+        self.assertEqual(actual, expected)
+
+    def test_build_and_read(self):
+        """Test that a new snapshot maps every session's columns."""
+        result = refresh_snapshot(self.db_manager, self.snapshot_dir)
+        self.assertEqual((result['rows'], result['rebuilt']), (6, True))
+        self.assertMatchesDatabase()
+        with SessionColumns(self.snapshot_dir) as columns:
+            self.assertEqual(columns.version, self.db_manager.get_change_version())
+            self.assertEqual(list(columns.start), [1704067200 + i for i in range(6)])
+            self.assertEqual(columns.seconds_by_book(), {self.book_ids[0]: 1203, self.book_ids[1]: 1205,
+                                                         self.book_ids[2]: 1207})
+
+    def test_incremental_refresh(self):
+        """Test that refreshes append, patch in place and rewrite only for deletions."""
+        refresh_snapshot(self.db_manager, self.snapshot_dir)
+        self.assertEqual(refresh_snapshot(self.db_manager, self.snapshot_dir)['appended'], 0)
+
+        self.db_manager.add_reading_session(self.book_ids[0], 900, 30)
+        with self.db_manager._transaction() as conn:
+            conn.execute('UPDATE reading_sessions SET duration_seconds = 1 WHERE id = ?', (self.session_ids[2],))
+            conn.commit()
+        result = refresh_snapshot(self.db_manager, self.snapshot_dir)
+        self.assertEqual((result['appended'], result['updated'], result['rebuilt']), (1, 1, False))
+        self.assertMatchesDatabase()
+
+        self.db_manager.delete_book(self.book_ids[1])
+        result = refresh_snapshot(self.db_manager, self.snapshot_dir)
+        self.assertEqual((result['deleted'], result['rows']), (2, 5))
+        self.assertMatchesDatabase()
+        self.assertEqual(len([name for name in os.listdir(self.snapshot_dir) if name.endswith('.bin')]), 5)
+
+    def test_archived_sessions_are_kept(self):
+        """Test that archiving does not remove sessions and a rebuild reads the archive too."""
+        refresh_snapshot(self.db_manager, self.snapshot_dir)
+        self.db_manager.update_book(self.book_ids[0], status='Read')
+        self.db_manager.archive_books()
+        self.assertEqual(refresh_snapshot(self.db_manager, self.snapshot_dir)['rows'], 6)
+        self.assertEqual(refresh_snapshot(self.db_manager, self.snapshot_dir, rebuild=True)['rows'], 6)
+
+        self.db_manager.restore_archived_book(self.book_ids[0])
+        result = refresh_snapshot(self.db_manager, self.snapshot_dir)
+        self.assertEqual((result['rows'], result['updated']), (6, 2))
+        self.assertMatchesDatabase()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for concurrent writers across processes
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import threading
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+
+
+def write_worker(db_path, worker, writes):
+    """Add sessions to and update one book from a separate process."""
+    db = DatabaseManager(db_path)
+    book_id = db.add_book(f'Worker {worker}', 'Stress Test')
+    for i in range(writes):
+        db.add_reading_session(book_id, 60 + i, 1)
+        db.update_book(book_id, notes=f'{worker}:{i}')
+    return book_id
+
+
+class TestConcurrentWriters(unittest.TestCase):
+    """Test cases for busy handling and write retries."""
+
+    def setUp(self):
+        """Set up a test database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'booktrack.db')
+        self.db_manager = DatabaseManager(self.db_path)
+
+    def tearDown(self):
+        """Clean up the test database."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def test_database_uses_wal(self):
+        """Test that the database is switched to WAL mode."""
+        with sqlite3.connect(self.db_path) as conn:
+            mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        conn.close()
+        self.assertEqual(mode, 'wal')
+
+    def test_no_lost_writes_across_processes(self):
+        """Test that writers in several processes never lose a write."""
+        workers, writes = 4, 40
+        version = self.db_manager.get_change_version()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(write_worker, self.db_path, w, writes) for w in range(workers)]
+            book_ids = [future.result() for future in futures]
+
+        sessions = self.db_manager.get_reading_sessions()
+        self.assertEqual(len(sessions), workers * writes)
+        for worker, book_id in enumerate(book_ids):
+            self.assertEqual(self.db_manager.get_book(book_id)['notes'], f'{worker}:{writes - 1}')
+        # Every insert and update bumped the change sequence exactly once
+        self.assertEqual(self.db_manager.get_change_version() - version, workers * (1 + 2 * writes))
+
+    def test_retry_waits_for_lock(self):
+        """Test that a locked write is retried until the lock is released."""
+        db = DatabaseManager(self.db_path, busy_timeout=0.01, write_retries=8)
+        blocker = sqlite3.connect(self.db_path, check_same_thread=False)
+        blocker.execute('BEGIN IMMEDIATE')
+        release = threading.Timer(0.2, blocker.commit)
+        release.start()
+        try:
+            book_id = db.add_book('Patient', 'Author')
+        finally:
+            release.join()
+            blocker.close()
+        self.assertIsNotNone(db.get_book(book_id))
+
+        # Deleting everything waits for the lock the same way
+        blocker = sqlite3.connect(self.db_path, check_same_thread=False)
+        blocker.execute('BEGIN IMMEDIATE')
+        release = threading.Timer(0.2, blocker.commit)
+        release.start()
+        try:
+            self.assertTrue(db.delete_all_data())
+        finally:
+            release.join()
+            blocker.close()
+        self.assertEqual(db.get_books(), [])
+
+    def test_retry_gives_up(self):
+        """Test that retries are bounded."""
+        db = DatabaseManager(self.db_path, busy_timeout=0.01, write_retries=1)
+        blocker = sqlite3.connect(self.db_path)
+        blocker.execute('BEGIN IMMEDIATE')
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                db.add_book('Impatient', 'Author')
+        finally:
+            blocker.rollback()
+            blocker.close()
+        self.assertEqual(db.get_books(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tests for cover image loading and caching
+"""
+
+import unittest
+import asyncio
+import tempfile
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.covers import CoverCache, CoverLoader, fetch_url
+
+
+class CoverServer:
+    """Local stand-in for a remote image host."""
+
+    def __init__(self, delay=0.0):
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.delay = delay
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    server.requests += 1
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                time.sleep(server.delay)
+                with lock:
+                    server.active -= 1
+                if self.path.startswith('/missing'):
+                    self.send_error(404)
+                    return
+                # Same bytes for /same-*, distinct bytes otherwise
+                body = b'cover-same' if self.path.startswith('/same') else f'cover{self.path}'.encode() * 64
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}{path}'
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestCoverLoader(unittest.TestCase):
+    """Test cases for CoverCache and CoverLoader."""
+
+    def setUp(self):
+        """Set up a cache directory and a local image server."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.server = CoverServer(delay=0.05)
+        self.cache = CoverCache(self.temp_dir.name)
+
+    def tearDown(self):
+        """Stop the server and clean up."""
+        self.server.close()
+        self.temp_dir.cleanup()
+
+    def test_bounded_concurrency_and_caching(self):
+        """Test that downloads are bounded and cached on disk."""
+        loader = CoverLoader(self.cache, max_concurrency=2)
+        urls = [self.server.url(f'/cover{i}.jpg') for i in range(6)]
+
+        async def load_all():
+            return await asyncio.gather(*(loader.load(url) for url in urls))
+
+        paths = asyncio.run(load_all())
+        self.assertTrue(all(path and os.path.exists(path) for path in paths))
+        self.assertLessEqual(self.server.max_active, 2)
+        self.assertEqual(self.server.requests, 6)
+
+        # Cached covers are served without a request
+        self.assertEqual(loader.cached(urls[0]), paths[0])
+        asyncio.run(loader.load(urls[0]))
+        self.assertEqual(self.server.requests, 6)
+
+    def test_duplicate_requests_share_download(self):
+        """Test that concurrent loads of one URL fetch once."""
+        loader = CoverLoader(self.cache)
+        url = self.server.url('/cover.jpg')
+
+        async def load_twice():
+            return await asyncio.gather(loader.load(url), loader.load(url))
+
+        first, second = asyncio.run(load_twice())
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_content_addressed_storage(self):
+        """Test that identical images from different URLs are stored once."""
+        loader = CoverLoader(self.cache)
+        first = asyncio.run(loader.load(self.server.url('/same-a.jpg')))
+        second = asyncio.run(loader.load(self.server.url('/same-b.jpg')))
+        self.assertEqual(first, second)
+
+    def test_failed_download(self):
+        """Test that failures return None and are not retried until their delay passes."""
+        loader = CoverLoader(self.cache)
+        url = self.server.url('/missing.jpg')
+        self.assertIsNone(asyncio.run(loader.load(url)))
+        self.assertIsNone(asyncio.run(loader.load(url)))
+        self.assertEqual(self.server.requests, 1)
+        self.assertIn(url, loader.failed)
+
+    def test_failed_download_retried(self):
+        """Test that a failed cover is retried after its delay, which then doubles."""
+        data = [None]
+
+        def fetch(url):
+            if data[0] is None:
+                raise OSError('network down')
+            return data[0]
+
+        loader = CoverLoader(self.cache, fetch=fetch, retry_after=0.05)
+        self.assertIsNone(asyncio.run(loader.load('http://x/flaky.jpg')))
+        time.sleep(0.06)
+        self.assertIsNone(asyncio.run(loader.load('http://x/flaky.jpg')))
+        # The second failure waits twice as long
+        data[0] = b'cover'
+        time.sleep(0.06)
+        self.assertIsNone(asyncio.run(loader.load('http://x/flaky.jpg')))
+        time.sleep(0.05)
+        path = asyncio.run(loader.load('http://x/flaky.jpg'))
+        self.assertIsNotNone(path)
+        self.assertNotIn('http://x/flaky.jpg', loader.failed)
+
+    def test_started_tasks_kept(self):
+        """Test that background tasks are referenced until they finish."""
+        loader = CoverLoader(self.cache, fetch=lambda url: b'cover')
+
+        async def run():
+            task = loader.start(loader.load('http://x/a.jpg'))
+            self.assertIn(task, loader._tasks)
+            path = await task
+            await asyncio.sleep(0)
+            return path
+
+        self.assertIsNotNone(asyncio.run(run()))
+        self.assertEqual(loader._tasks, set())
+
+    def test_only_http_urls_fetched(self):
+        """Test that cover URLs with other schemes are refused, not read."""
+        path = os.path.join(self.temp_dir.name, 'secret.txt')
+        with open(path, 'w') as f:
+            f.write('secret')
+        with self.assertRaises(ValueError):
+            fetch_url('file://' + path)
+        loader = CoverLoader(self.cache)
+        self.assertIsNone(asyncio.run(loader.load('file://' + path)))
+        self.assertIn('file://' + path, loader.failed)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used covers are evicted first."""
+        self.cache.max_bytes = 2000
+        for name in ('a', 'b', 'c'):
+            self.cache.store(f'http://x/{name}', name.encode() * 800)
+            time.sleep(0.02)
+            # Touch 'a' so it is the most recently used
+            self.cache.lookup('http://x/a')
+
+        self.assertLessEqual(self.cache.size(), 2000)
+        self.assertIsNotNone(self.cache.lookup('http://x/a'))
+        self.assertIsNone(self.cache.lookup('http://x/b'))
+        # The evicted cover's URL entry goes with it
+        self.assertEqual(len(os.listdir(os.path.join(self.cache.cache_dir, 'urls'))), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
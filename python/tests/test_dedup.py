@@ -0,0 +1,117 @@
+"""
+Tests for duplicate book detection and merging
+"""
+
+import unittest
+import contextlib
+import io
+import tempfile
+import os
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import MEMORY, DatabaseManager
+from booktrack.dedup import find_duplicates, main, merge_duplicates, title_key
+
+
+class TestDedup(unittest.TestCase):
+    """Test cases for finding and merging duplicate books."""
+
+    def setUp(self):
+        """Set up an in-memory library with some duplicates."""
+        self.db_manager = DatabaseManager(MEMORY)
+        self.ids = {}
+        for name, title, author in (('hobbit', 'The Hobbit', 'J.R.R. Tolkien'),
+                                    ('hobbit_copy', 'Hobbit', 'JRR Tolkien'),
+                                    ('journey', 'The Hobbit, or There and Back Again', 'J.R.R. Tolkien'),
+                                    ('journey_typo', 'Hobbit or There and Back Agian', 'J. R. R. Tolkien'),
+                                    ('stone', "Harry Potter and the Philosopher's Stone", 'J.K. Rowling'),
+                                    ('stone_copy', 'Harry Potter & the Philosophers Stone', 'J.K. Rowling'),
+                                    ('dune_1', 'Dune 1', 'Frank Herbert'),
+                                    ('dune_2', 'Dune 2', 'Frank Herbert'),
+                                    ('emma', 'Emma', 'Jane Austen'),
+                                    ('emma_other', 'Emma', 'Alexander McCall Smith')):
+            self.ids[name] = self.db_manager.add_book(title, author)
+
+    def tearDown(self):
+        """Free the in-memory library."""
+        self.db_manager.shutdown()
+
+    def groups(self):
+        return {frozenset([group['keep']['id']] + [book['id'] for book in group['merge']])
+                for group in find_duplicates(self.db_manager)}
+
+    def test_title_key(self):
+        """Test that case, accents, punctuation and a leading article are ignored."""
+        self.assertEqual(title_key('The Lord of the Rings'), 'lord of the rings')
+        self.assertEqual(title_key("L'Étranger"), 'letranger')
+        self.assertEqual(title_key('Pride & Prejudice!'), 'pride and prejudice')
+
+    def test_find_duplicates(self):
+        """Test that copies are grouped and distinct books are not."""
+        ids = self.ids
+        self.assertEqual(self.groups(), {
+            frozenset([ids['hobbit'], ids['hobbit_copy']]),
+            frozenset([ids['journey'], ids['journey_typo']]),
+            frozenset([ids['stone'], ids['stone_copy']])
+        })
+
+    def test_keep_most_read_copy(self):
+        """Test that the copy with the most reading history is kept."""
+        self.db_manager.add_reading_session(self.ids['hobbit_copy'], 600, 10)
+        group = next(group for group in find_duplicates(self.db_manager)
+                     if group['keep']['id'] == self.ids['hobbit_copy'])
+        self.assertEqual([book['id'] for book in group['merge']], [self.ids['hobbit']])
+
+    def test_merge(self):
+        """Test that merging moves sessions, tags and notes in one step."""
+        keep, copy = self.ids['stone'], self.ids['stone_copy']
+        self.db_manager.add_reading_session(keep, 600, 10)
+        self.db_manager.add_reading_session(keep, 300, 5)
+        self.db_manager.add_reading_session(copy, 900, 20)
+        self.db_manager.update_book(copy, total_pages=309, notes='Read on holiday')
+        self.db_manager.set_book_tags(keep, ['Fantasy'])
+        self.db_manager.set_book_tags(copy, ['Favourites'])
+        version = self.db_manager.get_change_version()
+
+        groups = [group for group in find_duplicates(self.db_manager) if group['keep']['id'] == keep]
+        result = merge_duplicates(self.db_manager, groups)
+        self.assertEqual(result, {'groups': 1, 'books_merged': 1, 'sessions_moved': 1})
+
+        self.assertIsNone(self.db_manager.get_book(copy))
+        book = self.db_manager.get_books(columns=('id', 'total_pages', 'total_seconds', 'session_count'),
+                                         all_tags=['Fantasy', 'Favourites'])
+        self.assertEqual(book, [{'id': keep, 'total_pages': 309, 'total_seconds': 1800, 'session_count': 3}])
+        self.assertEqual(self.db_manager.get_book_notes(keep), 'Read on holiday')
+
+        # Synced libraries see the moved session and the deleted copy
+        changes = self.db_manager.get_changes_since(version)
+        self.assertEqual([session['book_id'] for session in changes['reading_sessions']], [keep])
+        self.assertIn(('books', copy), [(d['table'], d['row_id']) for d in changes['deleted']])
+
+        # Groups that went stale are skipped
+        self.assertEqual(merge_duplicates(self.db_manager, groups)['groups'], 0)
+
+    def test_dry_run(self):
+        """Test that the command only reports unless asked to merge."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'library.db')
+            db = DatabaseManager(path)
+            db.add_book('Dune', 'Frank Herbert')
+            db.add_book('DUNE', 'frank herbert')
+
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(main(['--db', path]), 0)
+            self.assertIn('Dry run: 1 duplicate books in 1 groups', output.getvalue())
+            self.assertEqual(len(db.get_books()), 2)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                main(['--db', path, '--apply'])
+            self.assertEqual(len(db.get_books()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for streaming compressed exports
+"""
+
+import unittest
+import tempfile
+import gzip
+import json
+import lzma
+import os
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.exporter import ExportCancelled, ExportJob
+
+
+class TestExportJob(unittest.TestCase):
+    """Test cases for the background export job."""
+
+    def setUp(self):
+        """Set up a library with a few books and sessions."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'test.db'))
+        for i in range(30):
+            book_id = self.db_manager.add_book(f"Book {i}", "Author", notes=f"Notes {i} ✓")
+            for j in range(i % 4):
+                self.db_manager.add_reading_session(book_id, 600 + j, j, None, 1704067200 + j * 3600, None)
+
+    def tearDown(self):
+        """Clean up test database."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def test_streamed_export_matches_export_data(self):
+        """Test that gzip and xz exports hold the same books as export_data()."""
+        expected = self.db_manager.export_data()['books']
+        for compression, opener in (('gzip', gzip.open), ('xz', lzma.open)):
+            path = os.path.join(self.temp_dir.name, f'export.{compression}')
+            reports = []
+            stats = ExportJob(self.db_manager, path, compression, progress=reports.append, interval=0).run()
+            with opener(path, 'rt', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['books'], expected)
+            self.assertEqual((stats['books'], stats['sessions']), (30, 43))
+            self.assertEqual(stats['bytes'], os.path.getsize(path))
+            self.assertEqual(reports[-1], stats)
+            self.assertFalse(os.path.exists(path + '.part'))
+
+    def test_totals_match_exported_rows(self):
+        """Test that totals come from the export's snapshot, not later writes."""
+        reports = []
+
+        def progress(stats):
+            if not reports:
+                self.db_manager.add_book("Added during export", "Author")
+            reports.append(stats)
+
+        stats = ExportJob(self.db_manager, os.path.join(self.temp_dir.name, 'export.gz'),
+                          progress=progress, interval=0).run()
+        self.assertEqual((stats['total_books'], stats['total_sessions']), (30, 43))
+        self.assertEqual((stats['books'], stats['sessions']), (30, 43))
+        self.assertTrue(all(report['total_books'] == 30 for report in reports))
+
+    def test_progress_is_throttled(self):
+        """Test that progress is reported only once per interval, plus the final count."""
+        reports = []
+        ExportJob(self.db_manager, os.path.join(self.temp_dir.name, 'export.gz'),
+                  progress=reports.append, interval=3600).run()
+        self.assertEqual(len(reports), 1)
+
+    def test_cancel_removes_partial_output(self):
+        """Test that a cancelled export raises and leaves no file behind."""
+        path = os.path.join(self.temp_dir.name, 'export.gz')
+        job = ExportJob(self.db_manager, path, progress=lambda stats: job.cancel(), interval=0)
+        with self.assertRaises(ExportCancelled):
+            job.run()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(path + '.part'))
+
+        # The export's snapshot was released: writes go through
+        self.db_manager.add_book("After", "Author")
+
+
+if __name__ == '__main__':
+    unittest.main()
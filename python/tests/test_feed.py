@@ -0,0 +1,83 @@
+"""
+Tests for the incremental NDJSON change feed
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.feed import checkpoint_key, export_changes, read_feed
+
+
+class TestFeed(unittest.TestCase):
+    """Test cases for incremental exports."""
+
+    def setUp(self):
+        """Set up test database and feed path."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'test.db'))
+        self.feed_path = os.path.join(self.temp_dir.name, 'feed.ndjson')
+
+    def tearDown(self):
+        """Clean up test database."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def batches(self):
+        """Split the feed into batches of records at its checkpoint records."""
+        batches, batch = [], []
+        for record in read_feed(self.feed_path):
+            if record['type'] == 'checkpoint':
+                batches.append(batch)
+                batch = []
+            else:
+                batch.append(record)
+        return batches
+
+    def test_exports_only_changes_since_checkpoint(self):
+        """Test that each export appends only what changed since the previous one."""
+        book_id = self.db_manager.add_book("Dune", "Frank Herbert", notes="Spice")
+        self.db_manager.set_book_tags(book_id, ['Fiction'])
+        other_id = self.db_manager.add_book("Cosmos", "Carl Sagan")
+        self.assertEqual(export_changes(self.db_manager, self.feed_path)['records'], 2)
+
+        self.db_manager.add_reading_session(book_id, 900, 20)
+        self.db_manager.delete_book(other_id)
+        version = int(self.db_manager.get_setting(checkpoint_key(self.feed_path)))
+        result = export_changes(self.db_manager, self.feed_path)
+        self.assertEqual((result['since'], result['records']), (version, 2))
+        self.assertEqual(self.db_manager.get_setting(checkpoint_key(self.feed_path)), str(result['version']))
+
+        # Nothing changed: nothing is appended
+        self.assertEqual(export_changes(self.db_manager, self.feed_path)['records'], 0)
+
+        first, second = self.batches()
+        self.assertEqual([(r['type'], r['title'], r['notes'], r['tags']) for r in first],
+                         [('book', 'Dune', 'Spice', ['Fiction']), ('book', 'Cosmos', None, [])])
+        self.assertEqual([r['type'] for r in second], ['session', 'deleted'])
+        self.assertEqual((second[0]['book_id'], second[0]['duration_seconds']), (book_id, 900))
+        self.assertEqual((second[1]['table'], second[1]['id']), ('books', other_id))
+        self.assertEqual([r['seq'] for r in first + second], sorted(r['seq'] for r in first + second))
+
+    def test_full_export_rewrites_feed(self):
+        """Test that a full export starts the file over from the whole history."""
+        self.db_manager.add_book("Dune", "Frank Herbert")
+        export_changes(self.db_manager, self.feed_path)
+        self.db_manager.add_book("Cosmos", "Carl Sagan")
+        export_changes(self.db_manager, self.feed_path)
+
+        self.assertEqual(export_changes(self.db_manager, self.feed_path, full=True)['records'], 2)
+        self.assertEqual([[r['title'] for r in batch] for batch in self.batches()], [['Dune', 'Cosmos']])
+
+        # Each file keeps its own checkpoint
+        other_path = os.path.join(self.temp_dir.name, 'other.ndjson')
+        self.assertEqual(export_changes(self.db_manager, other_path)['records'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
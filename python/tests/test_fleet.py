@@ -0,0 +1,103 @@
+"""
+Tests for fleet-wide statistics
+"""
+
+import unittest
+import tempfile
+import os
+import sqlite3
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.fleet import collect_fleet_statistics, find_databases, library_aggregates
+
+
+class TestFleetStatistics(unittest.TestCase):
+    """Test cases for the fleet-stats tool."""
+
+    def setUp(self):
+        """Create a few library databases."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir.name, f'reader{i}.db')
+            db = DatabaseManager(path)
+            book_id = db.add_book(f"Book {i}", "Author", 100)
+            db.add_reading_session(book_id, 600 * (i + 1), 10)
+            db.add_book("Finished", "Author")
+            self.paths.append(path)
+
+    def tearDown(self):
+        """Clean up test databases."""
+        self.temp_dir.cleanup()
+
+    def test_library_aggregates_is_read_only(self):
+        """Test that workers open databases read-only."""
+        os.chmod(self.paths[0], 0o444)
+        try:
+            partial = library_aggregates(self.paths[0])
+        finally:
+            os.chmod(self.paths[0], 0o644)
+        self.assertNotIn('error', partial)
+        self.assertEqual(partial['total_reading_time_seconds'], 600)
+        self.assertEqual(partial['total_pages_read'], 10)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            DatabaseManager(self.paths[0], read_only=True).add_book("X", "Y")
+
+    def test_older_library_upgraded_before_reading(self):
+        """Test that a library from before this schema is migrated once, then read read-only."""
+        path = os.path.join(self.temp_dir.name, 'legacy.db')
+        conn = sqlite3.connect(path)
+        conn.executescript('''
+            CREATE TABLE books (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, author TEXT NOT NULL,
+                total_pages INTEGER, cover_image_url TEXT, status TEXT DEFAULT 'Active',
+                notes TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE reading_sessions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, book_id INTEGER NOT NULL,
+                duration_seconds INTEGER NOT NULL, pages_read INTEGER, notes TEXT,
+                start_time TIMESTAMP, end_time TIMESTAMP, session_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            INSERT INTO books (title, author) VALUES ('Old', 'Author');
+            INSERT INTO reading_sessions (book_id, duration_seconds, pages_read, start_time, session_date)
+            VALUES (1, 900, 12, '2024-01-01 09:45:00', '2024-01-01 10:00:00');
+        ''')
+        conn.close()
+
+        partial = library_aggregates(path)
+        self.assertNotIn('error', partial)
+        self.assertEqual((partial['total_books'], partial['total_sessions'], partial['total_pages_read']),
+                         (1, 1, 12))
+        db = DatabaseManager(path, read_only=True)
+        self.assertEqual([book['title'] for book in db.get_books()], ['Old'])
+        self.assertEqual(db.get_reading_sessions()[0]['duration_seconds'], 900)
+
+    def test_collect_merges_partials(self):
+        """Test merging sums, counts and daily histograms."""
+        result = collect_fleet_statistics(find_databases([self.temp_dir.name]), max_workers=2)
+
+        self.assertEqual(result['libraries'], 3)
+        self.assertEqual(result['total_reading_time_seconds'], 3600)
+        self.assertEqual(result['total_sessions'], 3)
+        self.assertEqual(result['total_books'], 6)
+        self.assertEqual(result['total_pages_read'], 30)
+        self.assertEqual(result['books_by_status'], {'Active': 6})
+        self.assertEqual(len(result['daily']), 1)
+        self.assertEqual(result['daily'][0]['sessions'], 3)
+
+    def test_missing_database_reported(self):
+        """Test that unreadable databases are reported, not fatal."""
+        missing = os.path.join(self.temp_dir.name, 'missing.db')
+        result = collect_fleet_statistics(self.paths + [missing], max_workers=2)
+        self.assertEqual(result['libraries'], 3)
+        self.assertIn(missing, result['errors'])
+        self.assertFalse(os.path.exists(missing))
+
+
+if __name__ == '__main__':
+    unittest.main()
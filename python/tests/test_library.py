@@ -0,0 +1,111 @@
+"""
+Tests for the Booktrack library registry
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import time
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.library import LibraryRegistry, merge_statistics
+
+
+class TestLibraryRegistry(unittest.TestCase):
+    """Test cases for LibraryRegistry."""
+
+    def setUp(self):
+        """Set up a registry in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry = LibraryRegistry(self.temp_dir.name, max_open=2, idle_timeout=60)
+
+    def tearDown(self):
+        """Close libraries and clean up."""
+        self.registry.close_all()
+        self.temp_dir.cleanup()
+
+    def test_libraries_are_separate_files(self):
+        """Test that each library has its own database."""
+        self.registry.get('alice').add_book("Alice's Book", "Author")
+        self.registry.get('bob').add_book("Bob's Book", "Author")
+
+        self.assertEqual(self.registry.list_libraries(), ['alice', 'bob'])
+        self.assertEqual([b['title'] for b in self.registry.get('alice').get_books()], ["Alice's Book"])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, 'bob.db')))
+
+    def test_get_reuses_manager_and_connection(self):
+        """Test that repeated calls share one open connection."""
+        library = self.registry.get('alice')
+        library.add_book("Book", "Author")
+        connection = library._conn
+        library.get_books()
+
+        self.assertIs(self.registry.get('alice'), library)
+        self.assertIs(library._conn, connection)
+
+    def test_invalid_name_rejected(self):
+        """Test that names cannot escape the registry directory."""
+        with self.assertRaises(ValueError):
+            self.registry.get('../elsewhere')
+
+    def test_idle_and_lru_eviction(self):
+        """Test closing idle libraries and capping open connections."""
+        for name in ('a', 'b', 'c'):
+            self.registry.get(name).get_books()
+            time.sleep(0.01)
+        # max_open=2: the least recently used library was closed
+        self.assertEqual(sorted(self.registry.open_libraries()), ['b', 'c'])
+
+        closed = self.registry.evict_idle(now=time.monotonic() + 120)
+        self.assertEqual(sorted(closed), ['b', 'c'])
+        self.assertEqual(self.registry.open_libraries(), [])
+
+        # Closed libraries reopen lazily
+        self.assertEqual(self.registry.get('a').get_books(), [])
+
+    def test_aggregate_statistics(self):
+        """Test cross-library statistics computed in parallel."""
+        for name, seconds in (('alice', 600), ('bob', 1200), ('carol', 300)):
+            library = self.registry.get(name)
+            book_id = library.add_book("Book", "Author")
+            library.add_reading_session(book_id, seconds)
+
+        stats = self.registry.aggregate_statistics(max_workers=3)
+        self.assertEqual(stats['total_reading_time_seconds'], 2100)
+        self.assertEqual(stats['total_sessions'], 3)
+        self.assertEqual(stats['books_by_status'], {'Active': 3})
+        self.assertEqual(set(stats['libraries']), {'alice', 'bob', 'carol'})
+        self.assertEqual(sum(seconds for _, seconds in stats['daily_stats']), 2100)
+
+    def test_register_external_library(self):
+        """Test registering a database outside the registry directory."""
+        other_dir = tempfile.TemporaryDirectory()
+        try:
+            path = os.path.join(other_dir.name, 'shared.db')
+            DatabaseManager(path).add_book("Shared", "Author")
+            self.registry.register('shared', path)
+            self.assertIn('shared', self.registry.list_libraries())
+            self.assertEqual(len(self.registry.get('shared').get_books()), 1)
+            self.registry.close('shared')
+        finally:
+            other_dir.cleanup()
+
+    def test_merge_statistics(self):
+        """Test merging daily histograms by date."""
+        merged = merge_statistics([
+            {'total_reading_time_seconds': 10, 'total_sessions': 1, 'total_books': 1,
+             'books_by_status': {'Active': 1}, 'daily_stats': [('2024-01-02', 10)]},
+            {'total_reading_time_seconds': 5, 'total_sessions': 1, 'total_books': 2,
+             'books_by_status': {'Active': 1, 'Read': 1},
+             'daily_stats': [('2024-01-02', 3), ('2024-01-01', 2)]},
+        ])
+        self.assertEqual(merged['daily_stats'], [('2024-01-02', 13), ('2024-01-01', 2)])
+        self.assertEqual(merged['books_by_status'], {'Active': 2, 'Read': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for the Booktrack database instrumentation
+"""
+
+import unittest
+import tempfile
+import os
+import json
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.profiling import LatencyHistogram, QueryProfiler, normalize_sql
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for LatencyHistogram."""
+
+    def test_record_and_percentiles(self):
+        """Test bucket counts and percentile estimates."""
+        histogram = LatencyHistogram()
+        for elapsed_ms in [0.05, 0.2, 0.4, 3, 3000]:
+            histogram.record(elapsed_ms)
+
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.max_ms, 3000)
+        self.assertEqual(histogram.percentile(50), 0.5)
+        self.assertEqual(histogram.percentile(100), 3000)
+        self.assertEqual(sum(histogram.to_dict()['buckets'].values()), 5)
+
+    def test_empty_histogram(self):
+        """Test an empty histogram reports zeros."""
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(99), 0.0)
+        self.assertEqual(histogram.mean_ms, 0.0)
+
+
+class TestQueryProfiler(unittest.TestCase):
+    """Test cases for DatabaseManager profiling."""
+
+    def setUp(self):
+        """Set up test database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'test.db'))
+
+    def tearDown(self):
+        """Clean up test database."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def test_profiling_disabled_by_default(self):
+        """Test that no profiler is attached unless requested."""
+        self.assertIsNone(self.db_manager.profiler)
+        self.db_manager.add_book("Book", "Author")
+        self.assertIsNone(self.db_manager.profiler)
+
+    def test_records_methods_statements_and_connections(self):
+        """Test method, statement and connection metrics."""
+        profiler = self.db_manager.enable_profiling()
+        book_id = self.db_manager.add_book("Book", "Author")
+        self.db_manager.add_book("Book 2", "Author")
+        self.db_manager.add_reading_session(book_id, 600)
+        books = self.db_manager.get_books()
+
+        self.assertEqual(len(books), 2)
+        self.assertEqual(profiler.methods['add_book'].count, 2)
+        self.assertEqual(profiler.methods['get_books'].count, 1)
+        self.assertGreaterEqual(profiler.connections_opened, 4)
+
+        select = [s for s in profiler.statements.values()
+                  if s.sql.startswith('SELECT') and 'FROM books ORDER BY' in s.sql]
+        self.assertEqual(len(select), 1)
+        self.assertEqual(select[0].rows, 2)
+
+        # The trace callback also sees statements run implicitly
+        self.assertTrue(any(sql.startswith('INSERT INTO books') for sql in profiler.traced))
+
+    def test_export_json(self):
+        """Test exporting the collected metrics as JSON."""
+        profiler = self.db_manager.enable_profiling()
+        self.db_manager.get_statistics()
+
+        path = os.path.join(self.temp_dir.name, 'profile.json')
+        profiler.export_json(path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.assertIn('get_statistics', data['methods'])
+        self.assertGreater(len(data['statements']), 0)
+
+    def test_slowest_statements_and_explain(self):
+        """Test slowest statement ranking and EXPLAIN QUERY PLAN."""
+        profiler = self.db_manager.enable_profiling()
+        book_id = self.db_manager.add_book("Book", "Author")
+        self.db_manager.get_book(book_id)
+
+        slowest = profiler.slowest_statements(3)
+        self.assertLessEqual(len(slowest), 3)
+        self.assertEqual(
+            [s.latency.max_ms for s in slowest],
+            sorted((s.latency.max_ms for s in slowest), reverse=True)
+        )
+
+        lookup = profiler.statements[normalize_sql('''
+            SELECT id, title, author, total_pages, cover_image_url, status,
+                   unpack_notes((SELECT body FROM book_notes WHERE book_id = books.id)), created_at
+            FROM books WHERE id = ?
+        ''')]
+        self.assertEqual(lookup.sample_params, (book_id,))
+        plan = self.db_manager.explain_query_plan(lookup.sql, lookup.sample_params)
+        self.assertTrue(any('books' in line for line in plan))
+
+    def test_explain_query_plan_params(self):
+        """Test that plans are explained with named, missing and quoted parameters."""
+        for sql, params in (('SELECT title FROM books WHERE id = :id', {'id': 1}),
+                            ("SELECT title FROM books WHERE id = ? AND title <> 'why?'", ()),
+                            ("SELECT title FROM books WHERE id = ? AND title <> 'why?'", None),
+                            ('SELECT title FROM books WHERE id = ?', (1, 2))):
+            plan = self.db_manager.explain_query_plan(sql, params)
+            self.assertTrue(any('books' in line for line in plan), sql)
+
+    def test_reset(self):
+        """Test that reset discards recorded metrics."""
+        profiler = QueryProfiler()
+        profiler.record_method('get_books', 1.0)
+        profiler.reset()
+        self.assertEqual(profiler.methods, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
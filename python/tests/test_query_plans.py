@@ -0,0 +1,180 @@
+"""
+Query plan regression tests for DatabaseManager.
+
+Every statement DatabaseManager issues against a populated fixture database
+is captured with the query profiler and explained. The test fails when a
+statement scans books or reading_sessions without an index, or when a plan
+differs from the record in query_plans.json. After an intended change,
+re-record with:
+
+    BOOKTRACK_UPDATE_PLANS=1 python -m pytest tests/test_query_plans.py
+"""
+
+import unittest
+import tempfile
+import json
+import os
+import re
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import AUTHOR_SORTS, BOOK_SORTS, DatabaseManager
+from booktrack.sync import apply_changeset, build_changeset
+
+PLANS_FILE = os.path.join(os.path.dirname(__file__), 'query_plans.json')
+
+# Statements that read or write rows; DDL, PRAGMA and transaction control are skipped
+_EXPLAINED = re.compile(r'^(SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+
+# A table access that walks every row without an index
+_FULL_SCAN = re.compile(r'^SCAN (books|reading_sessions)\b(?!.*\bINDEX\b)')
+
+# Whole-table statements that are full scans by design
+FULL_SCAN_ALLOWED = {
+    # delete_all_data()
+    'DELETE FROM reading_sessions',
+    'DELETE FROM books',
+    # rebucket_local_days() without a date range
+    'UPDATE reading_sessions SET local_day = local_day(COALESCE(start_time, session_date))',
+}
+
+
+def normalize_plan(lines):
+    """Drop wording that differs between SQLite versions ('SCAN TABLE x' vs 'SCAN x')."""
+    return [re.sub(r'\b(SCAN|SEARCH) TABLE ', r'\1 ', line) for line in lines]
+
+
+def populate(db):
+    """Fill a library with enough rows for realistic plans."""
+    statuses = ['Active', 'Read', 'Abandoned', 'Wishlist']
+    book_ids = [
+        db.add_book(f'Book {i}', f'Author {i % 17}', 100 + i, None, f'Notes {i}')
+        for i in range(60)
+    ]
+    tags = ['Fiction', 'History', 'Science', 'Poetry', 'Travel']
+    for i, book_id in enumerate(book_ids):
+        db.update_book(book_id, status=statuses[i % len(statuses)])
+        db.set_book_tags(book_id, [tags[i % len(tags)], tags[i % 3]])
+    for i in range(600):
+        start = 1704067200 + i * 20000
+        db.add_reading_session(book_ids[i % len(book_ids)], 600 + i, i % 30, None, start, start + 600 + i)
+    return book_ids
+
+
+def run_workload(db, book_ids, peer_changeset):
+    """Call every DatabaseManager query path."""
+    db.add_book('Another Book', 'Another Author', 200, None, None)
+    db.get_books()
+    db.get_books(status='Active')
+    db.get_books(columns=('id', 'title', 'notes'))
+    for sort in BOOK_SORTS:
+        db.get_books(sort=sort)
+        db.get_books(status='Active', sort=sort)
+    db.get_book(book_ids[0])
+    db.get_book_notes(book_ids[0])
+    db.set_book_tags(book_ids[0], ['Fiction', 'Favourites'])
+    db.get_book_tags(book_ids[0])
+    db.get_tags()
+    db.get_books(all_tags=['Fiction', 'History'])
+    db.get_books(status='Active', any_tags=['Poetry', 'Travel'], without_tags=['Science'])
+    db.get_books(without_tags=['Fiction'])
+    db.delete_tag('Favourites')
+    db.get_authors(prefix='author 1', limit=10)
+    for sort in AUTHOR_SORTS:
+        db.get_authors(sort=sort)
+    db.get_author_count()
+    db.get_books(author_id=1)
+    db.update_book(book_ids[1], title='Renamed', author='Someone', total_pages=321,
+                   cover_image_url='http://example.com/c.jpg', status='Read', notes='More notes')
+    db.get_reading_sessions()
+    db.get_reading_sessions(book_ids[2])
+    db.get_reading_sessions(start=1704067200, end=1706745600)
+    db.get_reading_sessions(book_ids[2], start=1704067200)
+    db.get_reading_sessions(book_ids[2], columns=('id', 'notes'))
+    db.get_statistics()
+    db.get_daily_totals()
+    db.get_daily_totals(since='2024-03-01')
+    db.get_reading_streaks()
+    db.export_data()
+    list(db.iter_export_books(totals={}))
+    db.get_setting('replica_id')
+    db.set_setting('plan_test', '1')
+    db.get_change_version()
+    db.get_changes_since(db.get_change_version() - 5)
+    db.set_time_zone('UTC')
+    db.get_time_zone()
+    db.rebucket_local_days(start=1706745600)
+    db.rebucket_local_days()
+    changeset = build_changeset(db, db.get_change_version() - 5)
+    apply_changeset(db, changeset)
+    apply_changeset(db, peer_changeset)
+    db.add_reading_session(book_ids[3], 900, 12, 'Late', None, None)
+    db.delete_book(book_ids[4])
+    db.delete_all_data()
+
+
+class TestQueryPlans(unittest.TestCase):
+    """Guard DatabaseManager queries against full-table scans."""
+
+    maxDiff = None
+
+    @classmethod
+    def setUpClass(cls):
+        """Capture and explain every statement of the workload."""
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        db = DatabaseManager(os.path.join(cls.temp_dir.name, 'booktrack.db'))
+        book_ids = populate(db)
+
+        # Changes from another library exercise the sync insert and delete paths
+        peer = DatabaseManager(os.path.join(cls.temp_dir.name, 'peer.db'))
+        peer_book = peer.add_book('Peer Book', 'Peer Author')
+        peer.add_reading_session(peer_book, 300)
+        peer.delete_book(peer.add_book('Deleted', 'Peer Author'))
+        peer_changeset = build_changeset(peer)
+
+        profiler = db.enable_profiling()
+        run_workload(db, book_ids, peer_changeset)
+        statements = [
+            (sql, stats.sample_params) for sql, stats in profiler.statements.items()
+            if _EXPLAINED.match(sql)
+        ]
+        db.disable_profiling()
+
+        # The workload deleted everything, so explain against a freshly populated copy
+        populate(db)
+        cls.plans = {sql: normalize_plan(db.explain_query_plan(sql, params)) for sql, params in statements}
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up the fixture database."""
+        cls.temp_dir.cleanup()
+
+    def test_no_unindexed_scans(self):
+        """Test that no statement scans books or reading_sessions without an index."""
+        offenders = {
+            sql: plan for sql, plan in self.plans.items()
+            if sql not in FULL_SCAN_ALLOWED and any(_FULL_SCAN.match(line) for line in plan)
+        }
+        self.assertEqual(offenders, {}, 'Statements scanning without an index')
+
+    def test_plans_match_record(self):
+        """Test that query plans match the recorded expectations."""
+        if os.environ.get('BOOKTRACK_UPDATE_PLANS'):
+            with open(PLANS_FILE, 'w', encoding='utf-8') as f:
+                json.dump(dict(sorted(self.plans.items())), f, indent=2)
+                f.write('\n')
+        with open(PLANS_FILE, 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+
+        self.assertEqual(sorted(set(self.plans) - set(expected)), [],
+                         'New statements; re-record with BOOKTRACK_UPDATE_PLANS=1')
+        self.assertEqual(sorted(set(expected) - set(self.plans)), [],
+                         'Recorded statements no longer issued; re-record with BOOKTRACK_UPDATE_PLANS=1')
+        for sql, plan in expected.items():
+            self.assertEqual(self.plans[sql], plan, f'Query plan changed for: {sql}')
+
+
+if __name__ == '__main__':
+    unittest.main()
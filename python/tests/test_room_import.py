@@ -0,0 +1,104 @@
+"""
+Tests for importing the Android app's Room database
+"""
+
+import unittest
+import tempfile
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.room_import import import_room_database
+
+
+def create_room_database(path):
+    """Create a database with the Room schema used by the Kotlin app."""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE android_metadata (locale TEXT);
+        CREATE TABLE books (
+            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, title TEXT NOT NULL,
+            author TEXT NOT NULL, totalPages INTEGER, coverImage TEXT,
+            status TEXT NOT NULL, notes TEXT
+        );
+        CREATE TABLE reading_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, bookId INTEGER NOT NULL,
+            date INTEGER NOT NULL, duration INTEGER NOT NULL, pagesRead INTEGER,
+            FOREIGN KEY(bookId) REFERENCES books(id) ON UPDATE NO ACTION ON DELETE CASCADE
+        );
+        INSERT INTO books VALUES (1, 'Dune', 'Frank Herbert', 412, 'http://example.com/dune.jpg', 'ACTIVE', 'Spice');
+        INSERT INTO books VALUES (5, 'Emma', 'Jane Austen', NULL, NULL, 'ABANDONED', NULL);
+        -- 2024-03-01 12:00:00 UTC
+        INSERT INTO reading_logs VALUES (1, 1, 1709294400000, 1800, 20);
+        INSERT INTO reading_logs VALUES (2, 5, 1709294400000, 600, NULL);
+        INSERT INTO reading_logs VALUES (3, 1, 1709380800000, 900, 12);
+    ''')
+    conn.commit()
+    conn.close()
+
+
+class TestRoomImport(unittest.TestCase):
+    """Test cases for import_room_database."""
+
+    def setUp(self):
+        """Set up a Booktrack database and a Room database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = DatabaseManager(os.path.join(self.temp_dir.name, 'booktrack.db'))
+        self.room_path = os.path.join(self.temp_dir.name, 'booktrack_database')
+        create_room_database(self.room_path)
+
+    def tearDown(self):
+        """Clean up test databases."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def test_import_books_and_sessions(self):
+        """Test mapping books, statuses and reading logs."""
+        existing_id = self.db_manager.add_book("Existing", "Author")
+
+        result = import_room_database(self.db_manager, self.room_path)
+        self.assertEqual(result, {'books': 2, 'sessions': 3})
+
+        books = {b['title']: b for b in self.db_manager.get_books()}
+        self.assertEqual(set(books), {'Existing', 'Dune', 'Emma'})
+        self.assertEqual(books['Existing']['id'], existing_id)
+        self.assertEqual(books['Dune']['status'], 'Active')
+        self.assertEqual(books['Dune']['total_pages'], 412)
+        self.assertEqual(books['Dune']['cover_image_url'], 'http://example.com/dune.jpg')
+        self.assertEqual(books['Emma']['status'], 'Abandoned')
+
+        sessions = self.db_manager.get_reading_sessions(books['Dune']['id'])
+        self.assertEqual(len(sessions), 2)
+        first = min(sessions, key=lambda s: s['session_date'])
+        self.assertEqual(first['session_date'], '2024-03-01 12:00:00')
+        self.assertEqual(first['duration_seconds'], 1800)
+        self.assertEqual(first['pages_read'], 20)
+        end = datetime.fromisoformat(first['end_time'])
+        start = datetime.fromisoformat(first['start_time'])
+        self.assertEqual((end - start).total_seconds(), 1800)
+
+        stats = self.db_manager.get_statistics()
+        self.assertEqual(stats['total_reading_time_seconds'], 3300)
+
+    def test_room_database_not_modified(self):
+        """Test that the Room file is opened read-only and left detached."""
+        before = os.path.getmtime(self.room_path)
+        import_room_database(self.db_manager, self.room_path)
+        self.assertEqual(os.path.getmtime(self.room_path), before)
+        # A second import gets fresh ids
+        import_room_database(self.db_manager, self.room_path)
+        self.assertEqual(len(self.db_manager.get_books()), 4)
+
+    def test_missing_file(self):
+        """Test that a missing Room file raises instead of creating one."""
+        with self.assertRaises(FileNotFoundError):
+            import_room_database(self.db_manager, os.path.join(self.temp_dir.name, 'nope'))
+
+
+if __name__ == '__main__':
+    unittest.main()
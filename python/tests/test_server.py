@@ -0,0 +1,153 @@
+"""
+Tests for the Booktrack HTTP/JSON API server
+"""
+
+import unittest
+import asyncio
+import tempfile
+import os
+import json
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.server import BooktrackServer
+
+
+async def http_request(port, method, path, body=None, headers=None):
+    """Send one HTTP/1.1 request and return (status, headers, parsed JSON body)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    head = f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n'
+    for name, value in (headers or {}).items():
+        head += f'{name}: {value}\r\n'
+    head += f'Content-Length: {len(payload)}\r\n\r\n'
+    writer.write(head.encode('latin-1') + payload)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        response_headers[name.strip().lower()] = value.strip()
+    data = await reader.read()
+    writer.close()
+    return status, response_headers, json.loads(data) if data else None
+
+
+class TestBooktrackServer(unittest.TestCase):
+    """Test cases for BooktrackServer."""
+
+    def setUp(self):
+        """Start a server on a temporary database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.loop = asyncio.new_event_loop()
+        self.server = BooktrackServer(os.path.join(self.temp_dir.name, 'test.db'), port=0, read_pool_size=2)
+        self.loop.run_until_complete(self.server.start())
+
+    def tearDown(self):
+        """Stop the server and clean up."""
+        self.loop.run_until_complete(self.server.stop())
+        self.loop.close()
+        self.temp_dir.cleanup()
+
+    def request(self, method, path, body=None, headers=None):
+        return self.loop.run_until_complete(http_request(self.server.port, method, path, body, headers))
+
+    def test_create_and_read(self):
+        """Test writing books and sessions and reading them back."""
+        status, _, created = self.request('POST', '/books', {'title': 'Dune', 'author': 'Herbert'})
+        self.assertEqual(status, 201)
+        book_id = created['id']
+
+        status, _, _ = self.request('POST', '/sessions', {'book_id': book_id, 'duration_seconds': 900})
+        self.assertEqual(status, 201)
+
+        status, _, books = self.request('GET', '/books?status=Active')
+        self.assertEqual(status, 200)
+        self.assertEqual([b['title'] for b in books], ['Dune'])
+
+        status, _, sessions = self.request('GET', f'/books/{book_id}/sessions')
+        self.assertEqual(sessions[0]['duration_seconds'], 900)
+
+        status, _, stats = self.request('GET', '/statistics')
+        self.assertEqual(stats['total_reading_time_seconds'], 900)
+
+        status, _, authors = self.request('GET', '/authors?prefix=herb')
+        self.assertEqual([(a['name'], a['total_seconds']) for a in authors], [('Herbert', 900)])
+        status, _, books = self.request('GET', f"/books?author_id={authors[0]['id']}")
+        self.assertEqual([b['title'] for b in books], ['Dune'])
+
+        status, _, export = self.request('GET', '/export')
+        self.assertEqual(len(export['books'][0]['reading_logs']), 1)
+
+    def test_etag_not_modified(self):
+        """Test that If-None-Match returns 304 until the data changes."""
+        self.request('POST', '/books', {'title': 'Book', 'author': 'Author'})
+        status, headers, _ = self.request('GET', '/books')
+        etag = headers['etag']
+
+        status, headers, body = self.request('GET', '/books', headers={'If-None-Match': etag})
+        self.assertEqual(status, 304)
+        self.assertIsNone(body)
+
+        self.request('POST', '/books', {'title': 'Another', 'author': 'Author'})
+        status, headers, books = self.request('GET', '/books', headers={'If-None-Match': etag})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers['etag'], etag)
+        self.assertEqual(len(books), 2)
+
+    def test_if_none_match_list(self):
+        """Test that If-None-Match accepts a list of ETags and '*'."""
+        self.request('POST', '/books', {'title': 'Book', 'author': 'Author'})
+        status, headers, _ = self.request('GET', '/books')
+        etag = headers['etag']
+
+        status, _, _ = self.request('GET', '/books', headers={'If-None-Match': f'"stale", {etag}'})
+        self.assertEqual(status, 304)
+        status, _, _ = self.request('GET', '/books', headers={'If-None-Match': '*'})
+        self.assertEqual(status, 304)
+        status, _, _ = self.request('GET', '/books', headers={'If-None-Match': '"stale", W/"other"'})
+        self.assertEqual(status, 200)
+
+    def test_etag_matches_payload(self):
+        """Test that the version for the ETag comes from the payload's snapshot."""
+        self.request('POST', '/books', {'title': 'Book', 'author': 'Author'})
+        version = self.server.writer.get_change_version()
+
+        def read_after_write(db):
+            # A write committed after the read began is not seen, nor is its version
+            db.get_change_version()
+            self.server.writer.add_book('Late', 'Author')
+            return db.get_books()
+
+        versions = []
+        books = self.server._with_reader(read_after_write, versions)
+        self.assertEqual([book['title'] for book in books], ['Book'])
+        self.assertEqual(versions, [version])
+
+    def test_errors(self):
+        """Test error responses."""
+        self.assertEqual(self.request('GET', '/nothing')[0], 404)
+        self.assertEqual(self.request('GET', '/books/999')[0], 404)
+        self.assertEqual(self.request('GET', '/books/abc')[0], 400)
+        self.assertEqual(self.request('GET', '/authors?sort=shortest')[0], 400)
+        self.assertEqual(self.request('POST', '/books', {'title': 'No author'})[0], 400)
+        self.assertEqual(self.request('POST', '/sessions', {'book_id': 42, 'duration_seconds': 5})[0], 404)
+
+    def test_readers_are_read_only(self):
+        """Test that pooled read connections cannot write."""
+        reader = self.server.readers.get()
+        try:
+            with self.assertRaises(Exception):
+                reader.add_book('Title', 'Author')
+        finally:
+            self.server.readers.put(reader)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Tests for delta sync between Booktrack libraries
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import time
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.sync import (DatabasePeer, apply_changeset, build_changeset, get_peer_state, read_changeset,
+                            synchronize, write_changeset)
+
+
+def library_contents(db):
+    """Return a comparable view of a library's books and sessions."""
+    books = sorted((b['title'], b['author'], b['status'], b['notes'])
+                   for b in db.get_books(columns=('title', 'author', 'status', 'notes')))
+    sessions = sorted((s['book_title'], s['duration_seconds'], s['pages_read'])
+                      for s in db.get_reading_sessions())
+    return books, sessions
+
+
+class TestSync(unittest.TestCase):
+    """Test cases for synchronize()."""
+
+    def setUp(self):
+        """Set up a desktop library and a file-based peer library."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.desktop = DatabaseManager(os.path.join(self.temp_dir.name, 'desktop.db'))
+        self.phone = DatabaseManager(os.path.join(self.temp_dir.name, 'phone.db'))
+        self.peer = DatabasePeer(self.phone)
+
+    def tearDown(self):
+        """Clean up test databases."""
+        self.desktop = None
+        self.phone = None
+        self.temp_dir.cleanup()
+
+    def test_initial_sync_merges_both_libraries(self):
+        """Test that a first sync copies everything both ways."""
+        book_id = self.desktop.add_book("Desktop Book", "Author")
+        self.desktop.add_reading_session(book_id, 600, 5)
+        phone_book = self.phone.add_book("Phone Book", "Author")
+        self.phone.add_reading_session(phone_book, 1200, 10)
+
+        result = synchronize(self.desktop, self.peer)
+        self.assertEqual(result['received']['inserted'], 2)
+        self.assertEqual(result['sent']['inserted'], 2)
+        self.assertEqual(library_contents(self.desktop), library_contents(self.phone))
+        self.assertEqual(len(self.desktop.get_books()), 2)
+
+    def test_second_sync_only_sends_new_changes(self):
+        """Test that sync cost follows what changed."""
+        for i in range(20):
+            self.desktop.add_book(f"Book {i}", "Author")
+        synchronize(self.desktop, self.peer)
+
+        book_id = self.desktop.get_books()[0]['id']
+        self.desktop.add_reading_session(book_id, 300)
+        state = get_peer_state(self.desktop, self.peer.replica_id)
+        outgoing = build_changeset(self.desktop, state['last_sent_seq'])
+        self.assertEqual(len(outgoing['books']), 0)
+        self.assertEqual(len(outgoing['sessions']), 1)
+
+        result = synchronize(self.desktop, self.peer)
+        self.assertEqual(result['sent']['inserted'], 1)
+        self.assertEqual(result['received']['inserted'], 0)
+        self.assertEqual(library_contents(self.desktop), library_contents(self.phone))
+
+        # Nothing changed: nothing is applied on either side
+        result = synchronize(self.desktop, self.peer)
+        for direction in ('received', 'sent'):
+            self.assertEqual(result[direction]['inserted'] + result[direction]['updated'], 0)
+
+    def test_concurrent_edits_newest_wins(self):
+        """Test last-writer-wins for concurrent book edits."""
+        book_id = self.desktop.add_book("Title", "Author")
+        synchronize(self.desktop, self.peer)
+        phone_id = self.phone.get_books()[0]['id']
+
+        self.desktop.update_book(book_id, title="Desktop Title")
+        time.sleep(0.01)
+        self.phone.update_book(phone_id, title="Phone Title", status="Read")
+
+        synchronize(self.desktop, self.peer)
+        self.assertEqual(self.desktop.get_book(book_id)['title'], "Phone Title")
+        self.assertEqual(self.desktop.get_book(book_id)['status'], "Read")
+        self.assertEqual(library_contents(self.desktop), library_contents(self.phone))
+
+    def test_tie_keeps_peer_timestamp(self):
+        """Test that a session won on an updated_at tie keeps the peer's timestamp."""
+        book_id = self.desktop.add_book("Title", "Author")
+        self.desktop.add_reading_session(book_id, 600)
+        synchronize(self.desktop, self.peer)
+        for db, seconds in ((self.desktop, 900), (self.phone, 1200)):
+            with db._transaction() as conn:
+                conn.execute('UPDATE reading_sessions SET duration_seconds = ?, updated_at = 1700000000000',
+                             (seconds,))
+
+        # The replica with the greater id wins the tie
+        winner, loser = sorted((self.desktop, self.phone), key=lambda db: db.get_setting('replica_id'))[::-1]
+        result = apply_changeset(loser, build_changeset(winner))
+        self.assertEqual(result['updated'], 1)
+        rows = []
+        for db in (winner, loser):
+            with db._connect() as conn:
+                rows.append(conn.execute('SELECT duration_seconds, updated_at FROM reading_sessions').fetchone())
+        self.assertEqual(rows[1], rows[0])
+        self.assertEqual(rows[1][1], 1700000000000)
+
+    def test_delete_wins_over_edit(self):
+        """Test that deletes propagate and beat concurrent edits."""
+        book_id = self.desktop.add_book("Doomed", "Author")
+        self.desktop.add_reading_session(book_id, 600)
+        keep_id = self.desktop.add_book("Kept", "Author")
+        synchronize(self.desktop, self.peer)
+
+        phone_id = [b['id'] for b in self.phone.get_books() if b['title'] == "Doomed"][0]
+        self.desktop.delete_book(book_id)
+        time.sleep(0.01)
+        self.phone.update_book(phone_id, notes="Edited after delete")
+
+        synchronize(self.desktop, self.peer)
+        self.assertEqual([b['title'] for b in self.phone.get_books()], ["Kept"])
+        self.assertEqual(self.phone.get_reading_sessions(), [])
+        self.assertEqual(library_contents(self.desktop), library_contents(self.phone))
+        self.assertIsNotNone(self.desktop.get_book(keep_id))
+
+    def test_notes_edits_sync(self):
+        """Test that out-of-row notes travel with their book."""
+        book_id = self.desktop.add_book("Book", "Author", notes="First thoughts")
+        synchronize(self.desktop, self.peer)
+        phone_id = self.phone.get_books()[0]['id']
+        self.assertEqual(self.phone.get_book_notes(phone_id), "First thoughts")
+
+        time.sleep(0.01)
+        self.phone.update_book(phone_id, notes="Second thoughts " * 50)
+        result = synchronize(self.desktop, self.peer)
+        self.assertEqual(result['received']['updated'], 1)
+        self.assertEqual(self.desktop.get_book_notes(book_id), "Second thoughts " * 50)
+
+        # The peer's edit time is kept, so nothing bounces back
+        result = synchronize(self.desktop, self.peer)
+        for direction in ('received', 'sent'):
+            self.assertEqual(result[direction]['inserted'] + result[direction]['updated'], 0)
+
+    def test_delete_all_data_propagates(self):
+        """Test that delete_all_data is sent as tombstones."""
+        self.desktop.add_book("Book", "Author")
+        synchronize(self.desktop, self.peer)
+        self.desktop.delete_all_data()
+        synchronize(self.desktop, self.peer)
+        self.assertEqual(self.phone.get_books(), [])
+
+    def test_changeset_file_round_trip(self):
+        """Test writing and reading a changeset file."""
+        self.desktop.add_book("Book", "Author")
+        changeset = build_changeset(self.desktop)
+        path = os.path.join(self.temp_dir.name, 'changes.json.gz')
+        write_changeset(path, changeset)
+        self.assertEqual(read_changeset(path), changeset)
+        self.assertEqual(self.peer.apply(read_changeset(path))['inserted'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests for tags (shelves) and tag filtering
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import MEMORY, DatabaseManager
+from booktrack.sync import DatabasePeer, synchronize
+
+
+class TestTags(unittest.TestCase):
+    """Test cases for tagging books and filtering by tags."""
+
+    def setUp(self):
+        """Set up an in-memory library with tagged books."""
+        self.db_manager = DatabaseManager(MEMORY)
+        self.ids = {}
+        for title, tags in (('Dune', ['Fiction', 'Science']),
+                            ('Cosmos', ['Science']),
+                            ('SPQR', ['History']),
+                            ('Wolf Hall', ['Fiction', 'History'])):
+            self.ids[title] = self.db_manager.add_book(title, "Author")
+            self.db_manager.set_book_tags(self.ids[title], tags)
+        self.db_manager.update_book(self.ids['Cosmos'], status='Read')
+
+    def tearDown(self):
+        """Free the in-memory library."""
+        self.db_manager.shutdown()
+
+    def titles(self, **filters):
+        return sorted(book['title'] for book in self.db_manager.get_books(columns=('title',), **filters))
+
+    def test_set_and_get_tags(self):
+        """Test that tag names are cleaned and matched case-insensitively."""
+        self.db_manager.set_book_tags(self.ids['Dune'], [' fiction ', 'Classics', 'FICTION', ''])
+        self.assertEqual(self.db_manager.get_book_tags(self.ids['Dune']), ['Classics', 'Fiction'])
+        self.assertFalse(self.db_manager.set_book_tags(9999, ['Fiction']))
+
+    def test_tags_written_with_the_book(self):
+        """Test that add_book() and update_book() write tags in the book's own transaction."""
+        version = self.db_manager.get_change_version()
+        book_id = self.db_manager.add_book("Foundation", "Author", tags=['Fiction', 'Classics'])
+        self.assertEqual(self.db_manager.get_book_tags(book_id), ['Classics', 'Fiction'])
+        changed = self.db_manager.get_changes_since(version)['books']
+        self.assertEqual([(book['title'], book['tags']) for book in changed],
+                         [('Foundation', ['Classics', 'Fiction'])])
+
+        self.assertTrue(self.db_manager.update_book(book_id, tags=['Science']))
+        self.assertEqual(self.db_manager.get_book_tags(book_id), ['Science'])
+        self.assertFalse(self.db_manager.update_book(9999, tags=['Science']))
+
+    def test_counts_follow_changes(self):
+        """Test that per-tag book counts are maintained on every change."""
+        self.assertEqual(self.db_manager.get_tags(), [('Fiction', 2), ('History', 2), ('Science', 2)])
+
+        self.db_manager.set_book_tags(self.ids['Dune'], ['Fiction'])
+        self.db_manager.delete_book(self.ids['Wolf Hall'])
+        self.assertEqual(self.db_manager.get_tags(), [('Fiction', 1), ('History', 1), ('Science', 1)])
+
+        self.assertTrue(self.db_manager.delete_tag('Science'))
+        self.assertEqual(self.db_manager.get_tags(), [('Fiction', 1), ('History', 1)])
+        self.assertEqual(self.db_manager.get_book_tags(self.ids['Cosmos']), [])
+
+    def test_tag_queries(self):
+        """Test AND, OR and NOT tag combinations, alone and with a status."""
+        self.assertEqual(self.titles(all_tags=['Fiction', 'History']), ['Wolf Hall'])
+        self.assertEqual(self.titles(any_tags=['Science', 'History']), ['Cosmos', 'Dune', 'SPQR', 'Wolf Hall'])
+        self.assertEqual(self.titles(without_tags=['Fiction']), ['Cosmos', 'SPQR'])
+        self.assertEqual(self.titles(all_tags=['Fiction'], without_tags=['History']), ['Dune'])
+        self.assertEqual(self.titles(status='Active', any_tags=['Science'], without_tags=['History']), ['Dune'])
+        self.assertEqual(self.titles(all_tags=['Poetry']), [])
+
+    def test_tag_query_plan(self):
+        """Test that tag filters are set operations over the tag index."""
+        profiler = self.db_manager.enable_profiling()
+        self.db_manager.get_books(all_tags=['Fiction', 'History'], without_tags=['Science'])
+        sql, stats = next((sql, stats) for sql, stats in profiler.statements.items() if 'INTERSECT' in sql)
+        plan = ' '.join(self.db_manager.explain_query_plan(sql, stats.sample_params))
+        self.assertIn('EXCEPT', plan)
+        self.assertIn('idx_book_tags_tag_book', plan)
+
+    def test_tags_are_changes_to_the_book(self):
+        """Test that tag edits are tracked and synced with their book."""
+        version = self.db_manager.get_change_version()
+        self.db_manager.set_book_tags(self.ids['SPQR'], ['History', 'Rome'])
+        self.assertEqual(self.db_manager.get_change_version(), version + 1)
+        changed = self.db_manager.get_changes_since(version)['books']
+        self.assertEqual([(book['title'], book['tags']) for book in changed], [('SPQR', ['History', 'Rome'])])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            peer = DatabaseManager(os.path.join(temp_dir, 'peer.db'))
+            synchronize(self.db_manager, DatabasePeer(peer))
+            peer_id = peer.get_books(columns=('id',), all_tags=['Rome'])[0]['id']
+            self.assertEqual(peer.get_book_tags(peer_id), ['History', 'Rome'])
+            self.assertEqual(dict(peer.get_tags())['Fiction'], 2)
+
+            # Nothing changed: nothing is applied on either side
+            result = synchronize(self.db_manager, DatabasePeer(peer))
+            for direction in ('received', 'sent'):
+                self.assertEqual(result[direction]['inserted'] + result[direction]['updated'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Tests for time-zone-aware day bucketing
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.database import DatabaseManager
+from booktrack.timezones import ZoneInfo, local_day, main
+
+# 2024-03-02 03:30 UTC is the evening of March 1st in New York
+EVENING_IN_NEW_YORK = int(datetime(2024, 3, 2, 3, 30, tzinfo=timezone.utc).timestamp())
+
+
+@unittest.skipIf(ZoneInfo is None, 'zoneinfo requires Python 3.9+')
+class TestTimeZones(unittest.TestCase):
+    """Test cases for local-day bucketing."""
+
+    def setUp(self):
+        """Set up a test database."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, 'booktrack.db')
+        self.db_manager = DatabaseManager(self.db_path)
+        self.book_id = self.db_manager.add_book("Test Book", "Test Author")
+
+    def tearDown(self):
+        """Clean up the test database."""
+        self.db_manager = None
+        self.temp_dir.cleanup()
+
+    def days(self):
+        return [row[0] for row in self.db_manager.get_daily_totals()]
+
+    def test_sessions_bucketed_in_configured_zone(self):
+        """Test that an evening session counts on the local day."""
+        self.db_manager.set_time_zone('America/New_York')
+        self.db_manager.add_reading_session(self.book_id, 1800, start_time=EVENING_IN_NEW_YORK)
+        self.assertEqual(self.days(), ['2024-03-01'])
+
+        # A new manager picks the zone up from the settings
+        reopened = DatabaseManager(self.db_path)
+        self.assertEqual(reopened.get_time_zone(), 'America/New_York')
+        reopened.add_reading_session(self.book_id, 600, start_time=EVENING_IN_NEW_YORK + 3600)
+        self.assertEqual(reopened.get_daily_totals(), [('2024-03-01', 2400, 2, 0)])
+
+    def test_rebucket_after_zone_change(self):
+        """Test that existing sessions keep their day until re-bucketed."""
+        self.db_manager.set_time_zone('America/New_York')
+        self.db_manager.add_reading_session(self.book_id, 1800, start_time=EVENING_IN_NEW_YORK)
+        version = self.db_manager.get_change_version()
+
+        self.db_manager.set_time_zone('Europe/Berlin')
+        self.assertEqual(self.days(), ['2024-03-01'])
+        self.assertEqual(self.db_manager.rebucket_local_days(), 1)
+        self.assertEqual(self.days(), ['2024-03-02'])
+
+        # Re-bucketing is derived data and does not count as a change to sync
+        self.assertEqual(self.db_manager.get_change_version(), version)
+
+    def test_zone_changed_by_another_manager(self):
+        """Test that a zone set through another manager is used for new sessions."""
+        self.db_manager.set_time_zone('Europe/Berlin')
+        other = DatabaseManager(self.db_path)
+        other.set_time_zone('America/New_York')
+
+        self.db_manager.add_reading_session(self.book_id, 1800, start_time=EVENING_IN_NEW_YORK)
+        self.assertEqual(self.days(), ['2024-03-01'])
+
+    def test_invalid_zone(self):
+        """Test that unknown zones are rejected."""
+        with self.assertRaises(ValueError):
+            self.db_manager.set_time_zone('Mars/Olympus_Mons')
+        self.assertIsNone(self.db_manager.get_time_zone())
+
+    def test_streaks(self):
+        """Test current and longest reading streaks."""
+        self.db_manager.set_time_zone('UTC')
+        now = time.time()
+        for days_ago in (0, 1, 2, 10, 11, 12, 13):
+            self.db_manager.add_reading_session(self.book_id, 600, start_time=now - days_ago * 86400)
+        self.assertEqual(self.db_manager.get_reading_streaks(), {'current': 3, 'longest': 4})
+
+        stats = self.db_manager.get_statistics()
+        today = local_day(now, timezone.utc)
+        self.assertEqual(stats['daily_stats'][0], (today, 600))
+        self.assertEqual(len(stats['daily_stats']), 7)
+
+    def test_streak_broken(self):
+        """Test that a streak ends after a day without reading."""
+        self.db_manager.add_reading_session(self.book_id, 600,
+                                            start_time=datetime.now() - timedelta(days=3))
+        self.assertEqual(self.db_manager.get_reading_streaks(), {'current': 0, 'longest': 1})
+
+    def test_daily_totals_use_covering_index(self):
+        """Test that daily totals are read from the local_day index."""
+        plan = ' '.join(self.db_manager.explain_query_plan(
+            'SELECT local_day, SUM(duration_seconds), COUNT(*), COALESCE(SUM(pages_read), 0) '
+            'FROM reading_sessions WHERE local_day >= ? GROUP BY local_day', ('2024-01-01',)))
+        self.assertIn('COVERING INDEX idx_reading_sessions_local_day', plan)
+
+    def test_command_line(self):
+        """Test setting the zone and re-bucketing from the command line."""
+        self.db_manager.add_reading_session(self.book_id, 1800, start_time=EVENING_IN_NEW_YORK)
+        self.assertEqual(main(['America/New_York', '--rebucket', '--db', self.db_path]), 0)
+        self.assertEqual(self.days(), ['2024-03-01'])
+
+
+if __name__ == '__main__':
+    unittest.main()
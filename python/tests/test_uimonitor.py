@@ -0,0 +1,115 @@
+"""
+Tests for the Booktrack event-loop monitor
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import time
+from unittest import mock
+
+# Add the src directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src'))
+
+from booktrack.uimonitor import EventLoopMonitor, monitor_from_environment, timed_handler
+
+
+class FakeApp:
+    """Minimal stand-in for the Booktrack app."""
+
+    def __init__(self, monitor=None):
+        self.ui_monitor = monitor
+
+    @timed_handler
+    def refresh_book_list(self, delay=0.0):
+        time.sleep(delay)
+        return 'refreshed'
+
+    @timed_handler
+    async def export_data(self, delay=0.0):
+        time.sleep(delay)
+        await asyncio.sleep(0.05)
+        return 'exported'
+
+    @timed_handler
+    def show_active_books(self):
+        return self.refresh_book_list()
+
+    @timed_handler
+    async def apply_filter(self):
+        self.refresh_book_list()
+        return await self.export_data()
+
+
+class TestEventLoopMonitor(unittest.TestCase):
+    """Test cases for EventLoopMonitor."""
+
+    def test_sync_handler_timing(self):
+        """Test that synchronous handlers are timed."""
+        monitor = EventLoopMonitor(stall_threshold_ms=1000)
+        app = FakeApp(monitor)
+        self.assertEqual(app.refresh_book_list(0.02), 'refreshed')
+        histogram = monitor.handlers['refresh_book_list']
+        self.assertEqual(histogram.count, 1)
+        self.assertGreaterEqual(histogram.max_ms, 20)
+
+    def test_async_handler_counts_blocking_part_only(self):
+        """Test that coroutine handlers exclude time spent suspended."""
+        monitor = EventLoopMonitor(stall_threshold_ms=1000)
+        app = FakeApp(monitor)
+        result = asyncio.run(app.export_data(0.01))
+        self.assertEqual(result, 'exported')
+        histogram = monitor.handlers['export_data']
+        self.assertGreaterEqual(histogram.max_ms, 10)
+        self.assertLess(histogram.max_ms, 50)
+
+    def test_nested_handlers_counted_once(self):
+        """Test that a handler called from a timed handler is not timed again."""
+        monitor = EventLoopMonitor(stall_threshold_ms=1000)
+        app = FakeApp(monitor)
+        self.assertEqual(app.show_active_books(), 'refreshed')
+        self.assertEqual(asyncio.run(app.apply_filter()), 'exported')
+        self.assertEqual(sorted(monitor.handlers), ['apply_filter', 'show_active_books'])
+
+        # Later calls are timed as usual
+        app.refresh_book_list()
+        self.assertEqual(monitor.handlers['refresh_book_list'].count, 1)
+
+    def test_handlers_untouched_without_monitor(self):
+        """Test that decorated handlers work when monitoring is off."""
+        app = FakeApp()
+        self.assertEqual(app.refresh_book_list(), 'refreshed')
+        self.assertEqual(asyncio.run(app.export_data()), 'exported')
+
+    def test_stall_logged_with_culprit(self):
+        """Test that loop stalls are attributed to the blocking handler."""
+        monitor = EventLoopMonitor(stall_threshold_ms=30, sample_interval=0.01)
+        app = FakeApp(monitor)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.03)
+            app.refresh_book_list(0.08)
+            await asyncio.sleep(0.03)
+            monitor.stop()
+
+        with self.assertLogs('booktrack.uimonitor', level='WARNING') as logs:
+            asyncio.run(scenario())
+
+        self.assertGreaterEqual(monitor.stalls, 1)
+        self.assertTrue(any('stalled' in line and 'refresh_book_list' in line for line in logs.output))
+        self.assertGreaterEqual(monitor.stall_percentiles()['max_ms'], 30)
+
+    def test_monitor_from_environment(self):
+        """Test toggling the monitor through the environment."""
+        with mock.patch.dict(os.environ, {'BOOKTRACK_UI_MONITOR': ''}):
+            self.assertIsNone(monitor_from_environment())
+        with mock.patch.dict(os.environ, {'BOOKTRACK_UI_MONITOR': '1'}):
+            self.assertEqual(monitor_from_environment().stall_threshold_ms, 100.0)
+        with mock.patch.dict(os.environ, {'BOOKTRACK_UI_MONITOR': '250'}):
+            self.assertEqual(monitor_from_environment().stall_threshold_ms, 250.0)
+
+
+if __name__ == '__main__':
+    unittest.main()